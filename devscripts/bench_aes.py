@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+# Compare the speed of the T-table AES implementation with the step by step
+# implementation on lists of ints it replaces.
+#
+# Usage: devscripts/bench_aes.py [SIZE_IN_KIB]
+
+from __future__ import print_function, unicode_literals
+
+import os
+import sys
+import timeit
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from youtube_dl.aes import (
+    BLOCK_SIZE_BYTES,
+    aes_cbc_decrypt,
+    aes_cbc_decrypt_bytes,
+    key_expansion,
+    mix_columns_inv,
+    shift_rows_inv,
+    sub_bytes_inv,
+    xor,
+)
+from youtube_dl.utils import bytes_to_intlist
+
+
+def list_aes_decrypt(data, expanded_key):
+    # The previous implementation of aes_decrypt
+    rounds = len(expanded_key) // BLOCK_SIZE_BYTES - 1
+
+    for i in range(rounds, 0, -1):
+        data = xor(data, expanded_key[i * BLOCK_SIZE_BYTES: (i + 1) * BLOCK_SIZE_BYTES])
+        if i != rounds:
+            data = mix_columns_inv(data)
+        data = shift_rows_inv(data)
+        data = sub_bytes_inv(data)
+    data = xor(data, expanded_key[:BLOCK_SIZE_BYTES])
+
+    return data
+
+
+def list_aes_cbc_decrypt(data, key, iv):
+    # The previous implementation of aes_cbc_decrypt
+    expanded_key = key_expansion(key)
+    decrypted_data = []
+    previous_cipher_block = iv
+    for i in range(0, len(data), BLOCK_SIZE_BYTES):
+        block = data[i: i + BLOCK_SIZE_BYTES]
+        block += [0] * (BLOCK_SIZE_BYTES - len(block))
+        decrypted_data += xor(list_aes_decrypt(block, expanded_key), previous_cipher_block)
+        previous_cipher_block = block
+    return decrypted_data[:len(data)]
+
+
+def main():
+    size = int(sys.argv[1]) * 1024 if len(sys.argv) > 1 else 64 * 1024
+    data = os.urandom(size)
+    key = os.urandom(16)
+    iv = os.urandom(16)
+    data_list, key_list, iv_list = map(bytes_to_intlist, (data, key, iv))
+
+    assert (list_aes_cbc_decrypt(data_list, key_list, iv_list) ==
+            bytes_to_intlist(aes_cbc_decrypt_bytes(data, key, iv)))
+
+    benchmarks = (
+        ('lists, step by step', lambda: list_aes_cbc_decrypt(data_list, key_list, iv_list)),
+        ('lists, T-tables (aes_cbc_decrypt)', lambda: aes_cbc_decrypt(data_list, key_list, iv_list)),
+        ('bytes, T-tables (aes_cbc_decrypt_bytes)', lambda: aes_cbc_decrypt_bytes(data, key, iv)),
+    )
+    print('AES-128-CBC decryption of %d KiB' % (size // 1024))
+    for name, func in benchmarks:
+        elapsed = min(timeit.repeat(func, number=1, repeat=3))
+        print('%-42s %8.3fs %10.1f KiB/s' % (name, elapsed, size / 1024.0 / elapsed))
+
+
+if __name__ == '__main__':
+    main()
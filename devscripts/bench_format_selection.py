@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+# Compare the speed of format selection when the format selector is built
+# for every video with the selectors cached by YoutubeDL.
+#
+# Usage: devscripts/bench_format_selection.py [FORMATS_PER_VIDEO [VIDEOS]]
+
+from __future__ import print_function, unicode_literals
+
+import os
+import random
+import sys
+import timeit
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from youtube_dl import YoutubeDL
+
+FORMAT_SPECS = (
+    'best',
+    'bestvideo+bestaudio/best',
+    'bestvideo[height<=?1080][ext=mp4]+bestaudio[ext=m4a]/best[height<=?1080]',
+    '(mp4,webm)[filesize<100M]/worst',
+)
+
+
+def make_formats(count):
+    """ Formats sorted from worst to best, as the extractors return them """
+    formats = []
+    for i in range(count):
+        kind = i % 3
+        height = random.choice((144, 240, 360, 480, 720, 1080, 1440, 2160))
+        formats.append({
+            'format_id': '%d' % i,
+            'url': 'http://localhost/%d' % i,
+            'ext': random.choice(('mp4', 'webm', 'm4a') if kind else ('mp4', 'webm')),
+            'height': height if kind != 2 else None,
+            'vcodec': 'none' if kind == 2 else 'avc1',
+            'acodec': 'none' if kind == 1 else 'mp4a',
+            'filesize': random.randint(1, 200) * 1024 * 1024,
+            'tbr': random.randint(50, 5000),
+        })
+    formats.sort(key=lambda f: (f['height'] or 0, f['tbr']))
+    return formats
+
+
+def main():
+    formats_per_video = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    videos = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    random.seed(0)
+    format_lists = [make_formats(formats_per_video) for _ in range(videos)]
+    ydl = YoutubeDL({'quiet': True})
+
+    def select_uncached(spec):
+        for formats in format_lists:
+            list(ydl.build_format_selector(spec)(formats))
+
+    def select_cached(spec):
+        for formats in format_lists:
+            list(ydl._get_format_selector(spec)(formats))
+
+    print('Format selection for %d videos with %d formats each' % (videos, formats_per_video))
+    for spec in FORMAT_SPECS:
+        print(spec)
+        for name, func in (('built per video', select_uncached), ('cached', select_cached)):
+            elapsed = min(timeit.repeat(lambda: func(spec), number=1, repeat=3))
+            print('    %-16s %8.3fs %10.1f us/video' % (name, elapsed, elapsed * 1e6 / videos))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# coding: utf-8
+from __future__ import unicode_literals
+
+import re
+
+
+class LazyLoadMetaClass(type):
+    def __getattr__(cls, name):
+        # Anything not known by the lazy class comes from the real one
+        return getattr(cls._get_real_class(), name)
+
+
+class _LazyLoadExtractor(object):
+    _module = None
+    # 'valid_url': suitable only matches _VALID_URL
+    # 'both': the real suitable is also called when _VALID_URL matches
+    # 'real': only the real suitable is called
+    _SUITABLE = 'valid_url'
+
+    @classmethod
+    def ie_key(cls):
+        return '%s' % cls.__name__[:-2]
+
+    @classmethod
+    def _get_real_class(cls):
+        if '_real_class' not in cls.__dict__:
+            mod = __import__(cls._module, fromlist=(cls.__name__,))
+            cls._real_class = getattr(mod, cls.__name__)
+        return cls._real_class
+
+    @classmethod
+    def suitable(cls, url):
+        if cls._SUITABLE != 'real':
+            if '_VALID_URL_RE' not in cls.__dict__:
+                cls._VALID_URL_RE = re.compile(cls._VALID_URL)
+            if cls._VALID_URL_RE.match(url) is None:
+                return False
+            if cls._SUITABLE == 'valid_url':
+                return True
+        return cls._get_real_class().suitable(url)
+
+    def __new__(cls, *args, **kwargs):
+        real_cls = cls._get_real_class()
+        instance = real_cls.__new__(real_cls)
+        instance.__init__(*args, **kwargs)
+        return instance
+
+
+LazyLoadExtractor = LazyLoadMetaClass(
+    str('LazyLoadExtractor'), (_LazyLoadExtractor,), {})
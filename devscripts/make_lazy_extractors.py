@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+# Generate the lazy extractors registry, with the data needed to choose the
+# extractor of a URL without importing all the extractor modules.
+#
+# Usage: devscripts/make_lazy_extractors.py youtube_dl/extractor/lazy_extractors.py
+
+from __future__ import unicode_literals, print_function
+
+import inspect
+import io
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+lazy_extractors_filename = sys.argv[1]
+# An existing registry must not be imported instead of the real extractors
+sys.modules['youtube_dl.extractor.lazy_extractors'] = None
+
+from youtube_dl.compat import compat_str
+from youtube_dl.extractor import _ALL_CLASSES
+from youtube_dl.extractor.common import InfoExtractor, SearchInfoExtractor
+from youtube_dl.extractor.dispatch import url_keys
+
+
+def py_repr(value):
+    # Python 2 adds a u prefix, the registry uses unicode_literals
+    res = repr(value)
+    return res[1:] if isinstance(value, compat_str) and res.startswith('u') else res
+
+
+def narrows_valid_url(klass):
+    """
+    Whether the suitable method of klass only ever returns False or the
+    result of InfoExtractor.suitable, i.e. it can't accept URLs not matched
+    by _VALID_URL
+    """
+    owner = next(c for c in klass.__mro__ if 'suitable' in c.__dict__)
+    parent = next(c for c in owner.__mro__[1:] if 'suitable' in c.__dict__)
+    if parent is not InfoExtractor:
+        return False
+    source = inspect.getsource(owner.__dict__['suitable'].__func__)
+    super_call = r'super\(%s,\s*cls\)\.suitable\(url\)' % owner.__name__
+    returns = re.findall(r'^\s*return\b(.*)$', source, re.M)
+    return bool(returns) and all(
+        re.match(r'\s*(?:False|(?:False\s+if\s+.+\s+else\s+)?%s)\s*$' % super_call, r)
+        for r in returns)
+
+
+def suitable_mode(klass):
+    """ Return the _SUITABLE mode of the lazy class and its _VALID_URL """
+    suitable = klass.suitable.__func__
+    if suitable is InfoExtractor.suitable.__func__:
+        return 'valid_url', klass._VALID_URL
+    if suitable is SearchInfoExtractor.suitable.__func__:
+        return 'valid_url', klass._make_valid_url()
+    if narrows_valid_url(klass):
+        return 'both', klass._VALID_URL
+    return 'real', getattr(klass, '_VALID_URL', None)
+
+
+def build_lazy_ie(klass):
+    name = klass.__name__
+    mode, valid_url = suitable_mode(klass)
+    keys = url_keys(valid_url) if mode != 'real' and valid_url else None
+    lines = [
+        'class %s(LazyLoadExtractor):' % name,
+        '    _module = %s' % py_repr(klass.__module__),
+        '    IE_NAME = %s' % py_repr(klass().IE_NAME),
+        '    _VALID_URL = %s' % py_repr(valid_url),
+    ]
+    if mode != 'valid_url':
+        lines.append('    _SUITABLE = %s' % py_repr(mode))
+    lines.append('    _URL_KEYS = %s' % (
+        'None' if keys is None
+        else 'frozenset([%s])' % ', '.join(py_repr(k) for k in sorted(keys))))
+    return '\n'.join(lines) + '\n'
+
+
+with io.open(os.path.join(os.path.dirname(__file__), 'lazy_load_template.py'), encoding='utf-8') as f:
+    module_src = f.read()
+
+module_src += ''.join('\n\n' + build_lazy_ie(klass) for klass in _ALL_CLASSES)
+module_src += '\n\n_ALL_CLASSES = [%s]\n' % ', '.join(klass.__name__ for klass in _ALL_CLASSES)
+
+with io.open(lazy_extractors_filename, 'w', encoding='utf-8') as f:
+    f.write(module_src)
@@ -8,6 +8,9 @@ import sys
 import unittest
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import threading
+import time
+
 from test.helper import FakeYDL
 from youtube_dl.extractor.common import InfoExtractor
 from youtube_dl.extractor import YoutubeIE, get_info_extractor
@@ -66,5 +69,21 @@ class TestInfoExtractor(unittest.TestCase):
         self.assertEqual(ie._html_search_meta('e', html), '5')
         self.assertEqual(ie._html_search_meta('f', html), '6')
 
+    def test_initialize_once(self):
+        logins = []
+
+        class LoginIE(InfoExtractor):
+            def _real_initialize(self):
+                logins.append(None)
+                time.sleep(0.05)
+
+        ie = LoginIE(FakeYDL())
+        threads = [threading.Thread(target=ie.initialize) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(logins), 1)
+
 if __name__ == '__main__':
     unittest.main()
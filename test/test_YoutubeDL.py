@@ -9,17 +9,47 @@ import unittest
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import copy
+import json
+import shutil
+import tempfile
+import threading
+import time
 
-from test.helper import FakeYDL, assertRegexpMatches
+from test.helper import FakeYDL, assertRegexpMatches, try_rm
 from youtube_dl import YoutubeDL
-from youtube_dl.compat import compat_str, compat_urllib_error
+from youtube_dl.compat import compat_http_server, compat_str, compat_urllib_error
 from youtube_dl.extractor import YoutubeIE
 from youtube_dl.extractor.common import InfoExtractor
 from youtube_dl.postprocessor.common import PostProcessor
-from youtube_dl.utils import ExtractorError, match_filter_func
+from youtube_dl.utils import ExtractorError, MaxDownloadsReached, match_filter_func
 
 TEST_URL = 'http://localhost/sample.mp4'
 
+MERGED_CONTENT = {'/video': b'v' * 5000, '/audio': b'a' * 3000}
+MERGED_FILES = ['test_merge.fvideo.mp4', 'test_merge.faudio.m4a']
+# Concatenates its pipe:N inputs into its output file
+FAKE_FFMPEG = '''#!/bin/sh
+if [ "$1" = "-version" ]; then
+    echo "ffmpeg version 4.1"
+    exit 0
+fi
+for arg; do out="$arg"; done
+out="${out#file:}"
+: > "$out"
+while [ $# -gt 0 ]; do
+    if [ "$1" = "-i" ]; then
+        cat "/dev/fd/${2#pipe:}" >> "$out"
+        shift
+    fi
+    shift
+done
+'''
+
+try:
+    import socketserver
+except ImportError:  # Python 2
+    import SocketServer as socketserver
+
 
 class YDL(FakeYDL):
     def __init__(self, *args, **kwargs):
@@ -341,6 +371,36 @@ class TestFormatSelection(unittest.TestCase):
         assert_syntax_error('bestvideo+')
         assert_syntax_error('/')
 
+    def test_format_selector_cache(self):
+        built = []
+
+        class CountingYDL(YDL):
+            def build_format_selector(self, format_spec):
+                built.append(format_spec)
+                return super(CountingYDL, self).build_format_selector(format_spec)
+
+            def _can_merge(self):
+                built.append('can_merge')
+                return super(CountingYDL, self)._can_merge()
+
+        ydl = CountingYDL({'format': 'mp4/best'})
+        for ext in ('mp4', 'webm', 'mp4'):
+            ydl.process_ie_result(_make_result([
+                {'format_id': 'a', 'ext': ext, 'url': TEST_URL},
+                {'format_id': 'b', 'ext': 'flv', 'url': TEST_URL},
+            ]))
+        self.assertEqual(
+            [info['format_id'] for info in ydl.downloaded_info_dicts], ['a', 'b', 'a'])
+        self.assertEqual(built, ['mp4/best'])
+
+        # The default format spec
+        del built[:]
+        ydl = CountingYDL({'format': None, 'ffmpeg_location': 'nonexistent-ffmpeg'})
+        for _ in range(3):
+            ydl.process_ie_result(_make_result([{'format_id': 'a', 'url': TEST_URL}]))
+        self.assertEqual(built, ['can_merge', 'best', 'can_merge', 'can_merge'])
+        self.assertEqual(ydl._can_merge_formats, {('nonexistent-ffmpeg', None): False})
+
     def test_format_filtering(self):
         formats = [
             {'format_id': 'A', 'filesize': 500, 'width': 1000},
@@ -653,6 +713,399 @@ class TestYoutubeDL(unittest.TestCase):
         result = get_ids({'playlist_items': '10'})
         self.assertEqual(result, [])
 
+    def test_lazy_playlist(self):
+        consumed = []
+
+        def make_playlist():
+            def entries():
+                for i in range(1, 6):
+                    consumed.append(i)
+                    yield {
+                        'id': compat_str(i),
+                        'title': compat_str(i),
+                        'url': TEST_URL,
+                    }
+            return {
+                '_type': 'playlist',
+                'id': 'test',
+                'entries': entries(),
+                'extractor': 'test:playlist',
+                'extractor_key': 'test:playlist',
+                'webpage_url': 'http://example.com',
+            }
+
+        class LazyYDL(YDL):
+            def process_info(self, info_dict):
+                super(LazyYDL, self).process_info(info_dict)
+                info_dict['consumed'] = consumed[:]
+
+        def get_results(params):
+            del consumed[:]
+            ydl = LazyYDL(params)
+            ydl.process_ie_result(make_playlist())
+            return [(int(v['id']), v['consumed']) for v in ydl.downloaded_info_dicts]
+
+        # Every video is processed before the next entry is taken
+        result = get_results({})
+        self.assertEqual(result, [(i, list(range(1, i + 1))) for i in range(1, 6)])
+
+        result = get_results({'playliststart': 2, 'playlistend': 3})
+        self.assertEqual(result, [(2, [1, 2]), (3, [1, 2, 3])])
+
+        result = get_results({'playlist_items': '2-3'})
+        self.assertEqual(result, [(2, [1, 2]), (3, [1, 2, 3])])
+        self.assertEqual(consumed, [1, 2, 3])
+
+        result = get_results({'playlist_items': '4,2,10'})
+        self.assertEqual([r[0] for r in result], [4, 2])
+        self.assertEqual(result[0][1], [1, 2, 3, 4])
+
+        # The number of entries is needed
+        result = get_results({'playlistreverse': True})
+        self.assertEqual(result, [(i, list(range(1, 6))) for i in range(5, 0, -1)])
+
+        result = get_results({'outtmpl': '%(playlist_index)s.%(ext)s'})
+        self.assertEqual(result, [(i, list(range(1, 6))) for i in range(1, 6)])
+
+        result = get_results({'parallel_entries': 3})
+        self.assertEqual(sorted(r[0] for r in result), [1, 2, 3, 4, 5])
+
+    def test_parallel_entries(self):
+        archive = 'test_parallel_entries_archive.txt'
+
+        class EntryIE(InfoExtractor):
+            _VALID_URL = r'entry:(?P<id>\d+)'
+
+            def _real_extract(self, url):
+                video_id = self._match_id(url)
+                # Later entries are extracted faster than earlier ones
+                time.sleep((10 - int(video_id)) * 0.01)
+                return _make_result([{'url': TEST_URL, 'ext': 'mp4'}], id=video_id)
+
+        class Logger(object):
+            def __init__(self):
+                self.stdout = []
+
+            def debug(self, msg):
+                self.stdout.append(msg)
+
+            def warning(self, msg):
+                pass
+
+            def error(self, msg):
+                pass
+
+        class ArchiveYDL(FakeYDL):
+            def to_screen(self, s, skip_eol=None):
+                pass
+
+            def process_info(self, info_dict):
+                super(ArchiveYDL, self).process_info(info_dict)
+                self.record_download_archive(info_dict)
+
+        def process_playlist(params):
+            try_rm(archive)
+            logger = Logger()
+            params = dict({
+                'simulate': True,
+                'forcejson': True,
+                'download_archive': archive,
+                'logger': logger,
+                'outtmpl': '%(autonumber)s-%(id)s.%(ext)s',
+            }, **params)
+            ydl = ArchiveYDL(params)
+            ydl.add_info_extractor(EntryIE(ydl))
+            try:
+                res = ydl.process_ie_result({
+                    '_type': 'playlist',
+                    'id': 'test',
+                    'entries': [{
+                        '_type': 'url',
+                        'url': 'entry:%d' % i,
+                        'ie_key': 'Entry',
+                    } for i in range(10)],
+                    'extractor': 'test:playlist',
+                    'extractor_key': 'test:playlist',
+                    'webpage_url': 'http://example.com',
+                })
+            except MaxDownloadsReached:
+                res = None
+            printed = [json.loads(msg) for msg in logger.stdout]
+            with open(archive) as f:
+                recorded = f.read()
+            try_rm(archive)
+            return res, printed, recorded
+
+        serial = process_playlist({})
+        for n in (2, 4, 10):
+            res, printed, recorded = process_playlist({'parallel_entries': n})
+            self.assertEqual(res['entries'], serial[0]['entries'])
+            self.assertEqual(printed, serial[1])
+            self.assertEqual(recorded, serial[2])
+        self.assertEqual(
+            [(e['id'], e['playlist_index'], e['_filename']) for e in serial[1]],
+            [(compat_str(i), i + 1, '%05d-%d.mp4' % (i + 1, i)) for i in range(10)])
+        self.assertEqual(recorded, ''.join('entry %d\n' % i for i in range(10)))
+
+        for n in (1, 4):
+            res, printed, recorded = process_playlist({'parallel_entries': n, 'max_downloads': 3})
+            self.assertEqual(res, None)
+            self.assertEqual(printed, serial[1][:3])
+            self.assertEqual(recorded, 'entry 0\nentry 1\nentry 2\n')
+
+    def test_parallel_entries_nested(self):
+        class EntryIE(InfoExtractor):
+            _VALID_URL = r'entry:(?P<id>\d+)'
+
+            def _real_extract(self, url):
+                video_id = self._match_id(url)
+                if video_id == '1':
+                    return {
+                        '_type': 'multi_video',
+                        'id': video_id,
+                        'entries': [self.url_result('entry:1%d' % i, 'Entry') for i in range(3)],
+                    }
+                # The videos of the multi_video entry are extracted after
+                # the following entries
+                time.sleep(0.05 if len(video_id) > 1 else 0)
+                return _make_result([{'url': TEST_URL, 'ext': 'mp4'}], id=video_id)
+
+        class IdYDL(FakeYDL):
+            def to_screen(self, s, skip_eol=None):
+                pass
+
+            def process_info(self, info_dict):
+                super(IdYDL, self).process_info(info_dict)
+                ids.append(info_dict['id'])
+
+        for n in (1, 4):
+            ids = []
+            ydl = IdYDL({'simulate': True, 'max_downloads': 4, 'parallel_entries': n})
+            ydl.add_info_extractor(EntryIE(ydl))
+            self.assertRaises(MaxDownloadsReached, ydl.process_ie_result, {
+                '_type': 'playlist',
+                'id': 'test',
+                'entries': [{
+                    '_type': 'url',
+                    'url': 'entry:%d' % i,
+                    'ie_key': 'Entry',
+                } for i in range(6)],
+                'extractor': 'test:playlist',
+                'extractor_key': 'test:playlist',
+                'webpage_url': 'http://example.com',
+            })
+            # The videos of an entry take their slots before the following entries
+            self.assertEqual(ids, ['0', '10', '11', '12'])
+
+    def test_playlist_entries_in_archive(self):
+        archive = 'test_playlist_entries_archive.txt'
+        extracted = []
+
+        class EntryIE(InfoExtractor):
+            _VALID_URL = r'entry:(?P<id>\d+)'
+
+            def _real_extract(self, url):
+                video_id = self._match_id(url)
+                extracted.append(video_id)
+                return _make_result([{'url': TEST_URL}], id=video_id)
+
+        with open(archive, 'w') as f:
+            f.write('entry 1\nentry 3\n')
+        try:
+            ydl = YDL({'download_archive': archive})
+            ydl.add_info_extractor(EntryIE(ydl))
+            ydl.process_ie_result({
+                '_type': 'playlist',
+                'id': 'test',
+                'entries': [
+                    # The extractor is found from the URL
+                    {'_type': 'url', 'url': 'entry:1'},
+                    # The id is found from the URL
+                    {'_type': 'url', 'url': 'entry:2', 'ie_key': 'Entry'},
+                    {'_type': 'url', 'url': 'entry:3', 'ie_key': 'Entry'},
+                    {'_type': 'url', 'url': 'entry:4', 'ie_key': 'Entry', 'id': '4'},
+                ],
+                'extractor': 'test:playlist',
+                'extractor_key': 'test:playlist',
+                'webpage_url': 'http://example.com',
+            })
+        finally:
+            try_rm(archive)
+        self.assertEqual(extracted, ['2', '4'])
+        self.assertEqual(
+            [info['id'] for info in ydl.downloaded_info_dicts], ['2', '4'])
+
+    def _download_merged_formats(self, params):
+        """
+        Download a video and an audio format to merge, each of them is only
+        served once both are requested. Return the progress statuses.
+        """
+        requested = []
+        both_requested = threading.Event()
+
+        class StreamHandler(compat_http_server.BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                requested.append(self.path)
+                if len(requested) == 2:
+                    both_requested.set()
+                both_requested.wait(5)
+                data = MERGED_CONTENT[self.path]
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        class Server(socketserver.ThreadingMixIn, compat_http_server.HTTPServer):
+            daemon_threads = True
+
+        httpd = Server(('localhost', 0), StreamHandler)
+        server_thread = threading.Thread(target=httpd.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+
+        url = 'http://localhost:%d' % httpd.socket.getsockname()[1]
+        statuses = []
+        ydl = YoutubeDL(dict({
+            'outtmpl': 'test_merge.%(ext)s',
+            'progress_hooks': [lambda s: statuses.append(dict(s))],
+            'quiet': True,
+        }, **params))
+        try:
+            ydl.process_info({
+                'id': 'testid',
+                'title': 'test',
+                'ext': 'mp4',
+                'requested_formats': [
+                    {'format_id': 'video', 'url': url + '/video', 'ext': 'mp4'},
+                    {'format_id': 'audio', 'url': url + '/audio', 'ext': 'm4a'},
+                ],
+            })
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+        self.assertTrue(both_requested.is_set())
+
+        downloading = [s for s in statuses if s['status'] == 'downloading']
+        self.assertEqual(set(s['filename'] for s in downloading), set(['test_merge.mp4']))
+        downloaded = [s['downloaded_bytes'] for s in downloading]
+        self.assertEqual(downloaded, sorted(downloaded))
+        self.assertEqual(downloaded[-1], 8000)
+        self.assertEqual(downloading[-1]['total_bytes'], 8000)
+        self.assertEqual(
+            sorted(s['filename'] for s in statuses if s['status'] == 'finished'),
+            sorted(MERGED_FILES))
+        return statuses
+
+    def test_parallel_merge_downloads(self):
+        try:
+            # Not merged without ffmpeg
+            self._download_merged_formats({'ffmpeg_location': 'nonexistent-ffmpeg'})
+            for fn, path in zip(MERGED_FILES, ('/video', '/audio')):
+                with open(fn, 'rb') as f:
+                    self.assertEqual(f.read(), MERGED_CONTENT[path])
+        finally:
+            for fn in MERGED_FILES:
+                try_rm(fn)
+
+    @unittest.skipIf(sys.platform == 'win32', 'requires a POSIX shell')
+    def test_stream_merge(self):
+        tmp_dir = tempfile.mkdtemp()
+        ffmpeg = os.path.join(tmp_dir, 'ffmpeg')
+        with open(ffmpeg, 'w') as f:
+            f.write(FAKE_FFMPEG)
+        os.chmod(ffmpeg, 0o755)
+        try:
+            self._download_merged_formats({'ffmpeg_location': ffmpeg, 'stream_merge': True, 'cachedir': False})
+            with open('test_merge.mp4', 'rb') as f:
+                self.assertEqual(f.read(), MERGED_CONTENT['/video'] + MERGED_CONTENT['/audio'])
+            for fn in MERGED_FILES + ['test_merge.temp.mp4']:
+                self.assertFalse(os.path.exists(fn))
+        finally:
+            try_rm('test_merge.mp4')
+            shutil.rmtree(tmp_dir)
+
+    def test_postprocessor_workers(self):
+        archive = 'test_postprocessor_workers_archive.txt'
+        requested = []
+        video_3_requested = threading.Event()
+
+        class Handler(compat_http_server.BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                requested.append(self.path)
+                if self.path == '/3':
+                    video_3_requested.set()
+                self.send_response(200)
+                self.send_header('Content-Length', '10')
+                self.end_headers()
+                self.wfile.write(b'0123456789')
+
+        httpd = compat_http_server.HTTPServer(('localhost', 0), Handler)
+        server_thread = threading.Thread(target=httpd.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+        url = 'http://localhost:%d' % httpd.socket.getsockname()[1]
+
+        class VideoIE(InfoExtractor):
+            _VALID_URL = r'video:(?P<id>\d+)'
+
+            def _real_extract(self, url_):
+                video_id = self._match_id(url_)
+                return {'id': video_id, 'title': video_id, 'url': '%s/%s' % (url, video_id), 'ext': 'mp4'}
+
+        class TestPP(PostProcessor):
+            def run(self, info):
+                if info['id'] == '0':
+                    # Processed while the next videos are downloaded
+                    video_3_requested.wait(5)
+                elif info['id'] == '1':
+                    raise ValueError('invalid file')
+                return [], info
+
+        errors = []
+
+        class Logger(object):
+            def debug(self, msg):
+                pass
+
+            def warning(self, msg):
+                pass
+
+            def error(self, msg):
+                errors.append(msg)
+
+        try_rm(archive)
+        ydl = YoutubeDL({
+            'outtmpl': 'test_ppw_%(id)s.%(ext)s',
+            'download_archive': archive,
+            'postprocessor_workers': 2,
+            'ignoreerrors': True,
+            'logger': Logger(),
+        }, auto_init=False)
+        ydl.add_info_extractor(VideoIE(ydl))
+        ydl.add_post_processor(TestPP())
+        try:
+            retcode = ydl.download(['video:%d' % i for i in range(4)])
+            with open(archive) as f:
+                recorded = f.read()
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+            try_rm(archive)
+            for i in range(4):
+                try_rm('test_ppw_%d.mp4' % i)
+        self.assertTrue(video_3_requested.is_set())
+        self.assertEqual(requested, ['/0', '/1', '/2', '/3'])
+        self.assertEqual(retcode, 1)
+        self.assertEqual(errors, ['ERROR: 1: postprocessing: invalid file'])
+        # Recorded in the order of the downloads, without the failed video
+        self.assertEqual(recorded, 'video 0\nvideo 2\nvideo 3\n')
+
     def test_urlopen_no_file_protocol(self):
         # see https://github.com/rg3/youtube-dl/issues/8227
         ydl = YDL()
@@ -694,6 +1147,30 @@ class TestYoutubeDL(unittest.TestCase):
         downloaded = ydl.downloaded_info_dicts[0]
         self.assertEqual(downloaded['url'], TEST_URL)
 
+    def test_add_info_extractor_class(self):
+        ydl = YDL()
+        instances = []
+
+        class FooIE(InfoExtractor):
+            _VALID_URL = r'foo:'
+
+            def __init__(self, downloader=None):
+                super(FooIE, self).__init__(downloader)
+                instances.append(self)
+
+            def _real_extract(self, url):
+                return {'id': 'foo', 'title': 'foo', 'url': TEST_URL}
+
+        # Classes are only instantiated when one of their URLs is extracted
+        ydl.add_info_extractor(FooIE)
+        self.assertEqual(instances, [])
+        ydl.extract_info('foo:')
+        ydl.extract_info('foo:')
+        self.assertEqual(len(instances), 1)
+        self.assertTrue(ydl.get_info_extractor('Foo') is instances[0])
+        self.assertTrue(instances[0]._downloader is ydl)
+        self.assertEqual(ydl.downloaded_info_dicts[-1]['url'], TEST_URL)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -8,9 +8,19 @@ import sys
 import unittest
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from youtube_dl.aes import aes_decrypt, aes_encrypt, aes_cbc_decrypt, aes_decrypt_text
+from youtube_dl.aes import (
+    aes_cbc_decrypt,
+    aes_cbc_decrypt_bytes,
+    aes_cbc_encrypt_bytes,
+    aes_ctr_decrypt_bytes,
+    aes_decrypt,
+    aes_decrypt_text,
+    aes_encrypt,
+    key_expansion,
+)
 from youtube_dl.utils import bytes_to_intlist, intlist_to_bytes
 import base64
+import binascii
 
 # the encrypted data can be generate with 'devscripts/generate_aes_testdata.py'
 
@@ -51,5 +61,33 @@ class TestAES(unittest.TestCase):
         decrypted = (aes_decrypt_text(encrypted, password, 32))
         self.assertEqual(decrypted, self.secret_msg)
 
+    def test_cbc_bytes(self):
+        data = b"\x97\x92+\xe5\x0b\xc3\x18\x91ky9m&\xb3\xb5@\xe6'\xc2\x96.\xc8u\x88\xab9-[\x9e|\xf1\xcd"
+        key = iv = intlist_to_bytes(self.key)
+        for d in (data, bytearray(data), memoryview(data)):
+            decrypted = aes_cbc_decrypt_bytes(d, key, iv)
+            self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
+        self.assertEqual(aes_cbc_encrypt_bytes(self.secret_msg + b'\x08' * 8, key, iv), data)
+
+    def test_ctr_bytes(self):
+        # Same as the 16 bytes test of test_decrypt_text
+        key = intlist_to_bytes(aes_encrypt(self.key, key_expansion(self.key)))
+        counter = intlist_to_bytes(self.iv[:8]) + b'\0' * 8
+        encrypted = b'\x17\x15\x93\xab\x8d\x80V\xcdV\xe0\t\xcdo\xc2\xa5\xd8ksM\r\xe27N\xae'
+        self.assertEqual(aes_ctr_decrypt_bytes(encrypted, key, counter), self.secret_msg)
+        self.assertEqual(aes_ctr_decrypt_bytes(self.secret_msg, key, counter), encrypted)
+
+    def test_key_sizes(self):
+        # Example vectors of FIPS-197, appendix C
+        msg = bytes_to_intlist(binascii.unhexlify('00112233445566778899aabbccddeeff'))
+        for key_size, cipher in (
+                (16, '69c4e0d86a7b0430d8cdb78070b4c55a'),
+                (24, 'dda97ca4864cdfe06eaf70a0ec0d7191'),
+                (32, '8ea2b7ca516745bfeafc49904b496089')):
+            expanded_key = key_expansion(list(range(key_size)))
+            encrypted = aes_encrypt(msg, expanded_key)
+            self.assertEqual(encrypted, bytes_to_intlist(binascii.unhexlify(cipher)))
+            self.assertEqual(aes_decrypt(encrypted, expanded_key), msg)
+
 if __name__ == '__main__':
     unittest.main()
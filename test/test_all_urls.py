@@ -8,6 +8,9 @@ import sys
 import unittest
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import shutil
+import subprocess
+import tempfile
 
 from test.helper import gettestcases
 
@@ -16,6 +19,11 @@ from youtube_dl.extractor import (
     gen_extractors,
     YoutubeIE,
 )
+from youtube_dl.extractor import youtube
+from youtube_dl.extractor.dispatch import (
+    url_keys,
+    URLDispatchIndex,
+)
 
 
 class TestAllURLsMatching(unittest.TestCase):
@@ -96,6 +104,66 @@ class TestAllURLsMatching(unittest.TestCase):
                         ie.suitable(url),
                         '%s should not match URL %r . That URL belongs to %s.' % (type(ie).__name__, url, tc['name']))
 
+    def test_url_index(self):
+        index = URLDispatchIndex(self.ies)
+        urls = [tc['url'] for tc in gettestcases(include_onlymatching=True)]
+        urls += [url.upper() for url in urls] + [
+            'BaW_jenozKc', 'ytsearch5:test', ':ytsubs', 'http://example.com/vid\xe9o.mp4']
+        for url in urls:
+            # The index must not change which extractors match, nor their order
+            self.assertEqual(
+                [ie.IE_NAME for ie in index.candidates(url) if ie.suitable(url)],
+                [ie.IE_NAME for ie in self.ies if ie.suitable(url)], url)
+
+    def test_url_keys(self):
+        self.assertEqual(
+            url_keys(r'https?://(?:www\.)?dailymotion\.com/video/(?P<id>[^/?_]+)'),
+            set(['dailymotion']))
+        self.assertEqual(
+            url_keys(r'https?://(?:[^/]+\.)?(?:foo|ba-quux)\.tv/(?P<id>\d+)'),
+            set(['foo', 'quux']))
+        self.assertEqual(url_keys(r'(?i)https?://Example\.COM/'), set(['example']))
+        # The word may be longer when followed by anything
+        self.assertEqual(url_keys(r'(?:https?://)?(?:www\.)?clip'), None)
+        self.assertEqual(url_keys(r'(?:https?://)?(?:www\.)?clip(?:s)?[./]'), set(['clip', 'clips']))
+        self.assertEqual(url_keys(r'(?:https?://.+|(?P<id>\d+))'), None)
+        self.assertEqual(url_keys(r'.*'), None)
+
+    def test_lazy_extractors(self):
+        root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            fn = os.path.join(tmp_dir, 'lazy_extractors.py')
+            subprocess.check_call([
+                sys.executable, os.path.join(root_dir, 'devscripts', 'make_lazy_extractors.py'), fn])
+            # Compiled from bytes, python 2 refuses the encoding declaration
+            # of a unicode string
+            with open(fn, 'rb') as f:
+                lazy_module = {}
+                exec(compile(f.read(), fn, 'exec'), lazy_module)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+        lazy_classes = lazy_module['_ALL_CLASSES']
+        self.assertEqual(
+            [(klass.ie_key(), klass.IE_NAME) for klass in lazy_classes],
+            [(ie.ie_key(), ie.IE_NAME) for ie in self.ies])
+        # The lazy classes are only replaced by the real ones when needed
+        youtube_ie = lazy_module['YoutubeIE']
+        self.assertFalse('_real_class' in youtube_ie.__dict__)
+        self.assertTrue(youtube_ie.suitable('https://www.youtube.com/watch?v=BaW_jenozKc'))
+        self.assertFalse('_real_class' in youtube_ie.__dict__)
+        self.assertTrue(isinstance(youtube_ie(), youtube.YoutubeIE))
+        self.assertEqual(youtube_ie._TESTS, youtube.YoutubeIE._TESTS)
+
+        index = URLDispatchIndex(lazy_classes)
+        urls = [tc['url'] for tc in gettestcases(include_onlymatching=True)]
+        urls += [url.upper() for url in urls] + ['BaW_jenozKc', 'ytsearch5:test', ':ytsubs']
+        for url in urls:
+            self.assertEqual(
+                [klass.IE_NAME for klass in index.candidates(url) if klass.suitable(url)],
+                [ie.IE_NAME for ie in self.ies if ie.suitable(url)], url)
+
     def test_keywords(self):
         self.assertMatch(':ytsubs', ['youtube:subscriptions'])
         self.assertMatch(':ytsubscriptions', ['youtube:subscriptions'])
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+from test.helper import FakeYDL, try_rm
+from youtube_dl.archive import (
+    DownloadArchive,
+    guess_archive_format,
+    open_download_archive,
+    sqlite3,
+    SQLiteDownloadArchive,
+)
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestDownloadArchive(unittest.TestCase):
+    def setUp(self):
+        self.text_fn = os.path.join(TEST_DIR, 'test_archive.txt')
+        self.sqlite_fn = os.path.join(TEST_DIR, 'test_archive.sqlite')
+        self.tearDown()
+
+    def tearDown(self):
+        try_rm(self.text_fn)
+        try_rm(self.sqlite_fn)
+
+    def _test_archive(self, archive_class, fn):
+        archive = archive_class(fn)
+        self.assertFalse('youtube abc' in archive)
+        archive.add('youtube abc')
+        archive.add('vimeo 123')
+        self.assertTrue('youtube abc' in archive)
+        self.assertTrue('vimeo 123' in archive)
+        self.assertFalse('youtube 123' in archive)
+        archive.close()
+
+        archive = archive_class(fn)
+        self.assertTrue('youtube abc' in archive)
+        self.assertTrue('vimeo 123' in archive)
+        archive.close()
+
+    def test_text(self):
+        self._test_archive(DownloadArchive, self.text_fn)
+        with open(self.text_fn) as f:
+            self.assertEqual(f.read(), 'youtube abc\nvimeo 123\n')
+
+    def test_text_whitespace(self):
+        with open(self.text_fn, 'w') as f:
+            f.write('youtube abc  \r\nvimeo 123')
+        archive = DownloadArchive(self.text_fn)
+        self.assertTrue('youtube abc' in archive)
+        self.assertTrue('vimeo 123' in archive)
+
+    @unittest.skipIf(sqlite3 is None, 'sqlite3 is not available')
+    def test_sqlite(self):
+        self._test_archive(SQLiteDownloadArchive, self.sqlite_fn)
+        # Recording a video twice is not an error
+        archive = SQLiteDownloadArchive(self.sqlite_fn)
+        archive.add('youtube abc')
+        archive.close()
+
+    @unittest.skipIf(sqlite3 is None, 'sqlite3 is not available')
+    def test_guess_format(self):
+        self.assertEqual(guess_archive_format(self.text_fn), 'text')
+        self.assertEqual(guess_archive_format(self.sqlite_fn), 'sqlite')
+        SQLiteDownloadArchive(self.sqlite_fn).add('youtube abc')
+        os.rename(self.sqlite_fn, self.text_fn)
+        self.assertEqual(guess_archive_format(self.text_fn), 'sqlite')
+        archive = open_download_archive(self.text_fn)
+        self.assertTrue(isinstance(archive, SQLiteDownloadArchive))
+        self.assertTrue('youtube abc' in archive)
+        archive.close()
+
+    def test_guess_format_existing_text(self):
+        # An existing text archive named like a database
+        db_fn = os.path.join(TEST_DIR, 'test_archive.db')
+        try:
+            self.assertEqual(guess_archive_format(db_fn), 'sqlite')
+            with open(db_fn, 'w') as f:
+                f.write('youtube abc\n')
+            self.assertEqual(guess_archive_format(db_fn), 'text')
+            archive = open_download_archive(db_fn)
+            self.assertTrue(isinstance(archive, DownloadArchive))
+            self.assertTrue('youtube abc' in archive)
+        finally:
+            try_rm(db_fn)
+
+    def test_youtubedl(self):
+        ydl = FakeYDL({'download_archive': self.text_fn})
+        info_dict = {'id': 'abc', 'extractor_key': 'Youtube'}
+        self.assertFalse(ydl.in_download_archive(info_dict))
+        ydl.record_download_archive(info_dict)
+        self.assertTrue(ydl.in_download_archive(info_dict))
+        # Playlist entries are identified with their ie_key
+        self.assertTrue(ydl.in_download_archive({'id': 'abc', 'ie_key': 'Youtube'}))
+        self.assertFalse(ydl.in_download_archive({'id': 'abc', 'ie_key': 'Vimeo'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gzip
+import io
+import threading
+
+from youtube_dl import YoutubeDL
+from youtube_dl.asyncnet import (
+    HTTPResponseParser,
+    asyncio,
+    get_client,
+    is_available,
+)
+from youtube_dl.compat import (
+    compat_HTTPError,
+    compat_http_server,
+)
+
+try:
+    import socketserver
+except ImportError:  # Python 2
+    import SocketServer as socketserver
+
+
+def gzip_compress(data):
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb') as f:
+        f.write(data)
+    return buf.getvalue()
+
+
+class HTTPTestRequestHandler(compat_http_server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Number of requests and connections served so far
+    requests = 0
+    connections = 0
+    cookies = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        compat_http_server.BaseHTTPRequestHandler.setup(self)
+        HTTPTestRequestHandler.connections += 1
+
+    def _send(self, content, headers=[], status=200):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        HTTPTestRequestHandler.requests += 1
+        if self.path.startswith('/plain'):
+            self._send(self.path.encode('ascii'))
+        elif self.path == '/chunked':
+            self.send_response(200)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for chunk in (b'hello ', b'chunked ', b'world'):
+                self.wfile.write(('%x\r\n' % len(chunk)).encode('ascii') + chunk + b'\r\n')
+            self.wfile.write(b'0\r\n\r\n')
+        elif self.path == '/gzip':
+            self._send(gzip_compress(b'gzipped' * 100), [('Content-Encoding', 'gzip')])
+        elif self.path == '/loop':
+            self._send(b'redirect body', [('Location', '/loop')], 302)
+        elif self.path == '/redirect':
+            self._send(b'', [('Location', '/plain?redirected'), ('Set-Cookie', 'foo=bar; path=/')], 302)
+        elif self.path == '/cookie':
+            HTTPTestRequestHandler.cookies.append(self.headers.get('Cookie'))
+            self._send(b'cookie')
+        elif self.path == '/missing':
+            self._send(b'missing', status=404)
+        else:
+            assert False
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, compat_http_server.HTTPServer):
+    daemon_threads = True
+    # Accept all the connections of test_concurrent at once
+    request_queue_size = 256
+
+
+class TestHTTPResponseParser(unittest.TestCase):
+    def _parse(self, data, step, method='GET'):
+        parser = HTTPResponseParser(method)
+        events = []
+        for i in range(0, len(data), step):
+            events.extend(parser.feed(data[i:i + step]))
+        body = b''.join(e[1] for e in events if e[0] == 'data')
+        return parser, [e[0] for e in events if e[0] != 'data'], body
+
+    def test_content_length(self):
+        data = b'HTTP/1.1 200 OK\r\nContent-Length: 5\r\nX-Foo: bar\r\n\r\nhello'
+        for step in (1, 7, len(data)):
+            parser, events, body = self._parse(data, step)
+            self.assertEqual(events, ['headers', 'end'])
+            self.assertEqual(body, b'hello')
+            self.assertEqual(parser.status, 200)
+            self.assertEqual(parser.get_header('x-foo'), 'bar')
+            self.assertTrue(parser.keep_alive)
+
+    def test_chunked(self):
+        data = (
+            b'HTTP/1.1 100 Continue\r\n\r\n'
+            b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\nConnection: close\r\n\r\n'
+            b'3\r\nabc\r\n5;ext=1\r\ndefgh\r\n0\r\nTrailer: x\r\n\r\n')
+        for step in (1, 4, len(data)):
+            parser, events, body = self._parse(data, step)
+            self.assertEqual(events, ['headers', 'end'])
+            self.assertEqual(body, b'abcdefgh')
+            self.assertFalse(parser.keep_alive)
+
+    def test_until_close(self):
+        parser, events, body = self._parse(b'HTTP/1.0 200 OK\r\n\r\nsome data', 3)
+        self.assertEqual(events, ['headers'])
+        self.assertEqual(body, b'some data')
+        self.assertEqual(parser.feed_eof(), [('end',)])
+        self.assertFalse(parser.keep_alive)
+
+    def test_no_body(self):
+        _, events, body = self._parse(b'HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n', 5, 'HEAD')
+        self.assertEqual(events, ['headers', 'end'])
+        _, events, body = self._parse(b'HTTP/1.1 304 Not Modified\r\n\r\n', 5)
+        self.assertEqual(events, ['headers', 'end'])
+
+
+@unittest.skipUnless(asyncio, 'asyncio is not available')
+class TestAsyncHTTPClient(unittest.TestCase):
+    def setUp(self):
+        self.httpd = ThreadingHTTPServer(('localhost', 0), HTTPTestRequestHandler)
+        self.port = self.httpd.socket.getsockname()[1]
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        HTTPTestRequestHandler.requests = 0
+        HTTPTestRequestHandler.connections = 0
+        HTTPTestRequestHandler.cookies = []
+        self.ydl = YoutubeDL({'proxy': ''})
+        self.client = get_client(self.ydl)
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _url(self, path):
+        return 'http://localhost:%d%s' % (self.port, path)
+
+    def test_fetch(self):
+        self.assertEqual(self.client.fetch(self._url('/plain')).body, b'/plain')
+        self.assertEqual(self.client.fetch(self._url('/chunked')).body, b'hello chunked world')
+        response = self.client.fetch(self._url('/gzip'))
+        self.assertEqual(response.body, b'gzipped' * 100)
+        self.assertFalse('Content-Encoding' in dict(response.headers))
+        with self.assertRaises(compat_HTTPError) as cm:
+            self.client.fetch(self._url('/missing'))
+        self.assertEqual(cm.exception.code, 404)
+        # A single connection is kept alive for all the requests
+        self.assertEqual(HTTPTestRequestHandler.connections, 1)
+
+    def test_redirect_and_cookies(self):
+        response = self.client.fetch(self._url('/redirect'))
+        self.assertEqual(response.body, b'/plain?redirected')
+        self.assertEqual(response.url, self._url('/plain?redirected'))
+        self.client.fetch(self._url('/cookie'))
+        self.assertEqual(HTTPTestRequestHandler.cookies, ['foo=bar'])
+        # The cookies are shared with the YoutubeDL object
+        self.assertEqual([c.name for c in self.ydl.cookiejar], ['foo'])
+
+    def test_redirect_loop(self):
+        with self.assertRaises(compat_HTTPError) as cm:
+            self.client.fetch(self._url('/loop'))
+        self.assertEqual(cm.exception.code, 302)
+        # The first request and the redirects that were followed
+        self.assertEqual(HTTPTestRequestHandler.requests, 11)
+
+    def test_concurrent(self):
+        count = 200
+        cond = threading.Condition()
+        results = {}
+
+        def callback(i, response, exc):
+            with cond:
+                results[i] = (response, exc)
+                cond.notify_all()
+
+        def start():
+            for i in range(count):
+                self.client.start_fetch(
+                    self._url('/plain%d' % i),
+                    lambda response, exc, i=i: callback(i, response, exc))
+
+        self.client.loop_thread.call_soon(start)
+        with cond:
+            while len(results) < count:
+                cond.wait(1)
+        for i in range(count):
+            response, exc = results[i]
+            self.assertEqual(exc, None)
+            self.assertEqual(response.body, ('/plain%d' % i).encode('ascii'))
+        self.assertEqual(HTTPTestRequestHandler.requests, count)
+
+    def test_is_available(self):
+        self.assertTrue(is_available({'proxy': ''}))
+        self.assertFalse(is_available({'proxy': 'http://localhost:3128'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,7 @@
 from __future__ import unicode_literals
 
 import shutil
+import threading
 
 # Allow direct execution
 import os
@@ -54,6 +55,43 @@ class TestCache(unittest.TestCase):
         self.assertFalse(os.path.exists(self.test_dir))
         self.assertEqual(c.load('test_cache', 'k.'), None)
 
+    def test_compressed(self):
+        ydl = FakeYDL({
+            'cachedir': self.test_dir,
+        })
+        c = Cache(ydl)
+        obj = 'function ä(a){return a}' * 100
+        self.assertEqual(c.load('test_cache', 'k', dtype='json.gz'), None)
+        c.store('test_cache', 'k', obj, dtype='json.gz')
+        self.assertEqual(c.load('test_cache', 'k', dtype='json.gz'), obj)
+        self.assertEqual(c.load('test_cache', 'k'), None)
+        fn = os.path.join(self.test_dir, 'test_cache', 'k.json.gz')
+        self.assertTrue(os.path.getsize(fn) < len(obj))
+
+    def test_update(self):
+        ydl = FakeYDL({
+            'cachedir': self.test_dir,
+        })
+
+        def add_key(key):
+            def func(data):
+                data = dict(data or {})
+                data[key] = True
+                return data
+            return func
+
+        # Every thread has its own Cache, like separate processes
+        threads = [
+            threading.Thread(
+                target=Cache(ydl).update, args=('test_cache', 'k', add_key('%d' % i)))
+            for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(
+            Cache(ydl).load('test_cache', 'k'), dict(('%d' % i, True) for i in range(8)))
+
 
 if __name__ == '__main__':
     unittest.main()
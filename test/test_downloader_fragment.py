@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+
+from test.helper import try_rm
+from youtube_dl import YoutubeDL
+from youtube_dl import asyncnet
+from youtube_dl.asyncnet import asyncio
+from youtube_dl.aes import aes_cbc_encrypt_bytes, BLOCK_SIZE_BYTES
+from youtube_dl.compat import (
+    compat_HTTPError,
+    compat_http_server,
+)
+from youtube_dl.downloader.dash import DashSegmentsFD
+from youtube_dl.downloader.hls import NativeHlsFD
+from youtube_dl.utils import struct_pack
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+FRAGMENTS = [('%d' % i).encode('ascii') * (1000 + i * 37) for i in range(20)]
+KEYS = [b'0123456789abcdef', b'fedcba9876543210']
+IV = b'\x01' * 16
+# The IV of the segments without an explicit IV is their media sequence number
+MEDIA_SEQUENCE = 7
+
+
+def aes_cbc_encrypt(data, key, iv):
+    # PKCS#7 padding
+    padding_length = BLOCK_SIZE_BYTES - len(data) % BLOCK_SIZE_BYTES
+    data += struct_pack('B', padding_length) * padding_length
+    return aes_cbc_encrypt_bytes(data, key, iv)
+
+
+def encrypted_fragment(frag_index):
+    # The first half of the fragments use the first key and IV, the second
+    # half the second key and the media sequence IV
+    if frag_index < len(FRAGMENTS) // 2:
+        return aes_cbc_encrypt(FRAGMENTS[frag_index], KEYS[0], IV)
+    return aes_cbc_encrypt(
+        FRAGMENTS[frag_index], KEYS[1],
+        struct_pack('>8xq', MEDIA_SEQUENCE + frag_index))
+
+
+class HTTPTestRequestHandler(compat_http_server.BaseHTTPRequestHandler):
+    # Fragments requested so far and fragments to fail once with 404
+    requested = []
+    broken = set()
+    keys_requested = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, content, content_type='video/MP2T'):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        if self.path == '/index.m3u8':
+            self._send(
+                b'#EXTM3U\n#EXT-X-TARGETDURATION:10\n' +
+                ''.join('#EXTINF:10,\nfrag%d.ts\n' % i for i in range(len(FRAGMENTS))).encode('ascii') +
+                b'#EXT-X-ENDLIST\n', 'application/vnd.apple.mpegurl')
+        elif self.path == '/encrypted.m3u8':
+            half = len(FRAGMENTS) // 2
+            self._send(
+                ('#EXTM3U\n#EXT-X-TARGETDURATION:10\n#EXT-X-MEDIA-SEQUENCE:%d\n' % MEDIA_SEQUENCE +
+                 '#EXT-X-KEY:METHOD=AES-128,URI="key0",IV=0x%s\n' % ('01' * 16) +
+                 ''.join('#EXTINF:10,\nencrypted%d.ts\n' % i for i in range(half)) +
+                 '#EXT-X-KEY:METHOD=AES-128,URI="/key1"\n' +
+                 ''.join('#EXTINF:10,\nencrypted%d.ts\n' % i for i in range(half, len(FRAGMENTS))) +
+                 '#EXT-X-ENDLIST\n').encode('ascii'), 'application/vnd.apple.mpegurl')
+        elif self.path == '/missing-key.m3u8':
+            self._send(
+                b'#EXTM3U\n#EXT-X-TARGETDURATION:10\n#EXT-X-KEY:METHOD=AES-128,URI="/missing-key"\n' +
+                b'#EXTINF:10,\nencrypted0.ts\n#EXT-X-ENDLIST\n', 'application/vnd.apple.mpegurl')
+        elif self.path == '/missing-key':
+            self.send_response(404)
+            self.end_headers()
+        elif self.path.startswith('/key'):
+            key_index = int(self.path[len('/key'):])
+            self.keys_requested.append(key_index)
+            self._send(KEYS[key_index], 'application/octet-stream')
+        elif self.path.startswith('/encrypted'):
+            self._send(encrypted_fragment(int(self.path[len('/encrypted'):-len('.ts')])))
+        elif self.path.startswith('/frag'):
+            frag_index = int(self.path[len('/frag'):-len('.ts')])
+            self.requested.append(frag_index)
+            if frag_index in self.broken:
+                self.broken.remove(frag_index)
+                self.send_response(404)
+                self.end_headers()
+                return
+            self._send(FRAGMENTS[frag_index])
+        else:
+            assert False
+
+
+class FakeLogger(object):
+    def debug(self, msg):
+        pass
+
+    def warning(self, msg):
+        pass
+
+    def error(self, msg):
+        pass
+
+
+ASYNC_PARAMS = {'concurrent_fragment_downloads': 4, 'async_network': True, 'proxy': ''}
+
+
+class TestFragmentDownloader(unittest.TestCase):
+    def setUp(self):
+        self.httpd = compat_http_server.HTTPServer(
+            ('localhost', 0), HTTPTestRequestHandler)
+        self.port = self.httpd.socket.getsockname()[1]
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        self.filename = os.path.join(TEST_DIR, 'test_fragment.mp4')
+        HTTPTestRequestHandler.requested = []
+        HTTPTestRequestHandler.broken = set()
+        HTTPTestRequestHandler.keys_requested = []
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        for fn in (self.filename, self.filename + '.part', self.filename + '.ytdl'):
+            try_rm(fn)
+
+    def _download(self, fd_class, info_dict, params={}, fragments=FRAGMENTS):
+        ydl = YoutubeDL({'logger': FakeLogger(), 'proxy': params.get('proxy')})
+        downloaded = []
+
+        def hook(s):
+            if s['status'] == 'downloading':
+                downloaded.append(s['downloaded_bytes'])
+
+        fd = fd_class(ydl, dict({'quiet': True, 'noprogress': True}, **params))
+        fd.add_progress_hook(hook)
+        self.assertTrue(fd.download(self.filename, info_dict))
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b''.join(FRAGMENTS))
+        # The aggregated progress must never go backwards or overshoot
+        self.assertEqual(downloaded, sorted(downloaded))
+        self.assertEqual(downloaded[-1], sum(len(f) for f in fragments))
+        self.assertEqual(
+            [f for f in os.listdir(TEST_DIR) if f.startswith('test_fragment.mp4')],
+            ['test_fragment.mp4'])
+
+    def _test_hls(self, params):
+        self._download(NativeHlsFD, {
+            'url': 'http://localhost:%d/index.m3u8' % self.port,
+        }, params)
+
+    def _test_dash(self, params):
+        self._download(DashSegmentsFD, {
+            'url': 'http://localhost:%d/' % self.port,
+            'segment_urls': ['frag%d.ts' % i for i in range(len(FRAGMENTS))],
+        }, params)
+
+    def test_hls(self):
+        self._test_hls({})
+
+    def test_hls_concurrent(self):
+        self._test_hls({'concurrent_fragment_downloads': 4})
+
+    @unittest.skipUnless(asyncio, 'asyncio is not available')
+    def test_hls_async(self):
+        self._test_hls(ASYNC_PARAMS)
+
+    @unittest.skipUnless(asyncio, 'asyncio is not available')
+    def test_async_fallback(self):
+        get_client = asyncnet.get_client
+        clients = []
+
+        def counting_get_client(ydl):
+            clients.append(ydl)
+            return get_client(ydl)
+
+        asyncnet.get_client = counting_get_client
+        try:
+            # The rate limit is only applied by the threaded downloads
+            self._test_hls(dict(ASYNC_PARAMS, ratelimit=10 ** 9))
+            self.assertEqual(clients, [])
+            try_rm(self.filename)
+            self._test_hls(ASYNC_PARAMS)
+            self.assertEqual(len(clients), 1)
+        finally:
+            asyncnet.get_client = get_client
+
+    @unittest.skipUnless(asyncio, 'asyncio is not available')
+    def test_async_progress(self):
+        statuses = []
+        ydl = YoutubeDL({'logger': FakeLogger(), 'proxy': ''})
+        fd = NativeHlsFD(ydl, dict({'quiet': True, 'noprogress': True}, **ASYNC_PARAMS))
+        fd.add_progress_hook(statuses.append)
+        self.assertTrue(fd.download(self.filename, {
+            'url': 'http://localhost:%d/index.m3u8' % self.port,
+        }))
+        # The progress of the fragments being downloaded is reported, not
+        # only the completed fragments
+        self.assertTrue(any(
+            s['status'] == 'downloading' and 'speed' in s for s in statuses))
+
+    def test_dash(self):
+        self._test_dash({})
+
+    def test_dash_concurrent(self):
+        self._test_dash({'concurrent_fragment_downloads': 4})
+
+    def _test_hls_encrypted(self, params):
+        self._download(NativeHlsFD, {
+            'url': 'http://localhost:%d/encrypted.m3u8' % self.port,
+        }, params, [encrypted_fragment(i) for i in range(len(FRAGMENTS))])
+        # Every key is only downloaded once
+        self.assertEqual(HTTPTestRequestHandler.keys_requested, [0, 1])
+
+    def test_hls_encrypted(self):
+        self._test_hls_encrypted({})
+
+    def test_hls_encrypted_concurrent(self):
+        self._test_hls_encrypted({'concurrent_fragment_downloads': 4})
+
+    @unittest.skipUnless(asyncio, 'asyncio is not available')
+    def test_hls_encrypted_async(self):
+        self._test_hls_encrypted(ASYNC_PARAMS)
+
+    def test_hls_encrypted_resume(self):
+        # The first half of the fragments, encrypted with the first key, was
+        # written by an interrupted download
+        half = len(FRAGMENTS) // 2
+        with open(self.filename + '.part', 'wb') as f:
+            f.write(b''.join(FRAGMENTS[:half]))
+        with open(self.filename + '.ytdl', 'w') as f:
+            f.write('{"fragment_download": {"fragment_index": %d, "byte_offset": %d}}' % (
+                half, sum(len(f) for f in FRAGMENTS[:half])))
+        self._download(NativeHlsFD, {
+            'url': 'http://localhost:%d/encrypted.m3u8' % self.port,
+        }, {}, FRAGMENTS[:half] + [encrypted_fragment(i) for i in range(half, len(FRAGMENTS))])
+        self.assertEqual(HTTPTestRequestHandler.keys_requested, [1])
+
+    def test_hls_missing_key(self):
+        errors = []
+
+        class Logger(FakeLogger):
+            def error(self, msg):
+                errors.append(msg)
+
+        ydl = YoutubeDL({'logger': Logger(), 'ignoreerrors': True})
+        fd = NativeHlsFD(ydl, {'quiet': True, 'noprogress': True})
+        self.assertFalse(fd.download(self.filename, {
+            'url': 'http://localhost:%d/missing-key.m3u8' % self.port,
+        }))
+        self.assertEqual(len(errors), 1)
+        self.assertTrue('unable to download key' in errors[0])
+
+    def test_hls_can_download(self):
+        self.assertTrue(NativeHlsFD.can_download('#EXTM3U\n#EXT-X-KEY:METHOD=AES-128,URI="key"\n'))
+        self.assertTrue(NativeHlsFD.can_download('#EXTM3U\n#EXT-X-KEY:METHOD=NONE\n'))
+        self.assertFalse(NativeHlsFD.can_download('#EXTM3U\n#EXT-X-KEY:METHOD=SAMPLE-AES,URI="key"\n'))
+        self.assertFalse(NativeHlsFD.can_download('#EXTM3U\n#EXT-X-BYTERANGE:1000@0\n'))
+
+    def _test_resume(self, params):
+        HTTPTestRequestHandler.broken.add(12)
+        ydl = YoutubeDL({'logger': FakeLogger(), 'proxy': params.get('proxy')})
+        fd = NativeHlsFD(ydl, dict({'quiet': True, 'noprogress': True}, **params))
+        self.assertRaises(compat_HTTPError, fd.download, self.filename, {
+            'url': 'http://localhost:%d/index.m3u8' % self.port,
+        })
+        self.assertTrue(os.path.exists(self.filename + '.ytdl'))
+
+        HTTPTestRequestHandler.requested = []
+        self._test_hls(params)
+        self.assertEqual(
+            sorted(HTTPTestRequestHandler.requested), list(range(12, len(FRAGMENTS))))
+        self.assertFalse(os.path.exists(self.filename + '.ytdl'))
+
+    def test_http_segments_marker(self):
+        # Left by an interrupted HttpFD download of the same file
+        with open(self.filename + '.part', 'wb') as f:
+            f.write(b'\0' * 10000)
+        with open(self.filename + '.ytdl', 'w') as f:
+            f.write('{"http_segments": 2}')
+        warnings = []
+
+        class Logger(FakeLogger):
+            def warning(self, msg):
+                warnings.append(msg)
+
+        ydl = YoutubeDL({'logger': Logger()})
+        fd = NativeHlsFD(ydl, {'quiet': True, 'noprogress': True})
+        self.assertTrue(fd.download(self.filename, {
+            'url': 'http://localhost:%d/index.m3u8' % self.port,
+        }))
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b''.join(FRAGMENTS))
+        self.assertEqual(warnings, [])
+        self.assertEqual(sorted(HTTPTestRequestHandler.requested), list(range(len(FRAGMENTS))))
+
+    def test_resume(self):
+        self._test_resume({})
+
+    def test_resume_concurrent(self):
+        self._test_resume({'concurrent_fragment_downloads': 4})
+
+    @unittest.skipUnless(asyncio, 'asyncio is not available')
+    def test_resume_async(self):
+        self._test_resume(ASYNC_PARAMS)
+
+
+if __name__ == '__main__':
+    unittest.main()
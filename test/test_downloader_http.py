@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import re
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+
+from test.helper import try_rm
+from youtube_dl import YoutubeDL
+from youtube_dl.compat import compat_http_server
+from youtube_dl.downloader.http import HttpFD
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+TEST_SIZE = 100 * 1024
+TEST_DATA = bytes(bytearray(i % 251 for i in range(TEST_SIZE)))
+
+
+class HTTPTestRequestHandler(compat_http_server.BaseHTTPRequestHandler):
+    # Range headers of the requests received so far
+    requested = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_content_range(self, total=None):
+        range_header = self.headers.get('Range')
+        start = end = None
+        if range_header:
+            mobj = re.search(r'^bytes=(\d+)-(\d+)?', range_header)
+            if mobj:
+                start = int(mobj.group(1))
+                end = int(mobj.group(2)) if mobj.group(2) else total - 1
+        valid_range = start is not None and end is not None
+        if valid_range:
+            content_range = 'bytes %d-%d' % (start, end)
+            if total:
+                content_range += '/%d' % total
+            self.send_header('Content-Range', content_range)
+        return (end - start + 1) if valid_range else total
+
+    def serve(self, range=True, content_length=True):
+        self.requested.append(self.headers.get('Range'))
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        size = TEST_SIZE
+        if range:
+            self.send_header('Accept-Ranges', 'bytes')
+            size = self.send_content_range(TEST_SIZE)
+        if content_length:
+            self.send_header('Content-Length', str(size))
+        self.end_headers()
+        range_header = self.headers.get('Range')
+        start = 0
+        if range and range_header:
+            start = int(re.search(r'^bytes=(\d+)-', range_header).group(1))
+        self.wfile.write(TEST_DATA[start:start + size])
+
+    def do_GET(self):
+        if self.path == '/regular':
+            self.serve()
+        elif self.path == '/no-content-length':
+            self.serve(content_length=False)
+        elif self.path == '/no-range':
+            self.serve(range=False)
+        elif self.path == '/no-range-no-content-length':
+            self.serve(range=False, content_length=False)
+        else:
+            assert False
+
+
+class FakeLogger(object):
+    def debug(self, msg):
+        pass
+
+    def warning(self, msg):
+        pass
+
+    def error(self, msg):
+        pass
+
+
+class TestHttpFD(unittest.TestCase):
+    def setUp(self):
+        self.httpd = compat_http_server.HTTPServer(
+            ('127.0.0.1', 0), HTTPTestRequestHandler)
+        self.port = self.httpd.socket.getsockname()[1]
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        self.filename = os.path.join(TEST_DIR, 'test_http.mp4')
+        HTTPTestRequestHandler.requested = []
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        for fn in (self.filename, self.filename + '.part', self.filename + '.ytdl'):
+            try_rm(fn)
+
+    def download(self, params, ep):
+        params['logger'] = FakeLogger()
+        ydl = YoutubeDL(params)
+        downloader = HttpFD(ydl, params)
+        # Allow small segments so that the test file is split
+        downloader._MIN_SEGMENT_SIZE = 1024
+        self.assertTrue(downloader.real_download(self.filename, {
+            'url': 'http://127.0.0.1:%d/%s' % (self.port, ep),
+        }))
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), TEST_DATA)
+        self.assertFalse(os.path.exists(self.filename + '.ytdl'))
+        try_rm(self.filename)
+
+    def download_all(self, params):
+        for ep in ('regular', 'no-content-length', 'no-range', 'no-range-no-content-length'):
+            self.download(params, ep)
+
+    def test_regular(self):
+        self.download_all({})
+
+    def test_connections(self):
+        self.download_all({'http_connections': 4})
+        self.download({'http_connections': 4}, 'regular')
+        self.assertEqual(HTTPTestRequestHandler.requested[-4], None)
+        self.assertEqual(
+            sorted(r for r in HTTPTestRequestHandler.requested[-3:]),
+            ['bytes=25600-51199', 'bytes=51200-76799', 'bytes=76800-102399'])
+
+    def test_chunked(self):
+        self.download_all({'http_chunk_size': 10000})
+        self.download({'http_chunk_size': 10000}, 'regular')
+        self.assertEqual(
+            HTTPTestRequestHandler.requested[-11:],
+            ['bytes=%d-%d' % (i, min(i + 9999, TEST_SIZE - 1)) for i in range(0, TEST_SIZE, 10000)])
+
+    def test_chunked_connections(self):
+        self.download_all({'http_chunk_size': 10000, 'http_connections': 4})
+        self.download({'http_chunk_size': 10000, 'http_connections': 2}, 'regular')
+        self.assertEqual(
+            sorted(HTTPTestRequestHandler.requested[-12:]),
+            sorted(['bytes=%d-%d' % (i, min(i + 9999, 51199)) for i in range(0, 51200, 10000)] +
+                   ['bytes=%d-%d' % (i, min(i + 9999, TEST_SIZE - 1)) for i in range(51200, TEST_SIZE, 10000)]))
+
+    def test_connections_resume(self):
+        with open(self.filename + '.part', 'wb') as f:
+            f.write(TEST_DATA[:10000])
+        self.download({'http_connections': 2}, 'regular')
+        self.assertEqual(HTTPTestRequestHandler.requested[0], 'bytes=10000-')
+        self.assertEqual(HTTPTestRequestHandler.requested[1], 'bytes=56200-102399')
+
+    def test_interrupted_connections(self):
+        # A leftover journal means the .part file may have holes
+        with open(self.filename + '.part', 'wb') as f:
+            f.write(b'\0' * 10000)
+        with open(self.filename + '.ytdl', 'w') as f:
+            f.write('{"http_segments": 2}')
+        self.download({'http_connections': 2}, 'regular')
+        self.assertEqual(HTTPTestRequestHandler.requested[0], None)
+
+    def test_fragment_journal(self):
+        # The journal of a fragmented download of the same file is not a
+        # segments marker, it's left alone
+        journal = '{"fragment_download": {"fragment_index": 1, "byte_offset": 10000}}'
+        with open(self.filename + '.part', 'wb') as f:
+            f.write(TEST_DATA[:10000])
+        with open(self.filename + '.ytdl', 'w') as f:
+            f.write(journal)
+        params = {'logger': FakeLogger()}
+        self.assertTrue(HttpFD(YoutubeDL(params), params).real_download(self.filename, {
+            'url': 'http://127.0.0.1:%d/regular' % self.port,
+        }))
+        self.assertEqual(HTTPTestRequestHandler.requested, ['bytes=10000-'])
+        with open(self.filename + '.ytdl') as f:
+            self.assertEqual(f.read(), journal)
+
+
+if __name__ == '__main__':
+    unittest.main()
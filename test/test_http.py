@@ -9,8 +9,16 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from youtube_dl import YoutubeDL
 from youtube_dl.compat import compat_http_server, compat_urllib_request
+import gzip
+import io
 import ssl
 import threading
+import zlib
+
+try:
+    import socketserver
+except ImportError:  # Python 2
+    import SocketServer as socketserver
 
 TEST_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -115,5 +123,179 @@ class TestProxy(unittest.TestCase):
         response = ydl.urlopen(req).read().decode('utf-8')
         self.assertEqual(response, 'cn: {0}'.format(url))
 
+
+class KeepAliveRequestHandler(compat_http_server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Requests served so far
+    requests = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.do_GET()
+
+    def do_GET(self):
+        KeepAliveRequestHandler.requests.append((self.command, self.path))
+        if self.path == '/big':
+            content = b'x' * 1000000
+        else:
+            content = ('%s %s' % (self.path, self.client_address[1])).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, compat_http_server.HTTPServer):
+    daemon_threads = True
+
+
+class TestKeepAlive(unittest.TestCase):
+    def setUp(self):
+        self.httpd = ThreadingHTTPServer(
+            ('localhost', 0), KeepAliveRequestHandler)
+        self.port = self.httpd.socket.getsockname()[1]
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        KeepAliveRequestHandler.requests = []
+
+    def _client_ports(self, ydl, paths):
+        ports = []
+        for path in paths:
+            response = ydl.urlopen('http://localhost:%d%s' % (self.port, path))
+            content_path, client_port = response.read().decode('utf-8').split(' ')
+            self.assertEqual(content_path, path)
+            ports.append(client_port)
+        return ports
+
+    def test_keep_alive(self):
+        ydl = YoutubeDL({'logger': FakeLogger()})
+        ports = self._client_ports(ydl, ['/a', '/b', '/c'])
+        self.assertEqual(len(set(ports)), 1)
+
+    def test_unread_response(self):
+        ydl = YoutubeDL({'logger': FakeLogger()})
+        url = 'http://localhost:%d/a' % self.port
+        first = ydl.urlopen(url)
+        # The first connection is still busy
+        second = ydl.urlopen(url)
+        self.assertNotEqual(first.read(), second.read())
+
+    def test_partially_read_response(self):
+        ydl = YoutubeDL({'logger': FakeLogger()})
+        url = 'http://localhost:%d' % self.port
+        for _ in range(3):
+            response = ydl.urlopen(url + '/big')
+            response.read(10)
+            response.close()
+        # The unread data isn't taken as the response of the next request
+        self.assertEqual(self._client_ports(ydl, ['/a']), self._client_ports(ydl, ['/b']))
+        self.assertEqual(
+            KeepAliveRequestHandler.requests,
+            [('GET', '/big')] * 3 + [('GET', '/a'), ('GET', '/b')])
+
+    def test_post_not_retried(self):
+        ydl = YoutubeDL({'logger': FakeLogger()})
+        url = 'http://localhost:%d' % self.port
+        get_port = self._client_ports(ydl, ['/a'])[0]
+        response = ydl.urlopen(compat_urllib_request.Request(url + '/post', data=b'data'))
+        # Sent on a new connection
+        self.assertNotEqual(response.read().decode('utf-8').split(' ')[1], get_port)
+        self.assertEqual(KeepAliveRequestHandler.requests, [('GET', '/a'), ('POST', '/post')])
+
+    def test_no_keep_alive(self):
+        ydl = YoutubeDL({'logger': FakeLogger(), 'keep_alive': False})
+        ports = self._client_ports(ydl, ['/a', '/b'])
+        self.assertEqual(len(set(ports)), 2)
+
+
+# Compresses well, but is larger than a single decompressed block
+COMPRESSION_TEST_DATA = b''.join(
+    ('line %d\n' % i).encode('ascii') for i in range(200000))
+
+
+def _gzip(data):
+    buf = io.BytesIO()
+    f = gzip.GzipFile(fileobj=buf, mode='wb')
+    f.write(data)
+    f.close()
+    return buf.getvalue()
+
+
+class CompressionRequestHandler(compat_http_server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == '/gzip':
+            encoding, content = 'gzip', _gzip(COMPRESSION_TEST_DATA)
+        elif self.path == '/gzip-trailing-junk':
+            encoding, content = 'gzip', _gzip(COMPRESSION_TEST_DATA) + b'\0junk' * 100
+        elif self.path == '/gzip-truncated':
+            content = _gzip(COMPRESSION_TEST_DATA)
+            encoding, content = 'gzip', content[:len(content) // 2]
+        elif self.path == '/gzip-empty':
+            encoding, content = 'gzip', b''
+        elif self.path == '/deflate':
+            encoding, content = 'deflate', zlib.compress(COMPRESSION_TEST_DATA)[2:-4]
+        elif self.path == '/deflate-zlib':
+            encoding, content = 'deflate', zlib.compress(COMPRESSION_TEST_DATA)
+        else:
+            assert False
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.httpd = compat_http_server.HTTPServer(
+            ('localhost', 0), CompressionRequestHandler)
+        self.port = self.httpd.socket.getsockname()[1]
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        self.ydl = YoutubeDL({'logger': FakeLogger()})
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _urlopen(self, path):
+        return self.ydl.urlopen('http://localhost:%d%s' % (self.port, path))
+
+    def test_decompression(self):
+        for path in ('/gzip', '/gzip-trailing-junk', '/deflate', '/deflate-zlib'):
+            response = self._urlopen(path)
+            self.assertEqual(response.headers.get('Content-Encoding'), None)
+            self.assertEqual(response.read(), COMPRESSION_TEST_DATA)
+
+    def test_incremental_read(self):
+        response = self._urlopen('/gzip')
+        self.assertEqual(response.readline(), b'line 0\n')
+        data = [b'line 0\n']
+        while True:
+            block = response.read(1000)
+            if not block:
+                break
+            self.assertTrue(len(block) <= 1000)
+            data.append(block)
+        self.assertEqual(b''.join(data), COMPRESSION_TEST_DATA)
+
+    @unittest.skipIf(sys.version_info < (3, 3), 'not detected by python 2')
+    def test_truncated(self):
+        self.assertRaises(IOError, self._urlopen('/gzip-truncated').read)
+
+    def test_empty(self):
+        self.assertEqual(self._urlopen('/gzip-empty').read(), b'')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shutil
+import tempfile
+import threading
+
+from youtube_dl import YoutubeDL
+from youtube_dl.compat import (
+    compat_cookiejar,
+    compat_http_server,
+)
+from youtube_dl.extractor.common import InfoExtractor
+from youtube_dl.httpcache import freshness_lifetime
+
+
+class HTTPTestRequestHandler(compat_http_server.BaseHTTPRequestHandler):
+    # Paths requested so far, with the If-None-Match header
+    requested = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, content, headers, content_type='text/html'):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        self.requested.append((self.path, self.headers.get('If-None-Match')))
+        if self.path.startswith('/fresh'):
+            self._send(b'fresh ' + self.path.encode('ascii'), [('Cache-Control', 'max-age=60')])
+        elif self.path == '/etag':
+            if self.headers.get('If-None-Match') == '"v1"':
+                self.send_response(304)
+                self.send_header('ETag', '"v1"')
+                self.end_headers()
+                return
+            self._send(b'etag', [('Cache-Control', 'no-cache'), ('ETag', '"v1"')])
+        elif self.path == '/uncacheable':
+            self._send(b'uncacheable', [])
+        elif self.path == '/cookie':
+            self._send(b'cookie', [('Cache-Control', 'max-age=60'), ('Set-Cookie', 'a=b')])
+        elif self.path == '/video':
+            self._send(b'\x00' * 100, [('Cache-Control', 'max-age=60')], 'video/mp4')
+        else:
+            assert False
+
+
+class FooIE(InfoExtractor):
+    _VALID_URL = r'foo:'
+
+
+class TestHTTPResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.httpd = compat_http_server.HTTPServer(
+            ('localhost', 0), HTTPTestRequestHandler)
+        self.port = self.httpd.socket.getsockname()[1]
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        self.cache_dir = tempfile.mkdtemp()
+        HTTPTestRequestHandler.requested = []
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        shutil.rmtree(self.cache_dir)
+
+    def _ydl(self, params={}):
+        return YoutubeDL(dict({
+            'http_cache': True,
+            'cachedir': self.cache_dir,
+        }, **params))
+
+    def _get(self, ydl, path, ttl=None):
+        resp = ydl.http_cache.urlopen('http://localhost:%d%s' % (self.port, path), ttl)
+        try:
+            return resp.read()
+        finally:
+            resp.close()
+
+    def _requested(self):
+        requested = HTTPTestRequestHandler.requested
+        HTTPTestRequestHandler.requested = []
+        return requested
+
+    def test_fresh(self):
+        ydl = self._ydl()
+        self.assertEqual(self._get(ydl, '/fresh'), b'fresh /fresh')
+        self.assertEqual(self._get(ydl, '/fresh'), b'fresh /fresh')
+        self.assertEqual(self._requested(), [('/fresh', None)])
+        # Stored on disk for the next runs
+        self.assertEqual(self._get(self._ydl(), '/fresh'), b'fresh /fresh')
+        self.assertEqual(self._requested(), [])
+        # The TTL replaces the lifetime given by the headers
+        self.assertEqual(self._get(self._ydl(), '/fresh', ttl=0), b'fresh /fresh')
+        self.assertEqual(self._requested(), [('/fresh', None)])
+
+    def test_revalidation(self):
+        ydl = self._ydl()
+        self.assertEqual(self._get(ydl, '/etag'), b'etag')
+        self.assertEqual(self._get(ydl, '/etag'), b'etag')
+        self.assertEqual(self._requested(), [('/etag', None), ('/etag', '"v1"')])
+        resp = ydl.http_cache.urlopen('http://localhost:%d/etag' % self.port)
+        self.assertEqual(resp.getcode(), 200)
+        self.assertEqual(resp.headers.get('Content-Type'), 'text/html')
+        self.assertEqual(resp.headers.get('Content-Length'), '4')
+
+    def test_not_stored(self):
+        ydl = self._ydl()
+        for path in ('/uncacheable', '/cookie', '/video'):
+            self._get(ydl, path)
+            self._get(ydl, path)
+            self.assertEqual(self._requested(), [(path, None)] * 2)
+        # Unless a TTL is given, for textual responses (the cookie set by
+        # /cookie would keep the requests of ydl out of the cache)
+        ydl = self._ydl()
+        self._get(ydl, '/uncacheable', ttl=60)
+        self._get(ydl, '/uncacheable', ttl=60)
+        self.assertEqual(self._requested(), [('/uncacheable', None)])
+        # Nothing is cached when the cache is disabled
+        ydl = self._ydl({'http_cache': False})
+        self._get(ydl, '/fresh')
+        self.assertEqual(self._requested(), [('/fresh', None)])
+
+    def test_cookies(self):
+        ydl = self._ydl()
+        self._get(ydl, '/fresh')
+        self._requested()
+        # A page requested with cookies may depend on them, it is neither
+        # taken from the cache nor stored
+        ydl = self._ydl()
+        ydl.cookiejar.set_cookie(compat_cookiejar.Cookie(
+            0, 'session', 'secret', None, False, 'localhost.local', False, False,
+            '/', False, False, None, True, None, None, {}))
+        self.assertEqual(self._get(ydl, '/fresh'), b'fresh /fresh')
+        self.assertEqual(self._get(ydl, '/fresh2'), b'fresh /fresh2')
+        self.assertEqual(self._requested(), [('/fresh', None), ('/fresh2', None)])
+        self._get(self._ydl(), '/fresh2')
+        self.assertEqual(self._requested(), [('/fresh2', None)])
+
+    def test_lru(self):
+        # Room for two responses
+        ydl = self._ydl({'http_cache_size': 600})
+        self._get(ydl, '/fresh1')
+        self._get(ydl, '/fresh2')
+        self._get(ydl, '/fresh1')
+        self._get(ydl, '/fresh3')
+        self.assertEqual(len(self._requested()), 3)
+        # fresh2 is the least recently used response
+        ydl = self._ydl({'http_cache_size': 600})
+        self._get(ydl, '/fresh1')
+        self._get(ydl, '/fresh3')
+        self.assertEqual(self._requested(), [])
+        self._get(ydl, '/fresh2')
+        self.assertEqual(self._requested(), [('/fresh2', None)])
+
+    def test_extractor_ttl(self):
+        ydl = self._ydl({'http_cache_ttl': {'foo': 60}})
+        ie = FooIE(ydl)
+        url = 'http://localhost:%d/uncacheable' % self.port
+        self.assertEqual(ie._download_webpage(url, None), 'uncacheable')
+        self.assertEqual(ie._download_webpage(url, None), 'uncacheable')
+        self.assertEqual(self._requested(), [('/uncacheable', None)])
+
+    def test_freshness_lifetime(self):
+        self.assertEqual(freshness_lifetime({'cache-control': 'private, max-age=300'}), 300)
+        self.assertEqual(freshness_lifetime({'cache-control': 'no-cache, max-age=300'}), 0)
+        self.assertEqual(freshness_lifetime({
+            'date': 'Sun, 06 Nov 1994 08:49:37 GMT',
+            'expires': 'Sun, 06 Nov 1994 09:49:37 GMT',
+        }), 3600)
+        self.assertEqual(freshness_lifetime({
+            'date': 'Sun, 06 Nov 1994 08:49:37 GMT',
+            'last-modified': 'Sun, 06 Nov 1994 07:49:37 GMT',
+        }), 360)
+        self.assertEqual(freshness_lifetime({'expires': '0'}), 0)
+        self.assertEqual(freshness_lifetime({}), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,9 @@ import sys
 import unittest
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from youtube_dl import jsinterp
 from youtube_dl.jsinterp import JSInterpreter
+from youtube_dl.utils import ExtractorError
 
 
 class TestJSInterpreter(unittest.TestCase):
@@ -73,8 +75,6 @@ class TestJSInterpreter(unittest.TestCase):
         self.assertEqual(jsi.call_function('f'), -11)
 
     def test_comments(self):
-        'Skipping: Not yet fully implemented'
-        return
         jsi = JSInterpreter('''
         function x() {
             var x = /* 1 + */ 2;
@@ -104,6 +104,58 @@ class TestJSInterpreter(unittest.TestCase):
         }''')
         self.assertEqual(jsi.call_function('x'), [20, 20, 30, 40, 50])
 
+    def test_strings(self):
+        jsi = JSInterpreter(r'''function f(){return "a\\\"b" + 'c\'d\x41\u0042;';}''')
+        self.assertEqual(jsi.call_function('f'), 'a\\"bc\'dAB;')
+
+    def test_builtins(self):
+        jsi = JSInterpreter('''
+        function f(a) {
+            a = a.split("");
+            a.reverse();
+            var b = a.splice(1, 2);
+            return [a.slice(1).join("") + b.join(""), a.length];
+        }''')
+        self.assertEqual(jsi.call_function('f', 'abcdef'), ['cbaed', 4])
+
+    def test_objects(self):
+        jsi = JSInterpreter('''
+        var Xy={ab:function(a,b){a.splice(0,b)},
+        cd:function(a){a.reverse()},
+        "ef":function(a,b){var c=a[0];a[0]=a[b%a.length];a[b%a.length]=c}};
+        var sig=function(a){a=a.split("");Xy.ef(a,7);Xy.ab(a,2);Xy.cd(a,20);return a.join("")};
+        ''')
+        self.assertEqual(jsi.call_function('sig', '0123456789'), '98065432')
+
+    def test_call(self):
+        jsi = JSInterpreter('''
+        function x(a, b) { return a * b; }
+        function y(a) { return x(a, 2) + x(a, 3); }
+        ''')
+        self.assertEqual(jsi.call_function('y', 4), 20)
+
+    def test_unsupported(self):
+        jsi = JSInterpreter('function f(a){if(a){return 1};return 2}')
+        self.assertRaises(ExtractorError, jsi.call_function, 'f', 1)
+
+    def test_interpret(self):
+        jsi = JSInterpreter('')
+        local_vars = {'a': [1, 2, 3]}
+        self.assertEqual(jsi.interpret_statement('var b = a.length * 2', local_vars), (6, False))
+        self.assertEqual(jsi.interpret_statement('return a[1] + b', local_vars), (8, True))
+        self.assertEqual(jsi.interpret_expression('', local_vars, 100), None)
+
+    def test_parse_cache(self):
+        code = 'function f(a){return a.split("").reverse().join("")}'
+        self.assertEqual(JSInterpreter(code).call_function('f', 'abc'), 'cba')
+        # The function is only parsed once for a given code
+        parser = jsinterp._JSParser
+        try:
+            jsinterp._JSParser = None
+            self.assertEqual(JSInterpreter(code).call_function('f', 'xyz'), 'zyx')
+        finally:
+            jsinterp._JSParser = parser
+
 
 if __name__ == '__main__':
     unittest.main()
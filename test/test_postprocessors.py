@@ -8,10 +8,144 @@ import sys
 import unittest
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from youtube_dl.postprocessor import MetadataFromTitlePP
+import shutil
+import tempfile
+import threading
+
+from youtube_dl import YoutubeDL
+from youtube_dl.postprocessor import FFmpegPostProcessor, MetadataFromTitlePP
+from youtube_dl.postprocessor import ffmpeg
+from youtube_dl.postprocessor.pool import PostProcessingPool
 
 
 class TestMetadataFromTitle(unittest.TestCase):
     def test_format_to_regex(self):
         pp = MetadataFromTitlePP(None, '%(title)s - %(artist)s')
         self.assertEqual(pp._titleregex, '(?P<title>.+)\ \-\ (?P<artist>.+)')
+
+
+# Logs every run to the file given in the environment
+FAKE_FFMPEG = """#!/bin/sh
+echo run >> "$FAKE_FFMPEG_LOG"
+echo "ffmpeg version %s Copyright"
+"""
+
+
+@unittest.skipIf(sys.platform == 'win32', 'requires a POSIX shell')
+class TestFFmpegVersions(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.log = os.path.join(self.tmp_dir, 'runs.log')
+        os.environ['FAKE_FFMPEG_LOG'] = self.log
+        self.ffmpeg = os.path.join(self.tmp_dir, 'ffmpeg')
+        self._write_ffmpeg('4.1')
+        ffmpeg._exe_versions.clear()
+
+    def tearDown(self):
+        del os.environ['FAKE_FFMPEG_LOG']
+        ffmpeg._exe_versions.clear()
+        shutil.rmtree(self.tmp_dir)
+
+    def _write_ffmpeg(self, version):
+        with open(self.ffmpeg, 'w') as f:
+            f.write(FAKE_FFMPEG % version)
+        os.chmod(self.ffmpeg, 0o755)
+
+    def _runs(self):
+        if not os.path.exists(self.log):
+            return 0
+        with open(self.log) as f:
+            return len(f.readlines())
+
+    def _pp(self, cachedir=False):
+        return FFmpegPostProcessor(YoutubeDL({
+            'ffmpeg_location': self.ffmpeg,
+            'cachedir': cachedir,
+        }))
+
+    def test_memoized(self):
+        for _ in range(3):
+            pp = self._pp()
+            self.assertTrue(pp.available)
+            self.assertEqual(pp.basename, 'ffmpeg')
+            self.assertEqual(pp._versions['ffmpeg'], '4.1')
+            self.assertFalse(pp.probe_available)
+        self.assertEqual(self._runs(), 1)
+
+        # A modified executable is run again
+        self._write_ffmpeg('4.2-longer')
+        self.assertEqual(self._pp()._versions['ffmpeg'], '4.2-longer')
+        self.assertEqual(self._runs(), 2)
+
+    def test_persisted(self):
+        cachedir = os.path.join(self.tmp_dir, 'cache')
+        self.assertEqual(self._pp(cachedir)._versions['ffmpeg'], '4.1')
+        # As in a new process
+        ffmpeg._exe_versions.clear()
+        self.assertEqual(self._pp(cachedir)._versions['ffmpeg'], '4.1')
+        self.assertEqual(self._runs(), 1)
+
+    def test_persisted_pruned(self):
+        cachedir = os.path.join(self.tmp_dir, 'cache')
+        self._pp(cachedir)
+        old_ffmpeg = self.ffmpeg
+        os.mkdir(os.path.join(self.tmp_dir, 'new'))
+        self.ffmpeg = os.path.join(self.tmp_dir, 'new', 'ffmpeg')
+        self._write_ffmpeg('4.2')
+        os.remove(old_ffmpeg)
+        pp = self._pp(cachedir)
+        self.assertEqual(pp._versions['ffmpeg'], '4.2')
+        # The removed executable is forgotten
+        self.assertEqual(
+            list(pp._downloader.cache.load('ffmpeg', 'versions').keys()), [self.ffmpeg])
+
+
+class TestPostProcessingPool(unittest.TestCase):
+    def test_order_and_errors(self):
+        pool = PostProcessingPool(3)
+        release = threading.Event()
+        done = []
+
+        def job(i):
+            if i == 0:
+                release.wait(5)
+            elif i == 2:
+                raise ValueError('job 2 failed')
+            return i
+
+        try:
+            for i in range(4):
+                pool.submit(lambda i=i: job(i), done.append)
+            # The later jobs finish first, but wait for job 0
+            self.assertEqual(done, [])
+            release.set()
+            self.assertRaises(ValueError, pool.join)
+            self.assertEqual(done, [0, 1, 3])
+        finally:
+            pool.close()
+
+    def test_backpressure(self):
+        pool = PostProcessingPool(1, queue_size=1)
+        release = threading.Event()
+        submitted = []
+
+        def submit():
+            for i in range(3):
+                pool.submit(lambda: release.wait(5))
+                submitted.append(i)
+
+        t = threading.Thread(target=submit)
+        t.daemon = True
+        t.start()
+        try:
+            # One job runs and one is queued, the third one waits
+            t.join(0.5)
+            self.assertTrue(t.is_alive())
+            self.assertEqual(submitted, [0, 1])
+            release.set()
+            t.join(5)
+            self.assertEqual(submitted, [0, 1, 2])
+            pool.join()
+        finally:
+            release.set()
+            pool.close()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import json
+import shutil
+import socket
+import stat
+import tempfile
+import threading
+import time
+
+from youtube_dl import YoutubeDL
+from youtube_dl.extractor.common import InfoExtractor
+from youtube_dl.server import JobServer
+from youtube_dl.utils import ExtractorError
+
+
+class FooIE(InfoExtractor):
+    _VALID_URL = r'foo:(?P<id>.+)'
+
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        if video_id == 'broken':
+            raise ExtractorError('This video is broken', expected=True)
+        return {
+            'id': video_id,
+            'title': 'Video %s' % video_id,
+            'url': 'http://localhost/%s.mp4' % video_id,
+            'ext': 'mp4',
+        }
+
+
+def make_server():
+    ydl = YoutubeDL({'simulate': True}, auto_init=False)
+    ydl.add_info_extractor(FooIE)
+    return JobServer(ydl)
+
+
+def run_jobs(server, jobs):
+    inp = io.BytesIO(b''.join(
+        (json.dumps(job).encode('utf-8') if isinstance(job, dict) else job) + b'\n'
+        for job in jobs))
+    out = io.BytesIO()
+    server.serve(inp, out)
+    return [json.loads(line) for line in out.getvalue().decode('ascii').splitlines()]
+
+
+class TestJobServer(unittest.TestCase):
+    def test_jobs(self):
+        server = make_server()
+        events = run_jobs(server, [
+            {'id': 'one', 'url': 'foo:1', 'download': False},
+            {'urls': ['foo:broken', 'foo:2'], 'params': {'forcetitle': True}},
+            {'url': 'foo:3'},
+        ])
+        done = [e for e in events if e['event'] == 'done']
+        self.assertEqual(
+            [(e['id'], e['retcode']) for e in done], [('one', 0), (2, 1), (3, 0)])
+        results = [e for e in events if e['event'] == 'result']
+        self.assertEqual([(e['id'], e['info']['id']) for e in results], [
+            ('one', '1'), (2, '2'), (3, '3')])
+        self.assertEqual(results[0]['info']['url'], 'http://localhost/1.mp4')
+
+        logs = [(e['id'], e['level'], e['message']) for e in events if e['event'] == 'log']
+        self.assertTrue((2, 'error', 'ERROR: This video is broken') in logs)
+        # The parameters of a job do not leak into the following ones
+        self.assertTrue((2, 'debug', 'Video 2') in logs)
+        self.assertFalse((3, 'debug', 'Video 3') in logs)
+        self.assertFalse('forcetitle' in server.ydl.params)
+
+    def test_invalid_jobs(self):
+        events = run_jobs(make_server(), [
+            b'not json',
+            {'id': 'a', 'urls': []},
+            {'id': 'b', 'url': 'foo:1', 'params': {'proxy': 'http://localhost:1'}},
+        ])
+        self.assertEqual([(e['id'], e['event']) for e in events], [
+            (1, 'error'), (1, 'done'), ('a', 'error'), ('a', 'done'), ('b', 'error'), ('b', 'done')])
+        self.assertEqual(set(e['retcode'] for e in events if e['event'] == 'done'), set([2]))
+        self.assertEqual(
+            events[4]['message'], 'These parameters cannot be changed for a job: proxy')
+
+    def test_stdout_outtmpl(self):
+        server = make_server()
+        job = {'id': 'a', 'url': 'foo:1', 'params': {'outtmpl': '-'}}
+        self.assertEqual([e['event'] for e in run_jobs(server, [job])], ['result', 'done'])
+        # Serving on stdio, the events would be mixed with the video
+        server._events_on_stdout = True
+        events = run_jobs(server, [job])
+        self.assertEqual([e['event'] for e in events], ['error', 'done'])
+        self.assertEqual(events[1]['retcode'], 2)
+
+    def test_network_params_are_fixed(self):
+        # The opener and the async client are built with these parameters
+        events = run_jobs(make_server(), [{'id': 'a', 'url': 'foo:1', 'params': {
+            'nocheckcertificate': False, 'keep_alive': False, 'source_address': '10.9.9.9',
+        }}])
+        self.assertEqual([e['event'] for e in events], ['error', 'done'])
+        self.assertEqual(
+            events[0]['message'],
+            'These parameters cannot be changed for a job: keep_alive, nocheckcertificate, source_address')
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix sockets are not available')
+    def test_unix_socket(self):
+        tmp_dir = tempfile.mkdtemp()
+        path = os.path.join(tmp_dir, 'youtube-dl.sock')
+        server = make_server()
+        server_thread = threading.Thread(target=server.serve_unix_socket, args=(path,))
+        server_thread.start()
+        try:
+            def run_client(video_id, events):
+                client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                for _ in range(100):
+                    try:
+                        client.connect(path)
+                        break
+                    except socket.error:
+                        time.sleep(0.05)
+                client.sendall(json.dumps({'url': 'foo:%s' % video_id, 'download': False}).encode('ascii') + b'\n')
+                for line in iter(client.makefile('rb').readline, b''):
+                    events.append(json.loads(line.decode('ascii')))
+                    if events[-1]['event'] == 'done':
+                        break
+                client.close()
+
+            clients = []
+            for video_id in ('1', '2', '3'):
+                events = []
+                t = threading.Thread(target=run_client, args=(video_id, events))
+                t.start()
+                clients.append((t, video_id, events))
+            for t, video_id, events in clients:
+                t.join()
+                self.assertEqual(
+                    [e['info']['id'] for e in events if e['event'] == 'result'], [video_id])
+                self.assertEqual(events[-1]['retcode'], 0)
+            # Only the user running the server can connect
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+        finally:
+            server.stop()
+            server_thread.join()
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
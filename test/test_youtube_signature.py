@@ -10,10 +10,11 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import io
 import re
+import shutil
 import string
 
 from test.helper import FakeYDL
-from youtube_dl.extractor import YoutubeIE
+from youtube_dl.extractor.youtube import YoutubeIE
 from youtube_dl.compat import compat_str, compat_urlretrieve
 
 _TESTS = [
@@ -82,6 +83,59 @@ class TestSignature(unittest.TestCase):
             os.mkdir(self.TESTDATA_DIR)
 
 
+class TestSignatureCache(unittest.TestCase):
+    PLAYER_URL = 'https://s.ytimg.com/yts/jsbin/player-en_US-vflTest/base.js'
+    PLAYER_CODE = '''
+        var Xy={ab:function(a,b){a.splice(0,b)},cd:function(a){a.reverse()},
+        ef:function(a,b){var c=a[0];a[0]=a[b%a.length];a[b%a.length]=c}};
+        var sig=function(a){a=a.split("");Xy.ef(a,7);Xy.ab(a,2);Xy.cd(a,20);return a.join("")};
+        c.s&&d.set("signature",c.sig||sig(c.s));
+    '''
+
+    def setUp(self):
+        TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+        self.cache_dir = os.path.join(TEST_DIR, 'testdata', 'sig_cache_test')
+        self.tearDown()
+        self.downloads = []
+        self._player_cache = YoutubeIE._player_cache
+        YoutubeIE._player_cache = {}
+
+    def tearDown(self):
+        if os.path.exists(self.cache_dir):
+            shutil.rmtree(self.cache_dir)
+        if hasattr(self, '_player_cache'):
+            YoutubeIE._player_cache = self._player_cache
+
+    def _decrypt(self, sig, clear_memory_cache=True):
+        if clear_memory_cache:
+            # Start from scratch, like a new process
+            YoutubeIE._player_cache = {}
+        ie = YoutubeIE(FakeYDL({'cachedir': self.cache_dir}))
+
+        def download_webpage(url, *args, **kwargs):
+            self.downloads.append(url)
+            return self.PLAYER_CODE
+        ie._download_webpage = download_webpage
+        return ie._decrypt_signature(sig, 'test', self.PLAYER_URL)
+
+    def test_cache(self):
+        self.assertEqual(self._decrypt('0123456789'), '98065432')
+        self.assertEqual(self._decrypt('0123456789abc'), 'cba98065432')
+        self.assertEqual(self._decrypt('abcdefghij'), 'jiagfedc')
+        # The player is only downloaded once, the other lengths are decrypted
+        # with the cached player code and the cached transforms
+        self.assertEqual(self.downloads, [self.PLAYER_URL])
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.cache_dir, 'youtube-players'))),
+            ['js_en_US-vflTest.json.gz'])
+
+    def test_memory_cache(self):
+        self.assertEqual(self._decrypt('0123456789', False), '98065432')
+        shutil.rmtree(self.cache_dir)
+        self.assertEqual(self._decrypt('abcdefghij', False), 'jiagfedc')
+        self.assertEqual(self.downloads, [self.PLAYER_URL])
+
+
 def make_tfunc(url, stype, sig_input, expected_sig):
     m = re.match(r'.*-([a-zA-Z0-9_-]+)(?:/watch_as3|/html5player)?\.[a-z]+$', url)
     assert m, '%r should follow URL format' % url
@@ -6,7 +6,6 @@ from __future__ import absolute_import, unicode_literals
 import collections
 import contextlib
 import datetime
-import errno
 import fileinput
 import io
 import itertools
@@ -20,6 +19,7 @@ import shutil
 import subprocess
 import socket
 import sys
+import threading
 import time
 import tokenize
 import traceback
@@ -54,7 +54,6 @@ from .utils import (
     ExtractorError,
     format_bytes,
     formatSeconds,
-    locked_file,
     make_HTTPS_handler,
     MaxDownloadsReached,
     PagedList,
@@ -82,9 +81,13 @@ from .utils import (
     args_to_str,
     age_restricted,
 )
+from .archive import open_download_archive
 from .cache import Cache
-from .extractor import get_info_extractor, gen_extractors
-from .downloader import get_suitable_downloader
+from .httpcache import HTTPResponseCache
+from .extractor import get_info_extractor, gen_extractor_classes
+from .extractor.dispatch import URLDispatchIndex
+from .downloader import FileDownloader, get_suitable_downloader
+from .downloader.http import HttpFD, HttpPipeFD
 from .downloader.rtmp import rtmpdump_version
 from .postprocessor import (
     FFmpegFixupM4aPP,
@@ -93,6 +96,7 @@ from .postprocessor import (
     FFmpegPostProcessor,
     get_postprocessor,
 )
+from .postprocessor.pool import PostProcessingPool
 from .version import __version__
 
 
@@ -151,6 +155,10 @@ class YoutubeDL(object):
     playlistend:       Playlist item to end at.
     playlist_items:    Specific indices of playlist to download.
     playlistreverse:   Download playlist items in reverse order.
+    parallel_entries:  Number of playlist entries to extract and download
+                       at the same time (default is 1). Forced printings,
+                       the download archive and the --max-downloads limit
+                       still follow the order of the playlist.
     matchtitle:        Download only matching titles.
     rejecttitle:       Reject downloads for matching titles.
     logger:            Log messages to a logging.Logger instance.
@@ -172,6 +180,14 @@ class YoutubeDL(object):
     skip_download:     Skip the actual download of the video file
     cachedir:          Location of the cache files in the filesystem.
                        False to disable filesystem cache.
+    http_cache:        Cache the webpages downloaded by the extractors,
+                       according to their HTTP caching headers. They are
+                       kept in memory and in the cache directory.
+    http_cache_size:   Maximum size in bytes of the HTTP cache (default 100 MiB).
+    http_cache_ttl:    A dictionary mapping lowercase extractor names or
+                       keys to the number of seconds their webpages are
+                       cached, whatever their headers say. The key
+                       "default" applies to all the other extractors.
     noplaylist:        Download single video instead of a playlist if in doubt.
     age_limit:         An integer representing the user's age in years.
                        Unsuitable videos for the given age are skipped.
@@ -187,8 +203,13 @@ class YoutubeDL(object):
     download_archive:  File name of a file where all downloads are recorded.
                        Videos already present in the file are not downloaded
                        again.
+    download_archive_format: Format of the download archive, "text" (one
+                       video per line) or "sqlite". Guessed from the file
+                       if None.
     cookiefile:        File name where cookies should be read from and dumped to.
     nocheckcertificate:Do not verify SSL certificates
+    keep_alive:        Reuse persistent HTTP connections between requests to
+                       the same host (default is True).
     prefer_insecure:   Use HTTP instead of HTTPS to retrieve information.
                        At the moment, this is only supported by YouTube.
     proxy:             URL of the proxy server to use
@@ -235,6 +256,13 @@ class YoutubeDL(object):
                        Progress hooks are guaranteed to be called at least once
                        (with status "finished") if the download is successful.
     merge_output_format: Extension to use when merging formats.
+    parallel_merge_downloads: Download the formats to merge at the same
+                       time (default True), their combined progress is
+                       reported with the final filename.
+    stream_merge:      Merge the formats with ffmpeg while they are
+                       downloaded, instead of writing them to separate files
+                       first. Only for formats downloaded over HTTP that can
+                       be read sequentially (e.g. DASH formats).
     fixup:             Automatically correct known faults of the file.
                        One of:
                        - "never": do nothing
@@ -263,13 +291,21 @@ class YoutubeDL(object):
     the downloader (see youtube_dl/downloader/common.py):
     nopart, updatetime, buffersize, ratelimit, min_filesize, max_filesize, test,
     noresizebuffer, retries, continuedl, noprogress, consoletitle,
-    xattr_set_filesize, external_downloader_args, hls_use_mpegts.
+    xattr_set_filesize, external_downloader_args, hls_use_mpegts,
+    concurrent_fragment_downloads, async_network, http_connections,
+    http_chunk_size.
 
     The following options are used by the post processors:
     prefer_ffmpeg:     If True, use ffmpeg instead of avconv if both are available,
                        otherwise prefer avconv.
     postprocessor_args: A list of additional command-line arguments for the
                         postprocessor.
+    postprocessor_workers: Number of threads post-processing the downloaded
+                       files while the next ones are downloaded (default 0,
+                       post-process each file before the next download).
+                       The download archive is still recorded in the order
+                       of the downloads. The pending files are processed by
+                       download() or when leaving the "with" block.
     """
 
     params = None
@@ -284,11 +320,24 @@ class YoutubeDL(object):
         if params is None:
             params = {}
         self._ies = []
+        self._ies_classes = {}
         self._ies_instances = {}
+        self._url_index = None
         self._pps = []
         self._progress_hooks = []
         self._download_retcode = 0
         self._num_downloads = 0
+        # State of the playlist entry processed by the current thread when
+        # entries are processed in parallel
+        self._entry_local = threading.local()
+        self._download_archive = None
+        self._download_archive_lock = threading.Lock()
+        # Created on the first download to post-process in the background
+        self._pp_pool = None
+        # Compiled format selectors by format spec
+        self._format_selectors = {}
+        # Whether formats can be merged, by ffmpeg parameters
+        self._can_merge_formats = {}
         self._screen_file = [sys.stdout, sys.stderr][params.get('logtostderr', False)]
         self._err_file = sys.stderr
         self.params = {
@@ -297,6 +346,7 @@ class YoutubeDL(object):
         }
         self.params.update(params)
         self.cache = Cache(self)
+        self.http_cache = HTTPResponseCache(self)
 
         if params.get('bidi_workaround', False):
             try:
@@ -373,10 +423,17 @@ class YoutubeDL(object):
                 args_to_str(correct_argv))
 
     def add_info_extractor(self, ie):
-        """Add an InfoExtractor object to the end of the list."""
+        """
+        Add an InfoExtractor object to the end of the list. It can also be an
+        InfoExtractor class, which is only instantiated when it's used.
+        """
         self._ies.append(ie)
-        self._ies_instances[ie.ie_key()] = ie
-        ie.set_downloader(self)
+        if isinstance(ie, type):
+            self._ies_classes[ie.ie_key()] = ie
+        else:
+            self._ies_instances[ie.ie_key()] = ie
+            ie.set_downloader(self)
+        self._url_index = None
 
     def get_info_extractor(self, ie_key):
         """
@@ -386,15 +443,32 @@ class YoutubeDL(object):
         """
         ie = self._ies_instances.get(ie_key)
         if ie is None:
-            ie = get_info_extractor(ie_key)()
-            self.add_info_extractor(ie)
+            klass = self._ies_classes.get(ie_key)
+            if klass is not None:
+                # Its class is already in the list
+                ie = klass()
+                self._ies_instances[ie_key] = ie
+                ie.set_downloader(self)
+            else:
+                ie = get_info_extractor(ie_key)()
+                self.add_info_extractor(ie)
         return ie
 
+    def _get_suitable_ies(self, url):
+        """
+        Return the extractors whose suitable method may accept the URL, in
+        the order they were added.
+        """
+        url_index = self._url_index
+        if url_index is None:
+            url_index = self._url_index = URLDispatchIndex(self._ies)
+        return url_index.candidates(url)
+
     def add_default_info_extractors(self):
         """
-        Add the InfoExtractors returned by gen_extractors to the end of the list
+        Add the InfoExtractors returned by gen_extractor_classes to the end of the list
         """
-        for ie in gen_extractors():
+        for ie in gen_extractor_classes():
             self.add_info_extractor(ie)
 
     def add_post_processor(self, pp):
@@ -428,6 +502,12 @@ class YoutubeDL(object):
 
     def to_stdout(self, message, skip_eol=False, check_quiet=False):
         """Print message to stdout if not in quiet mode."""
+        entry = getattr(self._entry_local, 'entry', None)
+        if entry is not None and not check_quiet:
+            # Printed once the preceding playlist entries are done
+            entry['output'].append(
+                lambda: self.to_stdout(message, skip_eol, check_quiet))
+            return
         if self.params.get('logger'):
             self.params['logger'].debug(message)
         elif not check_quiet or not self.params.get('quiet', False):
@@ -478,9 +558,20 @@ class YoutubeDL(object):
     def __exit__(self, *args):
         self.restore_console_title()
 
+        # The files downloaded before an error are still post-processed
+        if not isinstance(args[1], KeyboardInterrupt):
+            try:
+                self._finish_post_processing()
+            except DownloadError:
+                # Already reported
+                pass
+
         if self.params.get('cookiefile') is not None:
             self.cookiejar.save()
 
+        if self._download_archive is not None:
+            self._download_archive.close()
+
     def trouble(self, message=None, tb=None):
         """Determine action to take when a download problem appears.
 
@@ -652,12 +743,13 @@ class YoutubeDL(object):
         if ie_key:
             ies = [self.get_info_extractor(ie_key)]
         else:
-            ies = self._ies
+            ies = self._get_suitable_ies(url)
 
         for ie in ies:
             if not ie.suitable(url):
                 continue
 
+            ie = self.get_info_extractor(ie.ie_key())
             if not ie.working():
                 self.report_warning('The program functionality for this site has been marked as broken, '
                                     'and will probably not work.')
@@ -746,6 +838,11 @@ class YoutubeDL(object):
             return self.process_ie_result(
                 new_result, download=download, extra_info=extra_info)
         elif result_type == 'playlist' or result_type == 'multi_video':
+            entry = getattr(self._entry_local, 'entry', None)
+            if entry is not None:
+                # All the videos of this entry take their download slots
+                # before the following entries
+                entry['nested'] = True
             # We process each entry in the playlist
             playlist = ie_result.get('title') or ie_result.get('id')
             self.to_screen('[download] Downloading playlist: %s' % playlist)
@@ -769,7 +866,7 @@ class YoutubeDL(object):
                                 yield int(item)
                         else:
                             yield int(string_segment)
-                playlistitems = iter_playlistitems(playlistitems_str)
+                playlistitems = list(iter_playlistitems(playlistitems_str))
 
             ie_entries = ie_result['entries']
             if isinstance(ie_entries, list):
@@ -799,22 +896,45 @@ class YoutubeDL(object):
                     '[%s] playlist %s: Downloading %d videos' %
                     (ie_result['extractor'], playlist, n_entries))
             else:  # iterable
-                if playlistitems:
-                    entry_list = list(ie_entries)
-                    entries = [entry_list[i - 1] for i in playlistitems]
+                # The entries are consumed while they are processed, so that
+                # the first videos are downloaded before the whole playlist is
+                # fetched. The playlist is collected first when the number
+                # of entries is needed.
+                outtmpl = self.params.get('outtmpl', DEFAULT_OUTTMPL)
+                lazy = not (
+                    self.params.get('playlistreverse', False) or
+                    'playlist_index' in outtmpl or 'n_entries' in outtmpl or
+                    (playlistitems and min(playlistitems) <= 0))
+                if lazy:
+                    if playlistitems:
+                        entries = self._iter_items_at(ie_entries, playlistitems)
+                    else:
+                        entries = itertools.islice(
+                            ie_entries, playliststart, playlistend)
+                    n_entries = None
+                    self.to_screen(
+                        '[%s] playlist %s: Downloading videos as they are collected' %
+                        (ie_result['extractor'], playlist))
                 else:
-                    entries = list(itertools.islice(
-                        ie_entries, playliststart, playlistend))
-                n_entries = len(entries)
-                self.to_screen(
-                    '[%s] playlist %s: Downloading %d videos' %
-                    (ie_result['extractor'], playlist, n_entries))
+                    if playlistitems:
+                        entry_list = list(ie_entries)
+                        entries = [entry_list[i - 1] for i in playlistitems]
+                    else:
+                        entries = list(itertools.islice(
+                            ie_entries, playliststart, playlistend))
+                    n_entries = len(entries)
+                    self.to_screen(
+                        '[%s] playlist %s: Downloading %d videos' %
+                        (ie_result['extractor'], playlist, n_entries))
 
             if self.params.get('playlistreverse', False):
                 entries = entries[::-1]
 
-            for i, entry in enumerate(entries, 1):
-                self.to_screen('[download] Downloading video %s of %s' % (i, n_entries))
+            def process_entry(i, entry):
+                if n_entries is None:
+                    self.to_screen('[download] Downloading video %s' % i)
+                else:
+                    self.to_screen('[download] Downloading video %s of %s' % (i, n_entries))
                 extra = {
                     'n_entries': n_entries,
                     'playlist': playlist,
@@ -830,12 +950,26 @@ class YoutubeDL(object):
                 reason = self._match_entry(entry, incomplete=True)
                 if reason is not None:
                     self.to_screen('[download] ' + reason)
-                    continue
+                    return False, None
 
                 entry_result = self.process_ie_result(entry,
                                                       download=download,
                                                       extra_info=extra)
-                playlist_results.append(entry_result)
+                return True, entry_result
+
+            parallel_entries = int(self.params.get('parallel_entries') or 1)
+            # Entries of nested playlists are processed by the thread of
+            # the outer entry
+            if (parallel_entries > 1 and n_entries != 1 and
+                    getattr(self._entry_local, 'entry', None) is None):
+                entry_results = self._process_entries_in_parallel(
+                    entries, process_entry, parallel_entries)
+            else:
+                entry_results = (
+                    process_entry(i, entry) for i, entry in enumerate(entries, 1))
+            for processed, entry_result in entry_results:
+                if processed:
+                    playlist_results.append(entry_result)
             ie_result['entries'] = playlist_results
             self.to_screen('[download] Finished downloading playlist: %s' % playlist)
             return ie_result
@@ -863,6 +997,173 @@ class YoutubeDL(object):
         else:
             raise Exception('Invalid result type: %s' % result_type)
 
+    @staticmethod
+    def _iter_items_at(iterable, items):
+        """
+        Yield the elements of iterable at the given 1-based positions, in the
+        order of items. The iterable is only consumed as far as needed.
+        """
+        wanted = set(items)
+        found = {}
+        it = iter(iterable)
+        pos = 0
+        for item in items:
+            while pos < item:
+                try:
+                    element = next(it)
+                except StopIteration:
+                    break
+                pos += 1
+                if pos in wanted:
+                    found[pos] = element
+            if item in found:
+                yield found[item]
+
+    def _process_entries_in_parallel(self, entries, process_entry, workers):
+        """
+        Call process_entry(i, entry) for the playlist entries (a list or an
+        iterator) from a pool of threads and return the results in the order
+        of the playlist.
+
+        The entries take their download slots (see _wait_entry_turn) in the
+        order of the playlist. Their forced printings and download archive
+        records are buffered and written in that order too, once the
+        preceding entries are done.
+        """
+        cond = threading.Condition()
+        pool = {
+            'next_entry': 0,
+            # Known once all the entries have been taken
+            'n_entries': None,
+            # Index of the entry allowed to take a download slot
+            'turn': 0,
+            'passed': set(),
+            'abort': False,
+            'results': {},
+        }
+        entries_iter = iter(entries)
+        # Taking the next entry of a lazy playlist may fetch a new page, it's
+        # done outside of cond so that the finished entries can be written
+        entries_lock = threading.Lock()
+
+        def worker():
+            while True:
+                with entries_lock:
+                    with cond:
+                        if pool['abort'] or pool['n_entries'] is not None:
+                            return
+                    index = pool['next_entry']
+                    fetch_error = None
+                    try:
+                        entry_info = next(entries_iter)
+                    except StopIteration:
+                        with cond:
+                            pool['n_entries'] = index
+                            cond.notify_all()
+                        return
+                    except Exception as err:
+                        fetch_error = err
+                        with cond:
+                            pool['n_entries'] = index + 1
+                    pool['next_entry'] += 1
+                entry = {
+                    'index': index,
+                    'cond': cond,
+                    'pool': pool,
+                    'turn_passed': False,
+                    'nested': False,
+                    'output': [],
+                }
+                self._entry_local.entry = entry
+                try:
+                    if fetch_error is not None:
+                        raise fetch_error
+                    result = (process_entry(index + 1, entry_info), None)
+                except Exception as err:
+                    result = (None, err)
+                finally:
+                    self._pass_entry_turn(entry_done=True)
+                    self._entry_local.entry = None
+                with cond:
+                    pool['results'][index] = result + (entry['output'],)
+                    cond.notify_all()
+
+        if isinstance(entries, list):
+            workers = min(workers, len(entries))
+        threads = []
+        for _ in range(workers):
+            t = threading.Thread(target=worker)
+            t.daemon = True
+            t.start()
+            threads.append(t)
+
+        def stop_workers():
+            with cond:
+                pool['abort'] = True
+                cond.notify_all()
+            for t in threads:
+                while t.is_alive():
+                    t.join(1)
+
+        results = []
+        try:
+            for index in itertools.count():
+                with cond:
+                    while (index not in pool['results'] and
+                            (pool['n_entries'] is None or index < pool['n_entries'])):
+                        # Wait with a timeout so that KeyboardInterrupt
+                        # is not blocked on python 2
+                        cond.wait(1)
+                    if index not in pool['results']:
+                        break
+                    result, err, output = pool['results'].pop(index)
+                for write_output in output:
+                    write_output()
+                if err is not None:
+                    # The entries that are already being processed are
+                    # finished and recorded, the others are not started
+                    stop_workers()
+                    for later_index in sorted(pool['results']):
+                        for write_output in pool['results'][later_index][2]:
+                            write_output()
+                    raise err
+                results.append(result)
+        finally:
+            with cond:
+                pool['abort'] = True
+                cond.notify_all()
+
+        stop_workers()
+        return results
+
+    def _wait_entry_turn(self):
+        """Wait until the preceding playlist entries have passed their turn"""
+        entry = getattr(self._entry_local, 'entry', None)
+        if entry is None or entry['turn_passed']:
+            return
+        cond, pool = entry['cond'], entry['pool']
+        with cond:
+            while pool['turn'] < entry['index']:
+                cond.wait(1)
+
+    def _pass_entry_turn(self, entry_done=False):
+        """
+        Let the next playlist entry take its download slot. An entry made
+        of several videos only passes its turn once it's done.
+        """
+        entry = getattr(self._entry_local, 'entry', None)
+        if entry is None or entry['turn_passed']:
+            return
+        if entry['nested'] and not entry_done:
+            return
+        entry['turn_passed'] = True
+        cond, pool = entry['cond'], entry['pool']
+        with cond:
+            pool['passed'].add(entry['index'])
+            while pool['turn'] in pool['passed']:
+                pool['turn'] += 1
+            cond.notify_all()
+
     def _build_format_filter(self, filter_spec):
         " Returns a function to filter the formats according to the filter_spec "
 
@@ -1186,6 +1487,31 @@ class YoutubeDL(object):
         parsed_selector = _parse_format_selection(iter(TokenIterator(tokens)))
         return _build_selector_function(parsed_selector)
 
+    def _get_format_selector(self, format_spec):
+        """Return the selector built for format_spec, it's only built once"""
+        selector = self._format_selectors.get(format_spec)
+        if selector is None:
+            selector = self.build_format_selector(format_spec)
+            self._format_selectors[format_spec] = selector
+        return selector
+
+    def _can_merge(self):
+        key = (self.params.get('ffmpeg_location'), self.params.get('prefer_ffmpeg'))
+        can_merge = self._can_merge_formats.get(key)
+        if can_merge is None:
+            merger = FFmpegMergerPP(self)
+            can_merge = merger.available and merger.can_merge()
+            self._can_merge_formats[key] = can_merge
+        return can_merge
+
+    def _default_format_spec(self, info_dict):
+        req_format_list = []
+        if (self.params.get('outtmpl', DEFAULT_OUTTMPL) != '-' and
+                not info_dict.get('is_live') and self._can_merge()):
+            req_format_list.append('bestvideo+bestaudio')
+        req_format_list.append('best')
+        return '/'.join(req_format_list)
+
     def _calc_headers(self, info_dict):
         res = std_headers.copy()
 
@@ -1339,15 +1665,8 @@ class YoutubeDL(object):
 
         req_format = self.params.get('format')
         if req_format is None:
-            req_format_list = []
-            if (self.params.get('outtmpl', DEFAULT_OUTTMPL) != '-' and
-                    not info_dict.get('is_live')):
-                merger = FFmpegMergerPP(self)
-                if merger.available and merger.can_merge():
-                    req_format_list.append('bestvideo+bestaudio')
-            req_format_list.append('best')
-            req_format = '/'.join(req_format_list)
-        format_selector = self.build_format_selector(req_format)
+            req_format = self._default_format_spec(info_dict)
+        format_selector = self._get_format_selector(req_format)
         formats_to_download = list(format_selector(formats))
         if not formats_to_download:
             raise ExtractorError('requested format not available',
@@ -1413,11 +1732,145 @@ class YoutubeDL(object):
             subs[lang] = f
         return subs
 
+    def _download_in_parallel(self, downloads, filename, dl):
+        """
+        Run dl(name, info, params, progress_hooks) for all the (name, info)
+        pairs of downloads at the same time, their combined progress is
+        reported as the progress of filename.
+        Return True if all the downloads succeeded.
+        """
+        # Prints the combined progress, the downloaders only report
+        # completion
+        reporter = FileDownloader(self, self.params)
+        for ph in self._progress_hooks:
+            reporter.add_progress_hook(ph)
+        dl_params = dict(self.params)
+        dl_params['noprogress'] = True
+        lock = threading.Lock()
+        start = time.time()
+        # Last status of every download, by name
+        statuses = {}
+
+        def progress_hook(name, s):
+            with lock:
+                if s['status'] == 'finished':
+                    statuses[name] = {
+                        'downloaded_bytes': s.get('total_bytes'),
+                        'total_bytes': s.get('total_bytes'),
+                    }
+                elif s['status'] == 'downloading':
+                    statuses[name] = s
+                if s['status'] != 'downloading':
+                    # Completion and errors are reported for every file
+                    for ph in self._progress_hooks:
+                        ph(s)
+                    return
+                combined = {
+                    'status': 'downloading',
+                    'filename': filename,
+                    'elapsed': time.time() - start,
+                    'downloaded_bytes': sum(
+                        st.get('downloaded_bytes') or 0 for st in statuses.values()),
+                }
+                if len(statuses) == len(downloads):
+                    totals = [
+                        st.get('total_bytes') or st.get('total_bytes_estimate')
+                        for st in statuses.values()]
+                    if all(totals):
+                        if all(st.get('total_bytes') for st in statuses.values()):
+                            combined['total_bytes'] = sum(totals)
+                        else:
+                            combined['total_bytes_estimate'] = sum(totals)
+                speeds = [st.get('speed') for st in statuses.values() if st.get('speed') is not None]
+                if speeds:
+                    combined['speed'] = sum(speeds)
+                etas = [
+                    st.get('eta') for st in statuses.values()
+                    if st.get('status') == 'downloading']
+                if len(statuses) == len(downloads) and etas and None not in etas:
+                    combined['eta'] = max(etas)
+                reporter._hook_progress(combined)
+
+        results = [None] * len(downloads)
+        entry = getattr(self._entry_local, 'entry', None)
+
+        def run(i):
+            self._entry_local.entry = entry
+            name, info = downloads[i]
+            try:
+                results[i] = (dl(
+                    name, info, dl_params,
+                    [lambda s: progress_hook(name, s)]), None)
+            except Exception as e:
+                results[i] = (False, e)
+
+        threads = []
+        for i in range(1, len(downloads)):
+            t = threading.Thread(target=run, args=(i,))
+            t.daemon = True
+            t.start()
+            threads.append(t)
+        run(0)
+        for t in threads:
+            while t.is_alive():
+                # Join with a timeout so that KeyboardInterrupt is not
+                # blocked on python 2
+                t.join(1)
+        for _, err in results:
+            if err is not None:
+                raise err
+        return all(success for success, _ in results)
+
+    def _stream_merge(self, downloads, filename, merger):
+        """
+        Merge the (name, info) pairs of downloads into filename with merger
+        while they are downloaded at the same time, without writing them to
+        the disk. Return True on success.
+        """
+        self.to_screen('[ffmpeg] Merging formats into "%s" while they are downloaded' % filename)
+        try:
+            stream_merge = merger.start_stream_merge(filename, len(downloads))
+        except (PostProcessingError, OSError) as err:
+            self.report_error('unable to start merging: %s' % error_to_compat_str(err))
+            return False
+        names = [name for name, _ in downloads]
+
+        def pipe_dl(name, info, params, progress_hooks):
+            pipe = stream_merge.inputs[names.index(name)]
+            try:
+                fd = HttpPipeFD(self, params, pipe)
+                for ph in progress_hooks:
+                    fd.add_progress_hook(ph)
+                if self.params.get('verbose'):
+                    self.to_stdout('[debug] Invoking downloader on %r' % info.get('url'))
+                return fd.download(name, info)
+            finally:
+                # ffmpeg only finishes once all its inputs are closed
+                pipe.close()
+
+        try:
+            success = self._download_in_parallel(downloads, filename, pipe_dl)
+        except BaseException:
+            stream_merge.abort()
+            raise
+        if not success:
+            stream_merge.abort()
+            return False
+        try:
+            stream_merge.finish()
+        except PostProcessingError as err:
+            self.report_error('merging: %s' % err.msg)
+            return False
+        return True
+
     def process_info(self, info_dict):
         """Process a single resolved IE result."""
 
         assert info_dict.get('_type', 'video') == 'video'
 
+        # Download slots are taken in the order of the playlist
+        self._wait_entry_turn()
+
         max_downloads = self.params.get('max_downloads')
         if max_downloads is not None:
             if self._num_downloads >= int(max_downloads):
@@ -1438,6 +1891,7 @@ class YoutubeDL(object):
         self._num_downloads += 1
 
         info_dict['_filename'] = filename = self.prepare_filename(info_dict)
+        self._pass_entry_turn()
 
         # Forced printings
         if self.params.get('forcetitle', False):
@@ -1557,9 +2011,11 @@ class YoutubeDL(object):
 
         if not self.params.get('skip_download', False):
             try:
-                def dl(name, info):
-                    fd = get_suitable_downloader(info, self.params)(self, self.params)
-                    for ph in self._progress_hooks:
+                def dl(name, info, params=None, progress_hooks=None):
+                    fd = get_suitable_downloader(info, self.params)(self, params or self.params)
+                    if progress_hooks is None:
+                        progress_hooks = self._progress_hooks
+                    for ph in progress_hooks:
                         fd.add_progress_hook(ph)
                     if self.params.get('verbose'):
                         self.to_stdout('[debug] Invoking downloader on %r' % info.get('url'))
@@ -1609,14 +2065,29 @@ class YoutubeDL(object):
                             '[download] %s has already been downloaded and '
                             'merged' % filename)
                     else:
+                        downloads = []
                         for f in requested_formats:
                             new_info = dict(info_dict)
                             new_info.update(f)
                             fname = self.prepare_filename(new_info)
                             fname = prepend_extension(fname, 'f%s' % f['format_id'], new_info['ext'])
                             downloaded.append(fname)
-                            partial_success = dl(fname, new_info)
-                            success = success and partial_success
+                            downloads.append((fname, new_info))
+                        if (self.params.get('stream_merge') and postprocessors and
+                                merger.can_stream_merge and
+                                all(get_suitable_downloader(new_info, self.params) is HttpFD
+                                    for _, new_info in downloads)):
+                            success = self._stream_merge(downloads, filename, merger)
+                            if success:
+                                # Nothing left to merge
+                                postprocessors = []
+                                downloaded = []
+                        elif self.params.get('parallel_merge_downloads', True):
+                            success = self._download_in_parallel(downloads, filename, dl)
+                        else:
+                            for fname, new_info in downloads:
+                                partial_success = dl(fname, new_info)
+                                success = success and partial_success
                         info_dict['__postprocessors'] = postprocessors
                         info_dict['__files_to_merge'] = downloaded
                 else:
@@ -1670,6 +2141,10 @@ class YoutubeDL(object):
                     else:
                         assert fixup_policy in ('ignore', 'never')
 
+                pp_pool = self._get_pp_pool()
+                if pp_pool is not None:
+                    self._post_process_in_background(pp_pool, filename, info_dict)
+                    return
                 try:
                     self.post_process(filename, info_dict)
                 except (PostProcessingError) as err:
@@ -1677,6 +2152,48 @@ class YoutubeDL(object):
                     return
                 self.record_download_archive(info_dict)
 
+    def _get_pp_pool(self):
+        workers = self.params.get('postprocessor_workers') or 0
+        # The playlist entries processed in parallel already overlap
+        # their downloads and post-processing
+        if workers <= 0 or getattr(self._entry_local, 'entry', None) is not None:
+            return None
+        if self._pp_pool is None:
+            self._pp_pool = PostProcessingPool(workers)
+        return self._pp_pool
+
+    def _post_process_in_background(self, pp_pool, filename, info_dict):
+        def run():
+            try:
+                self.post_process(filename, info_dict)
+            except DownloadError:
+                # Already reported
+                raise
+            except Exception as err:
+                # Several files are processed at the same time, the error
+                # must tell which one failed
+                self.report_error('%s: postprocessing: %s' % (
+                    info_dict['id'], error_to_compat_str(err)))
+                return False
+            return True
+
+        def done(success):
+            if success:
+                self.record_download_archive(info_dict)
+
+        pp_pool.submit(run, done)
+
+    def _finish_post_processing(self):
+        """Wait for the files being post-processed in the background"""
+        pp_pool = self._pp_pool
+        if pp_pool is None:
+            return
+        self._pp_pool = None
+        try:
+            pp_pool.join()
+        finally:
+            pp_pool.close()
+
     def download(self, url_list):
         """Download a given list of URLs."""
         outtmpl = self.params.get('outtmpl', DEFAULT_OUTTMPL)
@@ -1699,6 +2216,7 @@ class YoutubeDL(object):
                 if self.params.get('dump_single_json', False):
                     self.to_stdout(json.dumps(res))
 
+        self._finish_post_processing()
         return self._download_retcode
 
     def download_with_info_file(self, info_filename):
@@ -1716,6 +2234,7 @@ class YoutubeDL(object):
                 return self.download([webpage_url])
             else:
                 raise
+        self._finish_post_processing()
         return self._download_retcode
 
     @staticmethod
@@ -1750,40 +2269,73 @@ class YoutubeDL(object):
         # Future-proof against any change in case
         # and backwards compatibility with prior versions
         extractor = info_dict.get('extractor_key')
+        video_id = info_dict.get('id')
         if extractor is None:
-            if 'id' in info_dict:
-                extractor = info_dict.get('ie_key')  # key in a playlist
-        if extractor is None:
+            extractor = info_dict.get('ie_key')  # key in a playlist
+            if (info_dict.get('_type') in ('url', 'url_transparent') and
+                    (extractor is None or video_id is None)):
+                # Playlist entries can be identified from their URL, so that
+                # archived videos are skipped before extracting anything
+                extractor, video_id = self._identify_url(
+                    info_dict['url'], extractor, video_id)
+        if extractor is None or video_id is None:
             return None  # Incomplete video information
-        return extractor.lower() + ' ' + info_dict['id']
+        return extractor.lower() + ' ' + video_id
 
-    def in_download_archive(self, info_dict):
+    def _identify_url(self, url, ie_key=None, video_id=None):
+        """
+        Return the key of the extractor that handles the URL and the id of the
+        video, without making any request. Any of them may be None.
+        """
+        if ie_key is None:
+            for ie in self._get_suitable_ies(url):
+                if ie.suitable(url):
+                    ie_key = ie.ie_key()
+                    break
+            else:
+                return None, video_id
+        if video_id is None:
+            try:
+                ie = self.get_info_extractor(ie_key)
+            except KeyError:  # Unknown extractor
+                return ie_key, None
+            video_id = ie.get_temp_id(url)
+        return ie_key, video_id
+
+    def _get_download_archive(self):
         fn = self.params.get('download_archive')
         if fn is None:
+            return None
+        with self._download_archive_lock:
+            if self._download_archive is None:
+                self._download_archive = open_download_archive(
+                    fn, self.params.get('download_archive_format'))
+            return self._download_archive
+
+    def in_download_archive(self, info_dict):
+        archive = self._get_download_archive()
+        if archive is None:
             return False
 
         vid_id = self._make_archive_id(info_dict)
         if vid_id is None:
             return False  # Incomplete video information
 
-        try:
-            with locked_file(fn, 'r', encoding='utf-8') as archive_file:
-                for line in archive_file:
-                    if line.strip() == vid_id:
-                        return True
-        except IOError as ioe:
-            if ioe.errno != errno.ENOENT:
-                raise
-        return False
+        return vid_id in archive
 
     def record_download_archive(self, info_dict):
-        fn = self.params.get('download_archive')
-        if fn is None:
+        archive = self._get_download_archive()
+        if archive is None:
             return
         vid_id = self._make_archive_id(info_dict)
         assert vid_id
-        with locked_file(fn, 'a', encoding='utf-8') as archive_file:
-            archive_file.write(vid_id + '\n')
+        entry = getattr(self._entry_local, 'entry', None)
+        if entry is not None:
+            # Recorded once the preceding playlist entries are done
+            entry['output'].append(
+                lambda: self.record_download_archive(info_dict))
+            return
+        archive.add(vid_id)
 
     @staticmethod
     def format_resolution(format, default='unknown'):
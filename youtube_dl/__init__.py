@@ -9,6 +9,7 @@ import codecs
 import io
 import os
 import random
+import socket
 import sys
 
 
@@ -42,6 +43,7 @@ from .downloader import (
 )
 from .extractor import gen_extractors, list_extractors
 from .YoutubeDL import YoutubeDL
+from .server import JobServer
 
 
 def _real_main(argv=None):
@@ -152,11 +154,39 @@ def _real_main(argv=None):
                 opts_retries = int(opts.retries)
             except (TypeError, ValueError):
                 parser.error('invalid retry count specified')
+    if opts.concurrent_fragment_downloads <= 0:
+        parser.error('invalid number of concurrent fragments specified')
+    if opts.http_connections <= 0:
+        parser.error('invalid number of HTTP connections specified')
+    if opts.parallel_entries <= 0:
+        parser.error('invalid number of parallel playlist entries specified')
+    if opts.postprocessor_workers < 0:
+        parser.error('invalid number of postprocessor workers specified')
+    if opts.serve_socket is not None and not hasattr(socket, 'AF_UNIX'):
+        parser.error('Unix sockets are not available on this platform')
+    serve = opts.serve or opts.serve_socket is not None
     if opts.buffersize is not None:
         numeric_buffersize = FileDownloader.parse_bytes(opts.buffersize)
         if numeric_buffersize is None:
             parser.error('invalid buffer size specified')
         opts.buffersize = numeric_buffersize
+    if opts.http_chunk_size is not None:
+        numeric_chunksize = FileDownloader.parse_bytes(opts.http_chunk_size)
+        if not numeric_chunksize:
+            parser.error('invalid http chunk size specified')
+        opts.http_chunk_size = numeric_chunksize
+    if opts.http_cache_size is not None:
+        numeric_cache_size = FileDownloader.parse_bytes(opts.http_cache_size)
+        if not numeric_cache_size:
+            parser.error('invalid HTTP cache size specified')
+        opts.http_cache_size = numeric_cache_size
+    http_cache_ttl = {}
+    for ttl_spec in opts.http_cache_ttl:
+        ie_name, _, ttl = ttl_spec.rpartition(':')
+        try:
+            http_cache_ttl[ie_name.lower() or 'default'] = int(ttl)
+        except ValueError:
+            parser.error('invalid HTTP cache TTL specified: %s' % ttl_spec)
     if opts.playliststart <= 0:
         raise ValueError('Playlist start must be positive')
     if opts.playlistend not in (-1, None) and opts.playlistend < opts.playliststart:
@@ -300,16 +330,24 @@ def _real_main(argv=None):
         'ratelimit': opts.ratelimit,
         'nooverwrites': opts.nooverwrites,
         'retries': opts_retries,
+        'concurrent_fragment_downloads': opts.concurrent_fragment_downloads,
+        'async_network': opts.async_network,
+        'parallel_merge_downloads': opts.parallel_merge_downloads,
+        'stream_merge': opts.stream_merge,
+        'http_connections': opts.http_connections,
+        'http_chunk_size': opts.http_chunk_size,
         'buffersize': opts.buffersize,
         'noresizebuffer': opts.noresizebuffer,
         'continuedl': opts.continue_dl,
-        'noprogress': opts.noprogress,
+        # Progress is reported as events by the job server
+        'noprogress': opts.noprogress or serve,
         'progress_with_newline': opts.progress_with_newline,
         'playliststart': opts.playliststart,
         'playlistend': opts.playlistend,
         'playlistreverse': opts.playlist_reverse,
+        'parallel_entries': opts.parallel_entries,
         'noplaylist': opts.noplaylist,
-        'logtostderr': opts.outtmpl == '-',
+        'logtostderr': opts.outtmpl == '-' or opts.serve,
         'consoletitle': opts.consoletitle,
         'nopart': opts.nopart,
         'updatetime': opts.updatetime,
@@ -339,11 +377,16 @@ def _real_main(argv=None):
         'max_views': opts.max_views,
         'daterange': date,
         'cachedir': opts.cachedir,
+        'http_cache': opts.http_cache,
+        'http_cache_size': opts.http_cache_size,
+        'http_cache_ttl': http_cache_ttl,
         'youtube_print_sig_code': opts.youtube_print_sig_code,
         'age_limit': opts.age_limit,
         'download_archive': download_archive_fn,
+        'download_archive_format': opts.download_archive_format,
         'cookiefile': opts.cookiefile,
         'nocheckcertificate': opts.no_check_certificate,
+        'keep_alive': opts.keep_alive,
         'prefer_insecure': opts.prefer_insecure,
         'proxy': opts.proxy,
         'socket_timeout': opts.socket_timeout,
@@ -372,6 +415,7 @@ def _real_main(argv=None):
         'hls_use_mpegts': opts.hls_use_mpegts,
         'external_downloader_args': external_downloader_args,
         'postprocessor_args': postprocessor_args,
+        'postprocessor_workers': opts.postprocessor_workers,
         'cn_verification_proxy': opts.cn_verification_proxy,
     }
 
@@ -384,6 +428,16 @@ def _real_main(argv=None):
         if opts.rm_cachedir:
             ydl.cache.remove()
 
+        if serve:
+            if all_urls or opts.load_info_filename is not None:
+                parser.error('--serve and --serve-socket do not take URLs nor --load-info')
+            server = JobServer(ydl)
+            if opts.serve_socket is not None:
+                server.serve_unix_socket(opts.serve_socket)
+            else:
+                server.serve_stdio()
+            sys.exit()
+
         # Maybe do nothing
         if (len(all_urls) < 1) and (opts.load_info_filename is None):
             if opts.update_self or opts.rm_cachedir:
@@ -1,9 +1,14 @@
 from __future__ import unicode_literals
 
 import base64
-from math import ceil
+import itertools
 
-from .utils import bytes_to_intlist, intlist_to_bytes
+from .utils import (
+    bytes_to_intlist,
+    intlist_to_bytes,
+    struct_pack,
+    struct_unpack,
+)
 
 BLOCK_SIZE_BYTES = 16
 
@@ -18,20 +23,10 @@ def aes_ctr_decrypt(data, key, counter):
                                returns the next counter block
     @returns {int[]}           decrypted data
     """
-    expanded_key = key_expansion(key)
-    block_count = int(ceil(float(len(data)) / BLOCK_SIZE_BYTES))
-
-    decrypted_data = []
-    for i in range(block_count):
-        counter_block = counter.next_value()
-        block = data[i * BLOCK_SIZE_BYTES: (i + 1) * BLOCK_SIZE_BYTES]
-        block += [0] * (BLOCK_SIZE_BYTES - len(block))
-
-        cipher_counter_block = aes_encrypt(counter_block, expanded_key)
-        decrypted_data += xor(block, cipher_counter_block)
-    decrypted_data = decrypted_data[:len(data)]
-
-    return decrypted_data
+    counter_blocks = (
+        intlist_to_bytes(counter.next_value()) for _ in itertools.count())
+    return bytes_to_intlist(_aes_ctr_crypt(
+        intlist_to_bytes(data), _encryption_key_words(key), counter_blocks))
 
 
 def aes_cbc_decrypt(data, key, iv):
@@ -43,21 +38,196 @@ def aes_cbc_decrypt(data, key, iv):
     @param {int[]} iv          16-Byte IV
     @returns {int[]}           decrypted data
     """
-    expanded_key = key_expansion(key)
-    block_count = int(ceil(float(len(data)) / BLOCK_SIZE_BYTES))
+    return bytes_to_intlist(aes_cbc_decrypt_bytes(
+        intlist_to_bytes(data), intlist_to_bytes(key), intlist_to_bytes(iv)))
+
+
+def aes_cbc_decrypt_bytes(data, key, iv):
+    """
+    Decrypt with aes in CBC mode
+
+    An incomplete last block is padded with zeros, the decrypted data is
+    truncated to the length of data. The padding of the plaintext (if any)
+    is not removed.
+
+    @param {bytes} data        cipher (bytes, bytearray or memoryview)
+    @param {bytes} key         16/24/32-Byte cipher key
+    @param {bytes} iv          16-Byte IV
+    @returns {bytes}           decrypted data
+    """
+    data = _to_bytes(data)
+    rk = _decryption_key_words(bytes_to_intlist(key))
+    rounds = len(rk) // 4 - 1
+    words = _bytes_to_words(data)
+    p0, p1, p2, p3 = _bytes_to_words(_to_bytes(iv))
+    decrypted = []
+    for i in range(0, len(words), 4):
+        c0, c1, c2, c3 = words[i:i + 4]
+        d0, d1, d2, d3 = _decrypt_block(c0, c1, c2, c3, rk, rounds)
+        decrypted.extend((d0 ^ p0, d1 ^ p1, d2 ^ p2, d3 ^ p3))
+        p0, p1, p2, p3 = c0, c1, c2, c3
+    return _words_to_bytes(decrypted)[:len(data)]
+
+
+def aes_cbc_encrypt_bytes(data, key, iv):
+    """
+    Encrypt with aes in CBC mode
+
+    An incomplete last block is padded with zeros, no other padding is added.
+
+    @param {bytes} data        plaintext (bytes, bytearray or memoryview)
+    @param {bytes} key         16/24/32-Byte cipher key
+    @param {bytes} iv          16-Byte IV
+    @returns {bytes}           cipher
+    """
+    rk = _encryption_key_words(bytes_to_intlist(key))
+    rounds = len(rk) // 4 - 1
+    words = _bytes_to_words(_to_bytes(data))
+    c0, c1, c2, c3 = _bytes_to_words(_to_bytes(iv))
+    encrypted = []
+    for i in range(0, len(words), 4):
+        p0, p1, p2, p3 = words[i:i + 4]
+        c0, c1, c2, c3 = _encrypt_block(
+            p0 ^ c0, p1 ^ c1, p2 ^ c2, p3 ^ c3, rk, rounds)
+        encrypted.extend((c0, c1, c2, c3))
+    return _words_to_bytes(encrypted)
+
+
+def aes_ctr_decrypt_bytes(data, key, initial_counter):
+    """
+    Decrypt (or encrypt) with aes in counter mode
+
+    @param {bytes} data             cipher (bytes, bytearray or memoryview)
+    @param {bytes} key              16/24/32-Byte cipher key
+    @param {bytes} initial_counter  16-Byte first counter block, incremented
+                                    as a big-endian number for every block
+    @returns {bytes}                decrypted data
+    """
+    def counter_blocks():
+        counter = bytes_to_intlist(initial_counter)
+        while True:
+            yield intlist_to_bytes(counter)
+            counter = inc(counter)
+
+    return _aes_ctr_crypt(
+        _to_bytes(data), _encryption_key_words(bytes_to_intlist(key)), counter_blocks())
+
+
+def _aes_ctr_crypt(data, rk, counter_blocks):
+    rounds = len(rk) // 4 - 1
+    words = _bytes_to_words(data)
+    decrypted = []
+    for i in range(0, len(words), 4):
+        k0, k1, k2, k3 = _encrypt_block(
+            *(_bytes_to_words(next(counter_blocks)) + [rk, rounds]))
+        c0, c1, c2, c3 = words[i:i + 4]
+        decrypted.extend((c0 ^ k0, c1 ^ k1, c2 ^ k2, c3 ^ k3))
+    return _words_to_bytes(decrypted)[:len(data)]
+
+
+def _to_bytes(data):
+    if isinstance(data, memoryview):
+        return data.tobytes()
+    if isinstance(data, bytearray):
+        return bytes(data)
+    return data
+
+
+def _bytes_to_words(data):
+    """Split data into big-endian 32-bit words, padding it with zeros to a whole block"""
+    if len(data) % BLOCK_SIZE_BYTES:
+        data += b'\0' * (BLOCK_SIZE_BYTES - len(data) % BLOCK_SIZE_BYTES)
+    return list(struct_unpack('>%dI' % (len(data) // 4), data))
+
+
+def _words_to_bytes(words):
+    return struct_pack('>%dI' % len(words), *words)
 
-    decrypted_data = []
-    previous_cipher_block = iv
-    for i in range(block_count):
-        block = data[i * BLOCK_SIZE_BYTES: (i + 1) * BLOCK_SIZE_BYTES]
-        block += [0] * (BLOCK_SIZE_BYTES - len(block))
 
-        decrypted_block = aes_decrypt(block, expanded_key)
-        decrypted_data += xor(decrypted_block, previous_cipher_block)
-        previous_cipher_block = block
-    decrypted_data = decrypted_data[:len(data)]
+def _key_words(expanded_key):
+    return [
+        (expanded_key[i] << 24) | (expanded_key[i + 1] << 16) |
+        (expanded_key[i + 2] << 8) | expanded_key[i + 3]
+        for i in range(0, len(expanded_key), 4)]
 
-    return decrypted_data
+
+def _encryption_key_words(key):
+    return _key_words(key_expansion(key))
+
+
+def _decryption_key_words(key):
+    return _inverse_key_words(_encryption_key_words(key))
+
+
+def _inverse_key_words(rk):
+    """
+    Round keys of the equivalent inverse cipher: the rounds are reversed
+    and InvMixColumns is applied to the keys of the inner rounds
+    """
+    rounds = len(rk) // 4 - 1
+    drk = list(rk[rounds * 4:rounds * 4 + 4])
+    for r in range(rounds - 1, 0, -1):
+        for w in rk[r * 4:r * 4 + 4]:
+            drk.append(
+                TD0[SBOX[w >> 24]] ^ TD1[SBOX[(w >> 16) & 0xFF]] ^
+                TD2[SBOX[(w >> 8) & 0xFF]] ^ TD3[SBOX[w & 0xFF]])
+    drk.extend(rk[:4])
+    return drk
+
+
+def _encrypt_block(s0, s1, s2, s3, rk, rounds):
+    """Encrypt a block given as four 32-bit words with the T-tables"""
+    te0, te1, te2, te3, sbox = TE0, TE1, TE2, TE3, SBOX
+    s0 ^= rk[0]
+    s1 ^= rk[1]
+    s2 ^= rk[2]
+    s3 ^= rk[3]
+    k = 4
+    for _ in range(rounds - 1):
+        t0 = te0[s0 >> 24] ^ te1[(s1 >> 16) & 0xFF] ^ te2[(s2 >> 8) & 0xFF] ^ te3[s3 & 0xFF] ^ rk[k]
+        t1 = te0[s1 >> 24] ^ te1[(s2 >> 16) & 0xFF] ^ te2[(s3 >> 8) & 0xFF] ^ te3[s0 & 0xFF] ^ rk[k + 1]
+        t2 = te0[s2 >> 24] ^ te1[(s3 >> 16) & 0xFF] ^ te2[(s0 >> 8) & 0xFF] ^ te3[s1 & 0xFF] ^ rk[k + 2]
+        s3 = te0[s3 >> 24] ^ te1[(s0 >> 16) & 0xFF] ^ te2[(s1 >> 8) & 0xFF] ^ te3[s2 & 0xFF] ^ rk[k + 3]
+        s0, s1, s2 = t0, t1, t2
+        k += 4
+    return (
+        ((sbox[s0 >> 24] << 24) | (sbox[(s1 >> 16) & 0xFF] << 16) |
+         (sbox[(s2 >> 8) & 0xFF] << 8) | sbox[s3 & 0xFF]) ^ rk[k],
+        ((sbox[s1 >> 24] << 24) | (sbox[(s2 >> 16) & 0xFF] << 16) |
+         (sbox[(s3 >> 8) & 0xFF] << 8) | sbox[s0 & 0xFF]) ^ rk[k + 1],
+        ((sbox[s2 >> 24] << 24) | (sbox[(s3 >> 16) & 0xFF] << 16) |
+         (sbox[(s0 >> 8) & 0xFF] << 8) | sbox[s1 & 0xFF]) ^ rk[k + 2],
+        ((sbox[s3 >> 24] << 24) | (sbox[(s0 >> 16) & 0xFF] << 16) |
+         (sbox[(s1 >> 8) & 0xFF] << 8) | sbox[s2 & 0xFF]) ^ rk[k + 3])
+
+
+def _decrypt_block(s0, s1, s2, s3, rk, rounds):
+    """
+    Decrypt a block given as four 32-bit words with the T-tables, rk are the
+    round keys returned by _inverse_key_words
+    """
+    td0, td1, td2, td3, sbox_inv = TD0, TD1, TD2, TD3, SBOX_INV
+    s0 ^= rk[0]
+    s1 ^= rk[1]
+    s2 ^= rk[2]
+    s3 ^= rk[3]
+    k = 4
+    for _ in range(rounds - 1):
+        t0 = td0[s0 >> 24] ^ td1[(s3 >> 16) & 0xFF] ^ td2[(s2 >> 8) & 0xFF] ^ td3[s1 & 0xFF] ^ rk[k]
+        t1 = td0[s1 >> 24] ^ td1[(s0 >> 16) & 0xFF] ^ td2[(s3 >> 8) & 0xFF] ^ td3[s2 & 0xFF] ^ rk[k + 1]
+        t2 = td0[s2 >> 24] ^ td1[(s1 >> 16) & 0xFF] ^ td2[(s0 >> 8) & 0xFF] ^ td3[s3 & 0xFF] ^ rk[k + 2]
+        s3 = td0[s3 >> 24] ^ td1[(s2 >> 16) & 0xFF] ^ td2[(s1 >> 8) & 0xFF] ^ td3[s0 & 0xFF] ^ rk[k + 3]
+        s0, s1, s2 = t0, t1, t2
+        k += 4
+    return (
+        ((sbox_inv[s0 >> 24] << 24) | (sbox_inv[(s3 >> 16) & 0xFF] << 16) |
+         (sbox_inv[(s2 >> 8) & 0xFF] << 8) | sbox_inv[s1 & 0xFF]) ^ rk[k],
+        ((sbox_inv[s1 >> 24] << 24) | (sbox_inv[(s0 >> 16) & 0xFF] << 16) |
+         (sbox_inv[(s3 >> 8) & 0xFF] << 8) | sbox_inv[s2 & 0xFF]) ^ rk[k + 1],
+        ((sbox_inv[s2 >> 24] << 24) | (sbox_inv[(s1 >> 16) & 0xFF] << 16) |
+         (sbox_inv[(s0 >> 8) & 0xFF] << 8) | sbox_inv[s3 & 0xFF]) ^ rk[k + 2],
+        ((sbox_inv[s3 >> 24] << 24) | (sbox_inv[(s2 >> 16) & 0xFF] << 16) |
+         (sbox_inv[(s1 >> 8) & 0xFF] << 8) | sbox_inv[s0 & 0xFF]) ^ rk[k + 3])
 
 
 def key_expansion(data):
@@ -103,17 +273,13 @@ def aes_encrypt(data, expanded_key):
     @param {int[]} expanded_key  176/208/240-Byte expanded key
     @returns {int[]}             16-Byte cipher
     """
-    rounds = len(expanded_key) // BLOCK_SIZE_BYTES - 1
-
-    data = xor(data, expanded_key[:BLOCK_SIZE_BYTES])
-    for i in range(1, rounds + 1):
-        data = sub_bytes(data)
-        data = shift_rows(data)
-        if i != rounds:
-            data = mix_columns(data)
-        data = xor(data, expanded_key[i * BLOCK_SIZE_BYTES: (i + 1) * BLOCK_SIZE_BYTES])
-
-    return data
+    rk = _key_words(expanded_key)
+    rounds = len(rk) // 4 - 1
+    if rounds == 0:
+        return xor(data, expanded_key)
+    block = _encrypt_block(
+        *(_bytes_to_words(intlist_to_bytes(data)) + [rk, rounds]))
+    return bytes_to_intlist(_words_to_bytes(block))[:len(data)]
 
 
 def aes_decrypt(data, expanded_key):
@@ -124,17 +290,13 @@ def aes_decrypt(data, expanded_key):
     @param {int[]} expanded_key  176/208/240-Byte expanded key
     @returns {int[]}             16-Byte state
     """
-    rounds = len(expanded_key) // BLOCK_SIZE_BYTES - 1
-
-    for i in range(rounds, 0, -1):
-        data = xor(data, expanded_key[i * BLOCK_SIZE_BYTES: (i + 1) * BLOCK_SIZE_BYTES])
-        if i != rounds:
-            data = mix_columns_inv(data)
-        data = shift_rows_inv(data)
-        data = sub_bytes_inv(data)
-    data = xor(data, expanded_key[:BLOCK_SIZE_BYTES])
-
-    return data
+    rk = _key_words(expanded_key)
+    rounds = len(rk) // 4 - 1
+    if rounds == 0:
+        return xor(data, expanded_key)
+    block = _decrypt_block(
+        *(_bytes_to_words(intlist_to_bytes(data)) + [_inverse_key_words(rk), rounds]))
+    return bytes_to_intlist(_words_to_bytes(block))[:len(data)]
 
 
 def aes_decrypt_text(data, password, key_size_bytes):
@@ -318,6 +480,35 @@ def shift_rows_inv(data):
     return data_shifted
 
 
+def _build_t_tables():
+    """
+    Precompute the tables combining SubBytes, ShiftRows and MixColumns (and
+    their inverses) for every byte value, TE1-3 and TD1-3 are rotations of
+    TE0 and TD0
+    """
+    def word(b0, b1, b2, b3):
+        return (b0 << 24) | (b1 << 16) | (b2 << 8) | b3
+
+    te, td = [[] for _ in range(4)], [[] for _ in range(4)]
+    for x in range(256):
+        s = SBOX[x]
+        s2, s3 = rijndael_mul(s, 2), rijndael_mul(s, 3)
+        te[0].append(word(s2, s, s, s3))
+        te[1].append(word(s3, s2, s, s))
+        te[2].append(word(s, s3, s2, s))
+        te[3].append(word(s, s, s3, s2))
+        si = SBOX_INV[x]
+        s9, sb, sd, se = (rijndael_mul(si, m) for m in (0x9, 0xB, 0xD, 0xE))
+        td[0].append(word(se, s9, sd, sb))
+        td[1].append(word(sb, se, s9, sd))
+        td[2].append(word(sd, sb, se, s9))
+        td[3].append(word(s9, sd, sb, se))
+    return tuple(map(tuple, te)), tuple(map(tuple, td))
+
+
+(TE0, TE1, TE2, TE3), (TD0, TD1, TD2, TD3) = _build_t_tables()
+
+
 def inc(data):
     data = data[:]  # copy
     for i in range(len(data) - 1, -1, -1):
@@ -328,4 +519,7 @@ def inc(data):
             break
     return data
 
-__all__ = ['aes_encrypt', 'key_expansion', 'aes_ctr_decrypt', 'aes_cbc_decrypt', 'aes_decrypt_text']
+__all__ = [
+    'aes_encrypt', 'key_expansion', 'aes_ctr_decrypt', 'aes_cbc_decrypt', 'aes_decrypt_text',
+    'aes_cbc_decrypt_bytes', 'aes_cbc_encrypt_bytes', 'aes_ctr_decrypt_bytes',
+]
@@ -0,0 +1,134 @@
+from __future__ import unicode_literals
+
+import errno
+import io
+import os
+import threading
+
+try:
+    import sqlite3
+except ImportError:  # Python built without sqlite support
+    sqlite3 = None
+
+from .utils import locked_file
+
+
+ARCHIVE_FORMATS = ('text', 'sqlite')
+
+
+class DownloadArchive(object):
+    """
+    Download archive stored as a text file with one video per line.
+
+    The file is read once, the first time it's needed, and the videos are
+    kept in a set. Recorded videos are added to the set and appended to the
+    file, videos recorded by other processes after the file was read are not
+    seen.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._ids = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        ids = set()
+        try:
+            with locked_file(self.filename, 'r', encoding='utf-8') as archive_file:
+                for line in archive_file:
+                    ids.add(line.strip())
+        except IOError as ioe:
+            if ioe.errno != errno.ENOENT:
+                raise
+        return ids
+
+    def __contains__(self, vid_id):
+        with self._lock:
+            if self._ids is None:
+                self._ids = self._load()
+            return vid_id in self._ids
+
+    def add(self, vid_id):
+        with self._lock:
+            with locked_file(self.filename, 'a', encoding='utf-8') as archive_file:
+                archive_file.write(vid_id + '\n')
+            if self._ids is not None:
+                self._ids.add(vid_id)
+
+    def close(self):
+        pass
+
+
+class SQLiteDownloadArchive(object):
+    """
+    Download archive stored in an SQLite database.
+
+    Every lookup is a query on the primary key, so large archives are not
+    loaded in memory and videos recorded by other processes are seen
+    immediately.
+    """
+
+    _TIMEOUT = 60
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            # The connection is shared by the threads processing playlist
+            # entries, the accesses are serialized with self._lock
+            self._conn = sqlite3.connect(
+                self.filename, timeout=self._TIMEOUT, check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    'CREATE TABLE IF NOT EXISTS archive (id TEXT PRIMARY KEY)')
+        return self._conn
+
+    def __contains__(self, vid_id):
+        with self._lock:
+            cursor = self._connect().execute(
+                'SELECT 1 FROM archive WHERE id = ?', (vid_id,))
+            return cursor.fetchone() is not None
+
+    def add(self, vid_id):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    'INSERT OR IGNORE INTO archive (id) VALUES (?)', (vid_id,))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def guess_archive_format(filename):
+    """
+    Return 'sqlite' for SQLite databases and 'text' otherwise. The extension
+    of the file is only used when it's missing or empty.
+    """
+    try:
+        with io.open(filename, 'rb') as f:
+            header = f.read(16)
+    except IOError:
+        header = b''
+    if header:
+        return 'sqlite' if header == b'SQLite format 3\0' else 'text'
+    if os.path.splitext(filename)[1].lower() in ('.sqlite', '.sqlite3', '.db'):
+        return 'sqlite'
+    return 'text'
+
+
+def open_download_archive(filename, archive_format=None):
+    if archive_format is None:
+        archive_format = guess_archive_format(filename)
+    assert archive_format in ARCHIVE_FORMATS
+    if archive_format == 'sqlite':
+        if sqlite3 is None:
+            raise ValueError('SQLite download archives are not supported by this Python')
+        return SQLiteDownloadArchive(filename)
+    return DownloadArchive(filename)
@@ -0,0 +1,631 @@
+from __future__ import unicode_literals
+
+import socket
+import ssl
+import threading
+import weakref
+import zlib
+
+try:
+    import asyncio
+except ImportError:  # Python 2
+    asyncio = None
+
+from .compat import (
+    compat_HTTPError,
+    compat_urllib_request,
+    compat_urlparse,
+)
+from .utils import (
+    escape_url,
+    int_or_none,
+    make_http_headers,
+    sanitized_Request,
+    std_headers,
+)
+
+
+_MAX_LINE_LENGTH = 64 * 1024
+_REDIRECT_CODES = (301, 302, 303, 307, 308)
+_MAX_REDIRECTS = 10
+# Idle connections kept for every host
+_MAX_IDLE_CONNECTIONS = 32
+
+
+def is_available(params):
+    """ Whether AsyncHTTPClient can be used with the given YoutubeDL params """
+    if asyncio is None:
+        return False
+    # Only direct connections are supported
+    proxy = params.get('proxy')
+    if proxy is None:
+        return not compat_urllib_request.getproxies()
+    return proxy == ''
+
+
+class HTTPParseError(Exception):
+    pass
+
+
+class HTTPResponseParser(object):
+    """
+    Incremental parser of an HTTP/1.x response. feed() takes the bytes
+    received on the connection and returns a list of events: ('headers',)
+    once the status and headers are known, ('data', chunk) for every piece
+    of the body and ('end',) when the response is complete.
+    """
+
+    def __init__(self, method='GET'):
+        self._method = method
+        self._buf = b''
+        self._state = 'status'
+        # Bytes left in the body or the current chunk, None until the end
+        # of the connection
+        self._remaining = None
+        self.version = None
+        self.status = None
+        self.reason = None
+        self.headers = []
+        self.keep_alive = False
+
+    def get_header(self, name, default=None):
+        name = name.lower()
+        for header_name, value in self.headers:
+            if header_name.lower() == name:
+                return value
+        return default
+
+    def _line(self, line, events):
+        state = self._state
+        if state == 'status':
+            parts = line.decode('iso-8859-1').split(None, 2)
+            if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+                raise HTTPParseError('Invalid status line %r' % line)
+            try:
+                self.status = int(parts[1])
+            except ValueError:
+                raise HTTPParseError('Invalid status line %r' % line)
+            self.version = parts[0]
+            self.reason = parts[2] if len(parts) > 2 else ''
+            self.headers = []
+            self._state = 'headers'
+        elif state == 'headers':
+            if line:
+                name, sep, value = line.decode('iso-8859-1').partition(':')
+                if not sep:
+                    raise HTTPParseError('Invalid header line %r' % line)
+                self.headers.append((name.strip(), value.strip()))
+                return
+            if 100 <= self.status < 200:
+                # Interim response, the real one follows
+                self._state = 'status'
+                return
+            self._end_of_headers(events)
+        elif state == 'chunk_size':
+            try:
+                size = int(line.split(b';')[0].strip(), 16)
+            except ValueError:
+                raise HTTPParseError('Invalid chunk size %r' % line)
+            if size == 0:
+                self._state = 'trailers'
+            else:
+                self._remaining = size
+                self._state = 'chunk_data'
+        elif state == 'chunk_end':
+            if line:
+                raise HTTPParseError('Missing CRLF after chunk')
+            self._state = 'chunk_size'
+        elif state == 'trailers':
+            if not line:
+                self._state = 'done'
+                events.append(('end',))
+
+    def _end_of_headers(self, events):
+        connection = (self.get_header('Connection') or '').lower()
+        if self.version == 'HTTP/1.1':
+            self.keep_alive = connection != 'close'
+        else:
+            self.keep_alive = connection == 'keep-alive'
+        events.append(('headers',))
+        if self._method == 'HEAD' or self.status in (204, 304):
+            self._state = 'done'
+            events.append(('end',))
+        elif 'chunked' in (self.get_header('Transfer-Encoding') or '').lower():
+            self._state = 'chunk_size'
+        elif self.get_header('Content-Length') is not None:
+            try:
+                self._remaining = int(self.get_header('Content-Length'))
+            except ValueError:
+                raise HTTPParseError('Invalid Content-Length')
+            self._state = 'body'
+            if self._remaining == 0:
+                self._state = 'done'
+                events.append(('end',))
+        else:
+            # The body ends with the connection
+            self.keep_alive = False
+            self._state = 'body'
+
+    def feed(self, data):
+        events = []
+        self._buf += data
+        while self._buf:
+            if self._state in ('body', 'chunk_data'):
+                if self._remaining is None:
+                    chunk, self._buf = self._buf, b''
+                else:
+                    chunk = self._buf[:self._remaining]
+                    self._buf = self._buf[len(chunk):]
+                    self._remaining -= len(chunk)
+                events.append(('data', chunk))
+                if self._remaining == 0:
+                    if self._state == 'body':
+                        self._state = 'done'
+                        events.append(('end',))
+                    else:
+                        self._state = 'chunk_end'
+            elif self._state == 'done':
+                # Nothing is expected after the response
+                self._buf = b''
+            else:
+                idx = self._buf.find(b'\n')
+                if idx < 0:
+                    if len(self._buf) > _MAX_LINE_LENGTH:
+                        raise HTTPParseError('Line too long')
+                    break
+                line, self._buf = self._buf[:idx].rstrip(b'\r'), self._buf[idx + 1:]
+                self._line(line, events)
+        return events
+
+    def feed_eof(self):
+        """ Return the events of the end of the connection """
+        if self._state == 'body' and self._remaining is None:
+            self._state = 'done'
+            return [('end',)]
+        if self._state == 'done':
+            return []
+        raise HTTPParseError('Connection closed before the end of the response')
+
+    @property
+    def started(self):
+        return self._state != 'status' or bool(self._buf)
+
+
+class _Decoder(object):
+    """ Decode gzip and deflate bodies while they are received """
+
+    def __init__(self, encoding):
+        if encoding == 'gzip':
+            self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+        else:
+            self._obj = None
+        self._encoding = encoding
+        self._started = False
+
+    def decode(self, data):
+        if self._obj is None:
+            return data
+        if not self._started and self._encoding == 'deflate' and data:
+            # Some servers send zlib streams instead of raw deflate
+            self._started = True
+            if (ord(data[:1]) & 0x0f) == 8 and (ord(data[:1]) * 256 + ord(data[1:2])) % 31 == 0:
+                self._obj = zlib.decompressobj()
+        return self._obj.decompress(data)
+
+    def flush(self):
+        return self._obj.flush() if self._obj is not None else b''
+
+
+class _HTTPConnection(asyncio.Protocol if asyncio else object):
+    def __init__(self, client, key):
+        self.client = client
+        self.key = key
+        self.transport = None
+        self.exchange = None
+        self.closed = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        if self.exchange is None:
+            # Nothing is expected on an idle connection
+            self.transport.close()
+            return
+        self.exchange.data_received(data)
+
+    def connection_lost(self, exc):
+        self.closed = True
+        self.client._connection_lost(self)
+        exchange, self.exchange = self.exchange, None
+        if exchange is not None:
+            exchange.connection_lost(exc)
+
+    def close(self):
+        self.exchange = None
+        if self.transport is not None:
+            self.transport.close()
+
+
+class AsyncHTTPResponse(object):
+    def __init__(self, url, status, reason, headers, body):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+
+class _Exchange(object):
+    """
+    A GET request with its redirects and retries, run in the event loop.
+    callback(response, exc) is called with an AsyncHTTPResponse or the
+    exception that made it fail. progress(downloaded_bytes, total_bytes) is
+    called as the content is received, total_bytes is None if unknown.
+    """
+
+    def __init__(self, client, url, headers, callback, retries, progress=None):
+        self._client = client
+        self._url = url
+        self._headers = headers
+        self._callback = callback
+        self._retries = retries
+        self._progress = progress
+        # Bytes reported to progress, they never go backwards on retries
+        self._reported_bytes = 0
+        self._redirects = 0
+        self._conn = None
+        self._timer = None
+        self._finished = False
+
+    def start(self):
+        self._parser = HTTPResponseParser()
+        self._chunks = []
+        self._received_bytes = 0
+        self._decoder = None
+        self._redirect_url = None
+        self._reused = False
+        self._client._get_connection(self._url, self._on_connection)
+
+    def _request_headers(self):
+        req = sanitized_Request(self._url, None, self._headers)
+        for name, value in std_headers.items():
+            if not req.has_header(name.capitalize()):
+                req.add_header(name, value)
+        if req.has_header('Youtubedl-no-compression'):
+            req.headers.pop('Accept-encoding', None)
+            req.headers.pop('Youtubedl-no-compression', None)
+        cookiejar = self._client.cookiejar
+        if cookiejar is not None:
+            cookiejar.add_cookie_header(req)
+        self._request = req
+        return req.header_items()
+
+    def _on_connection(self, conn, reused, exc):
+        if self._finished:
+            if conn is not None:
+                self._client._release(conn, True)
+            return
+        if exc is not None:
+            self._fail(exc)
+            return
+        self._conn = conn
+        self._reused = reused
+        conn.exchange = self
+        parsed = compat_urlparse.urlparse(self._url)
+        path = parsed.path or '/'
+        if parsed.query:
+            path += '?' + parsed.query
+        lines = ['GET %s HTTP/1.1' % path, 'Host: %s' % parsed.netloc]
+        lines.extend(
+            '%s: %s' % (name, value) for name, value in self._request_headers()
+            if name.lower() != 'host')
+        conn.transport.write(('\r\n'.join(lines) + '\r\n\r\n').encode('iso-8859-1'))
+        self._arm_timer()
+
+    def _arm_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self._client.loop.call_later(self._client.timeout, self._on_timeout)
+
+    def _on_timeout(self):
+        self._timer = None
+        self._drop_connection()
+        self._retry_or_fail(socket.timeout('timed out'))
+
+    def _drop_connection(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            conn.close()
+
+    def data_received(self, data):
+        self._arm_timer()
+        try:
+            events = self._parser.feed(data)
+        except HTTPParseError as e:
+            self._drop_connection()
+            self._retry_or_fail(e)
+            return
+        self._handle_events(events)
+
+    def _handle_events(self, events):
+        for event in events:
+            if self._finished:
+                return
+            if event[0] == 'headers':
+                if not self._on_headers():
+                    return
+            elif event[0] == 'data':
+                if self._redirect_url is None:
+                    chunk = self._decoder.decode(event[1])
+                    self._chunks.append(chunk)
+                    self._report_progress(len(chunk))
+            else:
+                self._on_end()
+
+    def _report_progress(self, chunk_size):
+        self._received_bytes += chunk_size
+        if self._progress is None or self._received_bytes <= self._reported_bytes:
+            return
+        self._reported_bytes = self._received_bytes
+        total_bytes = None
+        if not self._parser.get_header('Content-Encoding'):
+            total_bytes = int_or_none(self._parser.get_header('Content-Length'))
+        self._progress(self._received_bytes, total_bytes)
+
+    def _on_headers(self):
+        parser = self._parser
+        cookiejar = self._client.cookiejar
+        if cookiejar is not None:
+            cookiejar.extract_cookies(
+                _CookieResponse(make_http_headers(parser.headers)), self._request)
+        location = parser.get_header('Location')
+        if parser.status in _REDIRECT_CODES and location:
+            if self._redirects >= _MAX_REDIRECTS:
+                # The body of the redirect must not be taken as the content
+                self._drop_connection()
+                self._fail(compat_HTTPError(
+                    self._url, parser.status, 'Too many redirects',
+                    make_http_headers(parser.headers), None))
+                return False
+            self._redirect_url = escape_url(compat_urlparse.urljoin(self._url, location))
+            return True
+        if parser.status >= 500 and self._retries > 0:
+            self._drop_connection()
+            self._retry_or_fail(None)
+            return False
+        self._decoder = _Decoder((parser.get_header('Content-Encoding') or '').lower())
+        return True
+
+    def _on_end(self):
+        conn, self._conn = self._conn, None
+        self._client._release(conn, not self._parser.keep_alive)
+        if self._redirect_url is not None:
+            self._redirects += 1
+            self._url = self._redirect_url
+            self.start()
+            return
+        self._chunks.append(self._decoder.flush())
+        parser = self._parser
+        headers = [(name, value) for name, value in parser.headers
+                   if name.lower() not in ('content-encoding', 'transfer-encoding')]
+        self._finish(AsyncHTTPResponse(
+            self._url, parser.status, parser.reason, headers, b''.join(self._chunks)), None)
+
+    def connection_lost(self, exc):
+        self._conn = None
+        if self._finished:
+            return
+        try:
+            events = self._parser.feed_eof()
+        except HTTPParseError as e:
+            if self._reused and not self._parser.started:
+                # The server closed the idle connection, try a new one
+                self.start()
+                return
+            self._retry_or_fail(exc or e)
+            return
+        self._handle_events(events)
+
+    def _retry_or_fail(self, exc):
+        if self._finished:
+            return
+        if self._retries > 0:
+            self._retries -= 1
+            self.start()
+            return
+        self._fail(exc or HTTPParseError('Server error %d' % self._parser.status))
+
+    def _fail(self, exc):
+        self._finish(None, exc)
+
+    def _finish(self, response, exc):
+        if self._finished:
+            return
+        self._finished = True
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._callback(response, exc)
+
+    def cancel(self):
+        if self._finished:
+            return
+        self._finished = True
+        if self._timer is not None:
+            self._timer.cancel()
+        self._drop_connection()
+
+
+class _CookieResponse(object):
+    """ What CookieJar.extract_cookies needs from a response """
+
+    def __init__(self, headers):
+        self._headers = headers
+
+    def info(self):
+        return self._headers
+
+
+class AsyncHTTPClient(object):
+    """
+    HTTP/1.1 client running on an asyncio event loop, for GET requests.
+
+    Connections are kept alive and reused, and any number of requests can
+    be in progress at the same time on the single thread of the loop.
+    Cookies are read from and stored in cookiejar. All the methods except
+    fetch must be called from the thread of the loop.
+    """
+
+    def __init__(self, loop_thread, cookiejar=None, timeout=600,
+                 verify_certificates=True, source_address=None):
+        self.loop_thread = loop_thread
+        self.loop = loop_thread.loop
+        self.cookiejar = cookiejar
+        self.timeout = timeout
+        self._source_address = source_address
+        self._ssl_context = ssl.create_default_context()
+        if not verify_certificates:
+            self._ssl_context.check_hostname = False
+            self._ssl_context.verify_mode = ssl.CERT_NONE
+        # (scheme, host, port) -> idle connections
+        self._idle = {}
+
+    def _get_connection(self, url, callback):
+        parsed = compat_urlparse.urlparse(url)
+        scheme = parsed.scheme.lower()
+        if scheme not in ('http', 'https'):
+            callback(None, False, ValueError('Unsupported URL scheme %s' % scheme))
+            return
+        key = (scheme, parsed.hostname, parsed.port or (443 if scheme == 'https' else 80))
+        idle = self._idle.get(key)
+        while idle:
+            conn = idle.pop()
+            if not conn.closed:
+                callback(conn, True, None)
+                return
+
+        def on_connected(task):
+            if task.cancelled():
+                callback(None, False, socket.error('Connection cancelled'))
+            elif task.exception() is not None:
+                callback(None, False, task.exception())
+            else:
+                callback(task.result()[1], False, None)
+
+        kwargs = {}
+        if scheme == 'https':
+            kwargs['ssl'] = self._ssl_context
+        if self._source_address:
+            kwargs['local_addr'] = (self._source_address, 0)
+        task = self.loop.create_task(self.loop.create_connection(
+            lambda: _HTTPConnection(self, key), key[1], key[2], **kwargs))
+        task.add_done_callback(on_connected)
+
+    def _release(self, conn, close):
+        if conn is None:
+            return
+        conn.exchange = None
+        idle = self._idle.setdefault(conn.key, [])
+        if close or conn.closed or len(idle) >= _MAX_IDLE_CONNECTIONS:
+            conn.close()
+        else:
+            idle.append(conn)
+
+    def _connection_lost(self, conn):
+        idle = self._idle.get(conn.key)
+        if idle and conn in idle:
+            idle.remove(conn)
+
+    def start_fetch(self, url, callback, headers={}, retries=0, progress=None):
+        """
+        Start downloading url, callback(response, exc) and
+        progress(downloaded_bytes, total_bytes) are called in the thread of
+        the loop. Return an object whose cancel method stops the download,
+        to be called in the thread of the loop too.
+        """
+        exchange = _Exchange(self, url, headers, callback, retries, progress)
+        exchange.start()
+        return exchange
+
+    def fetch(self, url, headers={}, retries=0):
+        """
+        Download url from any other thread, waiting for the whole response.
+        Raise compat_HTTPError for HTTP errors.
+        """
+        result = {}
+        done = threading.Event()
+
+        def callback(response, exc):
+            result.update(response=response, exc=exc)
+            done.set()
+
+        self.loop_thread.call_soon(self.start_fetch, url, callback, headers, retries)
+        while not done.is_set():
+            # Wait with a timeout so that KeyboardInterrupt is not blocked
+            done.wait(1)
+        if result['exc'] is not None:
+            raise result['exc']
+        response = result['response']
+        check_response(response)
+        return response
+
+
+def check_response(response):
+    """ Raise compat_HTTPError if response is an HTTP error """
+    if response.status >= 400:
+        raise compat_HTTPError(
+            response.url, response.status, response.reason,
+            make_http_headers(response.headers), None)
+
+
+class EventLoopThread(object):
+    """ An asyncio event loop running forever in a daemon thread """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def call_soon(self, func, *args):
+        """ Call func(*args) in the thread of the loop """
+        self.loop.call_soon_threadsafe(func, *args)
+
+
+_LOOP_THREAD = None
+_LOOP_THREAD_LOCK = threading.Lock()
+
+
+def get_event_loop_thread():
+    """ Return the event loop shared by all the downloads of the process """
+    global _LOOP_THREAD
+    with _LOOP_THREAD_LOCK:
+        if _LOOP_THREAD is None:
+            _LOOP_THREAD = EventLoopThread()
+        return _LOOP_THREAD
+
+
+_CLIENTS = weakref.WeakKeyDictionary()
+
+
+def get_client(ydl):
+    """ Return the AsyncHTTPClient shared by the downloads of ydl """
+    with _LOOP_THREAD_LOCK:
+        client = _CLIENTS.get(ydl)
+    if client is None:
+        params = ydl.params
+        client = AsyncHTTPClient(
+            get_event_loop_thread(), cookiejar=ydl.cookiejar,
+            timeout=ydl._socket_timeout,
+            verify_certificates=not params.get('nocheckcertificate'),
+            source_address=params.get('source_address'))
+        with _LOOP_THREAD_LOCK:
+            client = _CLIENTS.setdefault(ydl, client)
+    return client
@@ -1,18 +1,28 @@
 from __future__ import unicode_literals
 
 import errno
+import gzip
 import io
 import json
 import os
 import re
 import shutil
+import sys
+import tempfile
 import traceback
+import zlib
 
 from .compat import compat_expanduser, compat_getenv
-from .utils import write_json_file
+from .utils import (
+    locked_file,
+    write_json_file,
+)
 
 
 class Cache(object):
+    # Plain JSON or gzip compressed JSON, for large entries
+    _DTYPES = ('json', 'json.gz')
+
     def __init__(self, ydl):
         self._ydl = ydl
 
@@ -34,27 +44,72 @@ class Cache(object):
     def enabled(self):
         return self._ydl.params.get('cachedir') is not False
 
+    def _write(self, fn, data, dtype):
+        try:
+            os.makedirs(os.path.dirname(fn))
+        except OSError as ose:
+            if ose.errno != errno.EEXIST:
+                raise
+        if dtype == 'json':
+            write_json_file(data, fn)
+            return
+
+        # Compressed JSON, written to a temporary file which is renamed so
+        # that readers never see a partial file
+        content = io.BytesIO()
+        gz = gzip.GzipFile(fileobj=content, mode='wb')
+        try:
+            gz.write(json.dumps(data).encode('utf-8'))
+        finally:
+            gz.close()
+        fd, tmp_fn = tempfile.mkstemp(
+            suffix='.tmp', prefix=os.path.basename(fn) + '.',
+            dir=os.path.dirname(fn))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content.getvalue())
+            if sys.platform == 'win32':
+                # os.rename can't replace an existing file on Windows
+                try:
+                    os.unlink(fn)
+                except OSError:
+                    pass
+            os.rename(tmp_fn, fn)
+        except Exception:
+            try:
+                os.remove(tmp_fn)
+            except OSError:
+                pass
+            raise
+
+    def _read(self, fn, dtype):
+        if dtype == 'json':
+            with io.open(fn, 'r', encoding='utf-8') as cachef:
+                return json.load(cachef)
+        with open(fn, 'rb') as cachef:
+            content = cachef.read()
+        gz = gzip.GzipFile(fileobj=io.BytesIO(content), mode='rb')
+        try:
+            return json.loads(gz.read().decode('utf-8'))
+        finally:
+            gz.close()
+
     def store(self, section, key, data, dtype='json'):
-        assert dtype in ('json',)
+        assert dtype in self._DTYPES
 
         if not self.enabled:
             return
 
         fn = self._get_cache_fn(section, key, dtype)
         try:
-            try:
-                os.makedirs(os.path.dirname(fn))
-            except OSError as ose:
-                if ose.errno != errno.EEXIST:
-                    raise
-            write_json_file(data, fn)
+            self._write(fn, data, dtype)
         except Exception:
             tb = traceback.format_exc()
             self._ydl.report_warning(
                 'Writing cache to %r failed: %s' % (fn, tb))
 
     def load(self, section, key, dtype='json', default=None):
-        assert dtype in ('json',)
+        assert dtype in self._DTYPES
 
         if not self.enabled:
             return default
@@ -62,9 +117,8 @@ class Cache(object):
         cache_fn = self._get_cache_fn(section, key, dtype)
         try:
             try:
-                with io.open(cache_fn, 'r', encoding='utf-8') as cachef:
-                    return json.load(cachef)
-            except ValueError:
+                return self._read(cache_fn, dtype)
+            except (ValueError, EOFError, zlib.error):
                 try:
                     file_size = os.path.getsize(cache_fn)
                 except (OSError, IOError) as oe:
@@ -76,6 +130,35 @@ class Cache(object):
 
         return default
 
+    def update(self, section, key, func, dtype='json'):
+        """
+        Replace the cached data with func(data), where data is None if there
+        is nothing cached yet.
+
+        Concurrent updates of the same entry, from other threads or
+        processes, are serialized with a lock file so that none of them is
+        lost. Readers don't need the lock since the entries are replaced
+        atomically.
+        """
+        assert dtype in self._DTYPES
+
+        if not self.enabled:
+            return
+
+        fn = self._get_cache_fn(section, key, dtype)
+        try:
+            try:
+                os.makedirs(os.path.dirname(fn))
+            except OSError as ose:
+                if ose.errno != errno.EEXIST:
+                    raise
+            with locked_file(fn + '.lock', 'a', encoding='utf-8'):
+                self._write(fn, func(self.load(section, key, dtype)), dtype)
+        except Exception:
+            tb = traceback.format_exc()
+            self._ydl.report_warning(
+                'Writing cache to %r failed: %s' % (fn, tb))
+
     def remove(self):
         if not self.enabled:
             self._ydl.to_screen('Cache is disabled (Did you combine --no-cache-dir and --rm-cache-dir?)')
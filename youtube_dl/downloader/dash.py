@@ -1,13 +1,8 @@
 from __future__ import unicode_literals
 
-import os
 import re
 
 from .fragment import FragmentFD
-from ..utils import (
-    sanitize_open,
-    encodeFilename,
-)
 
 
 class DashSegmentsFD(FragmentFD):
@@ -34,26 +29,24 @@ class DashSegmentsFD(FragmentFD):
                 return target_url
             return '%s%s%s' % (base_url, '' if base_url.endswith('/') else '/', target_url)
 
-        segments_filenames = []
-
-        def append_url_to_file(target_url, target_filename):
-            success = ctx['dl'].download(target_filename, {'url': combine_url(base_url, target_url)})
-            if not success:
-                return False
-            down, target_sanitized = sanitize_open(target_filename, 'rb')
-            ctx['dest_stream'].write(down.read())
-            down.close()
-            segments_filenames.append(target_sanitized)
-
+        fragments = []
         if initialization_url:
-            append_url_to_file(initialization_url, ctx['tmpfilename'] + '-Init')
+            fragments.append({
+                'url': combine_url(base_url, initialization_url),
+                'filename': ctx['tmpfilename'] + '-Init',
+            })
         for i, segment_url in enumerate(segment_urls):
-            segment_filename = '%s-Seg%d' % (ctx['tmpfilename'], i)
-            append_url_to_file(segment_url, segment_filename)
+            fragments.append({
+                'url': combine_url(base_url, segment_url),
+                'filename': '%s-Seg%d' % (ctx['tmpfilename'], i),
+            })
 
-        self._finish_frag_download(ctx)
+        def append_fragment(frag, frag_content):
+            ctx['dest_stream'].write(frag_content)
 
-        for segment_file in segments_filenames:
-            os.remove(encodeFilename(segment_file))
+        if not self._download_fragments(ctx, fragments, append_fragment):
+            return False
+
+        self._finish_frag_download(ctx)
 
         return True
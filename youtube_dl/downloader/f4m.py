@@ -3,7 +3,6 @@ from __future__ import division, unicode_literals
 import base64
 import io
 import itertools
-import os
 import time
 
 from .fragment import FragmentFD
@@ -14,9 +13,7 @@ from ..compat import (
     compat_urllib_parse_urlparse,
 )
 from ..utils import (
-    encodeFilename,
     fix_xml_ampersands,
-    sanitize_open,
     struct_pack,
     struct_unpack,
     xpath_text,
@@ -340,55 +337,62 @@ class F4mFD(FragmentFD):
 
         dest_stream = ctx['dest_stream']
 
-        write_flv_header(dest_stream)
-        if not live:
-            write_metadata_tag(dest_stream, metadata)
+        if not ctx['fragment_index']:
+            write_flv_header(dest_stream)
+            if not live:
+                write_metadata_tag(dest_stream, metadata)
 
         base_url_parsed = compat_urllib_parse_urlparse(base_url)
 
         self._start_frag_download(ctx)
 
-        frags_filenames = []
+        # The last fragment that has been written to the destination
+        last_frag = {'frag_i': None}
+
+        def append_fragment(frag, frag_content):
+            reader = FlvReader(frag_content)
+            while True:
+                _, box_type, box_data = reader.read_box_info()
+                if box_type == b'mdat':
+                    dest_stream.write(box_data)
+                    break
+            last_frag['frag_i'] = frag['frag_i']
+
         while fragments_list:
-            seg_i, frag_i = fragments_list.pop(0)
-            name = 'Seg%d-Frag%d' % (seg_i, frag_i)
-            query = []
-            if base_url_parsed.query:
-                query.append(base_url_parsed.query)
-            if akamai_pv:
-                query.append(akamai_pv.strip(';'))
-            if info_dict.get('extra_param_to_segment_url'):
-                query.append(info_dict['extra_param_to_segment_url'])
-            url_parsed = base_url_parsed._replace(path=base_url_parsed.path + name, query='&'.join(query))
-            frag_filename = '%s-%s' % (ctx['tmpfilename'], name)
+            fragments = []
+            for seg_i, frag_i in fragments_list:
+                name = 'Seg%d-Frag%d' % (seg_i, frag_i)
+                query = []
+                if base_url_parsed.query:
+                    query.append(base_url_parsed.query)
+                if akamai_pv:
+                    query.append(akamai_pv.strip(';'))
+                if info_dict.get('extra_param_to_segment_url'):
+                    query.append(info_dict['extra_param_to_segment_url'])
+                url_parsed = base_url_parsed._replace(path=base_url_parsed.path + name, query='&'.join(query))
+                fragments.append({
+                    'url': url_parsed.geturl(),
+                    'filename': '%s-%s' % (ctx['tmpfilename'], name),
+                    'frag_i': frag_i,
+                })
+            fragments_list = []
+            frag_i = fragments[-1]['frag_i']
             try:
-                success = ctx['dl'].download(frag_filename, {'url': url_parsed.geturl()})
-                if not success:
+                if not self._download_fragments(ctx, fragments, append_fragment):
                     return False
-                (down, frag_sanitized) = sanitize_open(frag_filename, 'rb')
-                down_data = down.read()
-                down.close()
-                reader = FlvReader(down_data)
-                while True:
-                    _, box_type, box_data = reader.read_box_info()
-                    if box_type == b'mdat':
-                        dest_stream.write(box_data)
-                        break
-                if live:
-                    os.remove(encodeFilename(frag_sanitized))
-                else:
-                    frags_filenames.append(frag_sanitized)
             except (compat_urllib_error.HTTPError, ) as err:
                 if live and (err.code == 404 or err.code == 410):
                     # We didn't keep up with the live window. Continue
                     # with the next available fragment.
+                    frag_i = next(
+                        f['frag_i'] for f in fragments
+                        if last_frag['frag_i'] is None or f['frag_i'] > last_frag['frag_i'])
                     msg = 'Fragment %d unavailable' % frag_i
                     self.report_warning(msg)
-                    fragments_list = []
                 else:
                     raise
 
-            if not fragments_list and not test and live and bootstrap_url:
+            if not test and live and bootstrap_url:
                 fragments_list = self._update_live_fragments(bootstrap_url, frag_i)
                 total_frags += len(fragments_list)
                 if fragments_list and (fragments_list[0][1] > frag_i + 1):
@@ -397,7 +401,4 @@ class F4mFD(FragmentFD):
 
         self._finish_frag_download(ctx)
 
-        for frag_file in frags_filenames:
-            os.remove(encodeFilename(frag_file))
-
         return True
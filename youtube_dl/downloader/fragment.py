@@ -1,13 +1,18 @@
 from __future__ import division, unicode_literals
 
+import io
+import json
 import os
+import threading
 import time
 
 from .common import FileDownloader
 from .http import HttpFD
+from .. import asyncnet
 from ..utils import (
     encodeFilename,
     sanitize_open,
+    write_json_file,
 )
 
 
@@ -16,9 +21,45 @@ class HttpQuietDownloader(HttpFD):
         pass
 
 
+class FragmentSink(io.BytesIO):
+    """In-memory destination of a single fragment download"""
+
+    def close(self):
+        # HttpFD closes its stream once the download is finished, the data
+        # must be kept until the fragment is appended to the destination file
+        pass
+
+
+class HttpFragmentDownloader(HttpQuietDownloader):
+    """Download a fragment into a FragmentSink instead of a file"""
+
+    def __init__(self, ydl, params):
+        super(HttpFragmentDownloader, self).__init__(ydl, params)
+        self.sink = FragmentSink()
+
+    def _open_stream(self, tmpfilename, open_mode):
+        return self.sink, tmpfilename
+
+
 class FragmentFD(FileDownloader):
     """
     A base file downloader class for fragmented media (e.g. f4m/m3u8 manifests).
+
+    Available options:
+
+    concurrent_fragment_downloads:  Number of fragments to download in
+                        parallel (default is 1). Fragments are still written
+                        to the destination file in their original order.
+    async_network:      Download the fragments of concurrent downloads with
+                        the asyncio HTTP client on a single thread shared by
+                        all the downloads, instead of a thread per fragment.
+                        Ignored when a proxy is used, asyncio is missing, or
+                        with ratelimit or test, only applied by the threads.
+
+    Unless continuedl is False, the progress of non-live downloads is recorded
+    in a journal (the .ytdl file next to the destination file), so that an
+    interrupted download continues after the last fragment that was fully
+    written.
     """
 
     def _prepare_and_start_frag_download(self, ctx):
@@ -32,33 +73,93 @@ class FragmentFD(FileDownloader):
             '[%s] Total fragments: %s'
             % (self.FD_NAME, ctx['total_frags'] if not ctx['live'] else 'unknown (live)'))
         self.report_destination(ctx['filename'])
-        dl = HttpQuietDownloader(
-            self.ydl,
-            {
-                'continuedl': True,
+        tmpfilename = self.temp_name(ctx['filename'])
+        ctx.update({
+            'ytdl_filename': '%s.ytdl' % ctx['filename'],
+            # Number of fragments and bytes already written to the
+            # destination file
+            'fragment_index': 0,
+            'resume_len': 0,
+        })
+        resume = self._read_ytdl_file(ctx, tmpfilename)
+        if resume:
+            dest_stream, tmpfilename = sanitize_open(tmpfilename, 'r+b')
+            # Drop any data written after the last recorded fragment
+            dest_stream.seek(ctx['resume_len'])
+            dest_stream.truncate()
+            self.to_screen(
+                '[%s] Resuming download at fragment %d (byte %d)'
+                % (self.FD_NAME, ctx['fragment_index'] + 1, ctx['resume_len']))
+        else:
+            dest_stream, tmpfilename = sanitize_open(tmpfilename, 'wb')
+        ctx.update({
+            # Every fragment is fetched into memory by its own downloader
+            # created with these params, so that fragments can be downloaded
+            # concurrently. Nothing is read from or written to the disk by
+            # these downloaders.
+            'dl_params': {
+                'continuedl': False,
+                'nopart': True,
+                'updatetime': False,
                 'quiet': True,
                 'noprogress': True,
                 'ratelimit': self.params.get('ratelimit'),
                 'retries': self.params.get('retries', 0),
                 'test': self.params.get('test', False),
-            }
-        )
-        tmpfilename = self.temp_name(ctx['filename'])
-        dest_stream, tmpfilename = sanitize_open(tmpfilename, 'wb')
-        ctx.update({
-            'dl': dl,
+            },
             'dest_stream': dest_stream,
             'tmpfilename': tmpfilename,
         })
 
+    def _read_ytdl_file(self, ctx, tmpfilename):
+        """
+        Load the journal of a previous attempt into ctx.
+        Return True if the download can be resumed.
+        """
+        if (ctx['live'] or not self.params.get('continuedl', True) or
+                not os.path.isfile(encodeFilename(ctx['ytdl_filename'])) or
+                not os.path.isfile(encodeFilename(tmpfilename))):
+            return False
+        try:
+            with open(encodeFilename(ctx['ytdl_filename']), 'r') as ytdl_file:
+                journal = json.load(ytdl_file)
+            if 'http_segments' in journal:
+                # Marker of an interrupted HttpFD download, the partial
+                # file isn't made of fragments
+                return False
+            journal = journal['fragment_download']
+            fragment_index = int(journal['fragment_index'])
+            resume_len = int(journal['byte_offset'])
+        except (IOError, OSError, KeyError, TypeError, ValueError):
+            self.report_warning('Unable to read %s, restarting the download' % ctx['ytdl_filename'])
+            return False
+        if (fragment_index <= 0 or fragment_index > ctx['total_frags'] or
+                os.path.getsize(encodeFilename(tmpfilename)) < resume_len):
+            self.report_unable_to_resume()
+            return False
+        ctx.update({
+            'fragment_index': fragment_index,
+            'resume_len': resume_len,
+        })
+        return True
+
+    def _write_ytdl_file(self, ctx):
+        ctx['dest_stream'].flush()
+        write_json_file({
+            'fragment_download': {
+                'fragment_index': ctx['fragment_index'],
+                'byte_offset': ctx['dest_stream'].tell(),
+            },
+        }, ctx['ytdl_filename'])
+
     def _start_frag_download(self, ctx):
         total_frags = ctx['total_frags']
         # This dict stores the download progress, it's updated by the progress
         # hook
         state = {
             'status': 'downloading',
-            'downloaded_bytes': 0,
-            'frag_index': 0,
+            'downloaded_bytes': ctx['resume_len'],
+            'frag_index': ctx['fragment_index'],
             'frag_count': total_frags,
             'filename': ctx['filename'],
             'tmpfilename': ctx['tmpfilename'],
@@ -68,45 +169,253 @@ class FragmentFD(FileDownloader):
         ctx.update({
             'started': start,
             # Total complete fragments downloaded so far in bytes
-            'complete_frags_downloaded_bytes': 0,
-            # Amount of fragment's bytes downloaded by the time of the previous
-            # frag progress hook invocation
-            'prev_frag_downloaded_bytes': 0,
+            'complete_frags_downloaded_bytes': ctx['resume_len'],
+            # Amount of bytes downloaded by the time of the previous frag
+            # progress hook invocation for every fragment being downloaded
+            'prev_frags_downloaded_bytes': {},
         })
+        # Progress hooks are called from every fragment download thread
+        lock = threading.Lock()
 
-        def frag_progress_hook(s):
+        def frag_progress_hook(frag_key, s):
             if s['status'] not in ('downloading', 'finished'):
                 return
 
-            time_now = time.time()
-            state['elapsed'] = time_now - start
-            frag_total_bytes = s.get('total_bytes') or 0
-            if not ctx['live']:
-                estimated_size = (
-                    (ctx['complete_frags_downloaded_bytes'] + frag_total_bytes) /
-                    (state['frag_index'] + 1) * total_frags)
-                state['total_bytes_estimate'] = estimated_size
-
-            if s['status'] == 'finished':
-                state['frag_index'] += 1
-                state['downloaded_bytes'] += frag_total_bytes - ctx['prev_frag_downloaded_bytes']
-                ctx['complete_frags_downloaded_bytes'] = state['downloaded_bytes']
-                ctx['prev_frag_downloaded_bytes'] = 0
-            else:
-                frag_downloaded_bytes = s['downloaded_bytes']
-                state['downloaded_bytes'] += frag_downloaded_bytes - ctx['prev_frag_downloaded_bytes']
+            with lock:
+                time_now = time.time()
+                state['elapsed'] = time_now - start
+                frag_total_bytes = s.get('total_bytes') or 0
+                prev_frag_downloaded_bytes = ctx['prev_frags_downloaded_bytes'].get(frag_key, 0)
                 if not ctx['live']:
-                    state['eta'] = self.calc_eta(
-                        start, time_now, estimated_size,
-                        state['downloaded_bytes'])
-                state['speed'] = s.get('speed')
-                ctx['prev_frag_downloaded_bytes'] = frag_downloaded_bytes
-            self._hook_progress(state)
+                    estimated_size = (
+                        (ctx['complete_frags_downloaded_bytes'] + frag_total_bytes) /
+                        (state['frag_index'] + 1) * total_frags)
+                    state['total_bytes_estimate'] = estimated_size
 
-        ctx['dl'].add_progress_hook(frag_progress_hook)
+                if s['status'] == 'finished':
+                    state['frag_index'] += 1
+                    state['downloaded_bytes'] += frag_total_bytes - prev_frag_downloaded_bytes
+                    ctx['complete_frags_downloaded_bytes'] += frag_total_bytes
+                    ctx['prev_frags_downloaded_bytes'].pop(frag_key, None)
+                else:
+                    frag_downloaded_bytes = s['downloaded_bytes']
+                    state['downloaded_bytes'] += frag_downloaded_bytes - prev_frag_downloaded_bytes
+                    if not ctx['live']:
+                        state['eta'] = self.calc_eta(
+                            start, time_now, estimated_size - ctx['resume_len'],
+                            state['downloaded_bytes'] - ctx['resume_len'])
+                    # The speed reported by a single fragment download does not
+                    # account for the fragments downloaded in parallel
+                    state['speed'] = self.calc_speed(
+                        start, time_now, state['downloaded_bytes'] - ctx['resume_len'])
+                    ctx['prev_frags_downloaded_bytes'][frag_key] = frag_downloaded_bytes
+                self._hook_progress(state)
+
+        ctx['frag_progress_hook'] = frag_progress_hook
 
         return start
 
+    def _download_fragment(self, ctx, frag):
+        """
+        Download a single fragment, described by a dict with its 'url' and a
+        unique 'filename', and return its content (None on failure)
+        """
+        dl = HttpFragmentDownloader(self.ydl, ctx['dl_params'])
+        dl.add_progress_hook(
+            lambda s: ctx['frag_progress_hook'](frag['filename'], s))
+        success = dl.download(frag['filename'], {'url': frag['url']})
+        if not success:
+            return None
+        return dl.sink.getvalue()
+
+    def _download_fragments(self, ctx, fragments, append_fragment):
+        """
+        Download the given fragments and call append_fragment(frag, content)
+        for each of them in order, it may return False to stop the download.
+        Up to concurrent_fragment_downloads fragments are downloaded at the
+        same time.
+        Fragments already written by an interrupted download are skipped.
+        Return True on success and False otherwise.
+        """
+        if not ctx['live']:
+            fragments = fragments[ctx['fragment_index']:]
+
+        def append_and_record_fragment(frag, frag_content):
+            if append_fragment(frag, frag_content) is False:
+                return False
+            ctx['fragment_index'] += 1
+            if not ctx['live'] and self.params.get('continuedl', True):
+                self._write_ytdl_file(ctx)
+            return True
+
+        concurrency = min(
+            int(self.params.get('concurrent_fragment_downloads') or 1),
+            len(fragments))
+
+        if concurrency <= 1:
+            for frag in fragments:
+                frag_content = self._download_fragment(ctx, frag)
+                if frag_content is None:
+                    return False
+                if not append_and_record_fragment(frag, frag_content):
+                    return False
+            return True
+
+        if (self.params.get('async_network') and
+                not self.params.get('ratelimit') and
+                not self.params.get('test', False) and
+                asyncnet.is_available(self.ydl.params)):
+            return self._download_fragments_async(
+                ctx, fragments, append_and_record_fragment, concurrency)
+
+        cond = threading.Condition()
+        # Do not let the workers get too far ahead of the fragment being
+        # appended, downloaded fragments are kept until it's their turn
+        window = concurrency * 2
+        pool = {
+            'next_download': 0,
+            'next_append': 0,
+            'abort': False,
+            'results': {},
+        }
+
+        def worker():
+            while True:
+                with cond:
+                    while (not pool['abort'] and
+                            pool['next_download'] < len(fragments) and
+                            pool['next_download'] >= pool['next_append'] + window):
+                        cond.wait()
+                    if pool['abort'] or pool['next_download'] >= len(fragments):
+                        return
+                    i = pool['next_download']
+                    pool['next_download'] += 1
+                try:
+                    result = (self._download_fragment(ctx, fragments[i]), None)
+                except Exception as err:
+                    result = (None, err)
+                with cond:
+                    pool['results'][i] = result
+                    cond.notify_all()
+
+        workers = []
+        for _ in range(concurrency):
+            t = threading.Thread(target=worker)
+            t.daemon = True
+            t.start()
+            workers.append(t)
+
+        interrupted = False
+        try:
+            for i, frag in enumerate(fragments):
+                with cond:
+                    while i not in pool['results']:
+                        # Wait with a timeout so that KeyboardInterrupt
+                        # is not blocked on python 2
+                        cond.wait(1)
+                    frag_content, err = pool['results'].pop(i)
+                    pool['next_append'] = i + 1
+                    cond.notify_all()
+                if err is not None:
+                    raise err
+                if frag_content is None:
+                    return False
+                if not append_and_record_fragment(frag, frag_content):
+                    return False
+        except KeyboardInterrupt:
+            interrupted = True
+            raise
+        finally:
+            with cond:
+                pool['abort'] = True
+                cond.notify_all()
+            if not interrupted:
+                # Let the fragments being downloaded finish, nothing must be
+                # requested on behalf of this download once it has returned
+                for t in workers:
+                    t.join()
+        return True
+
+    def _download_fragments_async(self, ctx, fragments, append_fragment, concurrency):
+        client = asyncnet.get_client(self.ydl)
+        retries = ctx['dl_params']['retries']
+        cond = threading.Condition()
+        window = concurrency * 2
+        pool = {
+            'next_download': 0,
+            'finished': 0,
+            'results': {},
+            # Downloads in progress, only used in the thread of the loop
+            'exchanges': {},
+        }
+
+        def on_response(i, response, exc):
+            with cond:
+                pool['exchanges'].pop(i, None)
+                pool['finished'] += 1
+                pool['results'][i] = (response, exc)
+                cond.notify_all()
+
+        def on_progress(i, downloaded_bytes, total_bytes):
+            ctx['frag_progress_hook'](fragments[i]['filename'], {
+                'status': 'downloading',
+                'downloaded_bytes': downloaded_bytes,
+                'total_bytes': total_bytes,
+            })
+
+        def start(i):
+            pool['exchanges'][i] = client.start_fetch(
+                fragments[i]['url'], lambda response, exc: on_response(i, response, exc),
+                retries=retries,
+                progress=lambda downloaded_bytes, total_bytes: on_progress(
+                    i, downloaded_bytes, total_bytes))
+
+        def cancel():
+            for exchange in list(pool['exchanges'].values()):
+                exchange.cancel()
+            pool['exchanges'].clear()
+
+        interrupted = False
+        try:
+            for i, frag in enumerate(fragments):
+                with cond:
+                    while True:
+                        while (pool['next_download'] < len(fragments) and
+                                pool['next_download'] - pool['finished'] < concurrency and
+                                pool['next_download'] < i + window):
+                            client.loop_thread.call_soon(start, pool['next_download'])
+                            pool['next_download'] += 1
+                        if i in pool['results']:
+                            break
+                        # Wait with a timeout so that KeyboardInterrupt
+                        # is not blocked on python 2
+                        cond.wait(1)
+                    response, exc = pool['results'].pop(i)
+                if exc is not None:
+                    self.report_error(
+                        'giving up on fragment %d: %s' % (ctx['fragment_index'] + 1, exc))
+                    return False
+                asyncnet.check_response(response)
+                ctx['frag_progress_hook'](frag['filename'], {
+                    'status': 'finished',
+                    'total_bytes': len(response.body),
+                })
+                if not append_fragment(frag, response.body):
+                    return False
+        except KeyboardInterrupt:
+            interrupted = True
+            raise
+        finally:
+            if interrupted:
+                client.loop_thread.call_soon(cancel)
+            else:
+                # Let the fragments being downloaded finish, nothing must be
+                # requested on behalf of this download once it has returned
+                with cond:
+                    while pool['finished'] < pool['next_download']:
+                        cond.wait(1)
+        return True
+
     def _finish_frag_download(self, ctx):
         ctx['dest_stream'].close()
         elapsed = time.time() - ctx['started']
@@ -120,3 +429,6 @@ class FragmentFD(FileDownloader):
             'status': 'finished',
             'elapsed': elapsed,
         })
+
+        if os.path.isfile(encodeFilename(ctx['ytdl_filename'])):
+            os.remove(encodeFilename(ctx['ytdl_filename']))
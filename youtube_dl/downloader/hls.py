@@ -1,20 +1,30 @@
 from __future__ import unicode_literals
 
+import binascii
 import os
 import re
+import socket
 import subprocess
 import sys
 
 from .common import FileDownloader
 from .fragment import FragmentFD
 
-from ..compat import compat_urlparse
+from ..aes import aes_cbc_decrypt_bytes
+from ..compat import (
+    compat_http_client,
+    compat_ord,
+    compat_urllib_error,
+    compat_urlparse,
+)
 from ..postprocessor.ffmpeg import FFmpegPostProcessor
 from ..utils import (
     encodeArgument,
     encodeFilename,
-    sanitize_open,
+    error_to_compat_str,
     handle_youtubedl_headers,
+    parse_m3u8_attributes,
+    struct_pack,
 )
 
 
@@ -81,50 +91,126 @@ class HlsFD(FileDownloader):
 
 
 class NativeHlsFD(FragmentFD):
-    """ A more limited implementation that does not require ffmpeg """
+    """
+    A more limited implementation that does not require ffmpeg
+
+    Segments encrypted with AES-128 (#EXT-X-KEY) are decrypted natively,
+    manifests using other features are downloaded with ffmpeg (HlsFD).
+    """
 
     FD_NAME = 'hlsnative'
 
+    @staticmethod
+    def can_download(manifest):
+        UNSUPPORTED_FEATURES = (
+            # Only AES-128 encryption is supported
+            r'#EXT-X-KEY:METHOD=(?!NONE|AES-128)',
+            # Byte ranges of a single resource
+            r'#EXT-X-BYTERANGE',
+        )
+        return all(not re.search(feature, manifest) for feature in UNSUPPORTED_FEATURES)
+
+    def _get_key(self, key_url, key_cache):
+        """
+        Return the key at key_url, it's only downloaded once.
+        Return None if it can't be downloaded.
+        """
+        if key_url not in key_cache:
+            try:
+                key_cache[key_url] = self.ydl.urlopen(key_url).read()
+            except (compat_urllib_error.URLError, compat_http_client.HTTPException, socket.error) as err:
+                self.report_error('unable to download key %s: %s' % (key_url, error_to_compat_str(err)))
+                return None
+        return key_cache[key_url]
+
     def real_download(self, filename, info_dict):
         man_url = info_dict['url']
         self.to_screen('[%s] Downloading m3u8 manifest' % self.FD_NAME)
         manifest = self.ydl.urlopen(man_url).read()
 
         s = manifest.decode('utf-8', 'ignore')
-        fragment_urls = []
+
+        if not self.can_download(s):
+            self.report_warning(
+                'hlsnative has detected features it does not support, '
+                'the download will be delegated to ffmpeg')
+            return HlsFD(self.ydl, self.params).real_download(filename, info_dict)
+
+        fragments = []
+        media_sequence = 0
+        decrypt_info = {'METHOD': 'NONE'}
         for line in s.splitlines():
             line = line.strip()
-            if line and not line.startswith('#'):
+            if not line:
+                continue
+            if not line.startswith('#'):
                 segment_url = (
                     line
                     if re.match(r'^https?://', line)
                     else compat_urlparse.urljoin(man_url, line))
-                fragment_urls.append(segment_url)
+                frag = {
+                    'url': segment_url,
+                    'filename': '%s-Frag%d' % (filename, len(fragments)),
+                }
+                if decrypt_info['METHOD'] == 'AES-128':
+                    # The key is downloaded when the fragment is appended,
+                    # the keys of skipped fragments are never requested
+                    frag['decrypt_info'] = {
+                        'URI': decrypt_info['URI'],
+                        # Without an explicit IV, the media sequence number
+                        # of the segment is used as IV
+                        'IV': decrypt_info.get('IV') or struct_pack(
+                            '>8xq', media_sequence),
+                    }
+                fragments.append(frag)
+                media_sequence += 1
                 # We only download the first fragment during the test
                 if self.params.get('test', False):
                     break
+            elif line.startswith('#EXT-X-KEY'):
+                decrypt_info = parse_m3u8_attributes(line[len('#EXT-X-KEY:'):])
+                if decrypt_info['METHOD'] == 'AES-128':
+                    if 'IV' in decrypt_info:
+                        decrypt_info['IV'] = binascii.unhexlify(
+                            decrypt_info['IV'][2:].zfill(32))
+                    if not re.match(r'^https?://', decrypt_info['URI']):
+                        decrypt_info['URI'] = compat_urlparse.urljoin(
+                            man_url, decrypt_info['URI'])
+            elif line.startswith('#EXT-X-MEDIA-SEQUENCE'):
+                media_sequence = int(line[len('#EXT-X-MEDIA-SEQUENCE:'):])
 
         ctx = {
             'filename': filename,
-            'total_frags': len(fragment_urls),
+            'total_frags': len(fragments),
         }
 
         self._prepare_and_start_frag_download(ctx)
 
-        frags_filenames = []
-        for i, frag_url in enumerate(fragment_urls):
-            frag_filename = '%s-Frag%d' % (ctx['tmpfilename'], i)
-            success = ctx['dl'].download(frag_filename, {'url': frag_url})
-            if not success:
-                return False
-            down, frag_sanitized = sanitize_open(frag_filename, 'rb')
-            ctx['dest_stream'].write(down.read())
-            down.close()
-            frags_filenames.append(frag_sanitized)
+        # Keys are only downloaded once, they are usually shared by many
+        # segments
+        key_cache = {}
 
-        self._finish_frag_download(ctx)
+        def append_fragment(frag, frag_content):
+            decrypt_info = frag.get('decrypt_info')
+            if decrypt_info:
+                key = self._get_key(decrypt_info['URI'], key_cache)
+                if key is None:
+                    return False
+                frag_content = self._decrypt_fragment(frag_content, key, decrypt_info['IV'])
+            ctx['dest_stream'].write(frag_content)
 
-        for frag_file in frags_filenames:
-            os.remove(encodeFilename(frag_file))
+        if not self._download_fragments(ctx, fragments, append_fragment):
+            return False
+
+        self._finish_frag_download(ctx)
 
         return True
+
+    def _decrypt_fragment(self, frag_content, key, iv):
+        decrypted = aes_cbc_decrypt_bytes(frag_content, key, iv)
+        # Only the beginning of the segment is downloaded during the test,
+        # it has no padding
+        if self.params.get('test', False) or not decrypted:
+            return decrypted
+        # Remove the PKCS#7 padding
+        return decrypted[:-compat_ord(decrypted[-1:])]
@@ -1,8 +1,10 @@
 from __future__ import unicode_literals
 
 import errno
+import json
 import os
 import socket
+import threading
 import time
 import re
 
@@ -13,10 +15,46 @@ from ..utils import (
     encodeFilename,
     sanitize_open,
     sanitized_Request,
+    write_json_file,
 )
 
 
 class HttpFD(FileDownloader):
+    """
+    Download a file over HTTP(S).
+
+    Available options (in addition to the FileDownloader ones):
+
+    http_connections:   Number of connections to download a file with
+                        (default is 1). Files whose size is known and that
+                        are served with byte range support are split in up
+                        to that many segments, downloaded in parallel.
+    http_chunk_size:    Size of a chunk for chunk-based HTTP downloading, in
+                        bytes. Each chunk is fetched with its own Range
+                        request, which bypasses the throttling some servers
+                        apply to long-lived responses. Servers that ignore
+                        the Range header are read with a single request.
+    """
+
+    # Do not split files in segments smaller than this
+    _MIN_SEGMENT_SIZE = 1048576
+
+    @staticmethod
+    def _is_segments_marker(ytdl_filename):
+        """
+        Whether ytdl_filename marks an interrupted download in segments. The
+        file may also be the journal of a fragmented download (FragmentFD).
+        """
+        try:
+            with open(encodeFilename(ytdl_filename), 'r') as ytdl_file:
+                return 'http_segments' in json.load(ytdl_file)
+        except (IOError, OSError, TypeError, ValueError):
+            return False
+
+    def _open_stream(self, tmpfilename, open_mode):
+        """Open the stream the downloaded data is written to"""
+        return sanitize_open(tmpfilename, open_mode)
+
     def real_download(self, filename, info_dict):
         url = info_dict['url']
         tmpfilename = self.temp_name(filename)
@@ -31,6 +69,7 @@ class HttpFD(FileDownloader):
         request = sanitized_Request(url, None, headers)
 
         is_test = self.params.get('test', False)
+        chunk_size = None if is_test else self.params.get('http_chunk_size')
 
         if is_test:
             request.add_header('Range', 'bytes=0-%s' % str(self._TEST_FILE_SIZE - 1))
@@ -41,6 +80,15 @@ class HttpFD(FileDownloader):
         else:
             resume_len = 0
 
+        # An interrupted multi-connection download may have left holes in
+        # the file, so its size can't be trusted
+        ytdl_filename = '%s.ytdl' % filename
+        if self._is_segments_marker(ytdl_filename):
+            if resume_len != 0:
+                self.report_unable_to_resume()
+                resume_len = 0
+            os.remove(encodeFilename(ytdl_filename))
+
         open_mode = 'wb'
         if resume_len != 0:
             if self.params.get('continuedl', True):
@@ -50,6 +98,10 @@ class HttpFD(FileDownloader):
             else:
                 resume_len = 0
 
+        if chunk_size:
+            request.add_header(
+                'Range', 'bytes=%d-%d' % (resume_len, resume_len + chunk_size - 1))
+
         count = 0
         retries = self.params.get('retries', 0)
         while count <= retries:
@@ -130,6 +182,18 @@ class HttpFD(FileDownloader):
 
         data_len = data.info().get('Content-length', None)
 
+        # End of the range requested for the current chunk (exclusive), None
+        # when the whole file is read from a single response
+        chunk_end = None
+        if chunk_size:
+            content_range_m = re.search(
+                r'bytes (\d+)-(\d+)/(\d+)', data.headers.get('Content-Range') or '')
+            # Otherwise the Range header was ignored and the response contains
+            # the whole file
+            if content_range_m and int(content_range_m.group(1)) == resume_len:
+                chunk_end = int(content_range_m.group(2)) + 1
+                data_len = int(content_range_m.group(3)) - resume_len
+
         # Range HTTP header may be ignored/unsupported by a webserver
         # (e.g. extractor/scivee.py, extractor/bambuser.py).
         # However, for a test we still would like to download just a piece of a file.
@@ -149,6 +213,26 @@ class HttpFD(FileDownloader):
                 self.to_screen('\r[download] File is larger than max-filesize (%s bytes > %s bytes). Aborting.' % (data_len, max_data_len))
                 return False
 
+        connections = self._segmented_download_connections(
+            data, resume_len, data_len)
+        if connections > 1 and not is_test and tmpfilename != '-':
+            try:
+                (stream, tmpfilename) = sanitize_open(tmpfilename, open_mode)
+                filename = self.undo_temp_name(tmpfilename)
+                self.report_destination(filename)
+            except (OSError, IOError) as err:
+                self.report_error('unable to open for writing: %s' % str(err))
+                return False
+            stream.close()
+            start = time.time()
+            byte_counter = self._download_segmented(
+                data, url, headers, filename, tmpfilename, ytdl_filename,
+                resume_len, data_len, connections, chunk_size, chunk_end)
+            if byte_counter is None:
+                return False
+            return self._finish_download(
+                data, filename, tmpfilename, info_dict, byte_counter, data_len, start)
+
         byte_counter = 0 + resume_len
         block_size = self.params.get('buffersize', 1024)
         start = time.time()
@@ -164,12 +248,21 @@ class HttpFD(FileDownloader):
 
             # exit loop when download is finished
             if len(data_block) == 0:
+                if chunk_end is not None and byte_counter == chunk_end < data_len:
+                    # Request the next chunk
+                    chunk_end = min(byte_counter + chunk_size, data_len)
+                    data = self._open_range(url, headers, byte_counter, chunk_end - 1)
+                    if data is None:
+                        self.to_stderr('\n')
+                        self.report_error('server stopped honouring the Range header at byte %d' % byte_counter)
+                        return False
+                    continue
                 break
 
             # Open destination file just in time
             if stream is None:
                 try:
-                    (stream, tmpfilename) = sanitize_open(tmpfilename, open_mode)
+                    (stream, tmpfilename) = self._open_stream(tmpfilename, open_mode)
                     assert stream is not None
                     filename = self.undo_temp_name(tmpfilename)
                     self.report_destination(filename)
@@ -232,6 +325,10 @@ class HttpFD(FileDownloader):
         if tmpfilename != '-':
             stream.close()
 
+        return self._finish_download(
+            data, filename, tmpfilename, info_dict, byte_counter, data_len, start)
+
+    def _finish_download(self, data, filename, tmpfilename, info_dict, byte_counter, data_len, start):
         if data_len is not None and byte_counter != data_len:
             raise ContentTooShortError(byte_counter, int(data_len))
         self.try_rename(tmpfilename, filename)
@@ -249,3 +346,220 @@ class HttpFD(FileDownloader):
         })
 
         return True
+
+    def _segmented_download_connections(self, data, resume_len, data_len):
+        """Return the number of connections to download the rest of the file with"""
+        connections = int(self.params.get('http_connections') or 1)
+        if connections <= 1 or data_len is None:
+            return 1
+        headers = data.info()
+        if (headers.get('Accept-Ranges', '').lower() != 'bytes' and
+                not headers.get('Content-Range')):
+            return 1
+        return max(min(connections, (data_len - resume_len) // self._MIN_SEGMENT_SIZE), 1)
+
+    def _open_range(self, url, headers, range_start, range_end):
+        """
+        Open a connection for the bytes range_start-range_end (inclusive),
+        retrying on server errors.
+        Return None if the server does not honour the Range header.
+        """
+        request = sanitized_Request(url, None, headers)
+        request.add_header('Range', 'bytes=%d-%d' % (range_start, range_end))
+        count = 0
+        retries = self.params.get('retries', 0)
+        while True:
+            try:
+                data = self.ydl.urlopen(request)
+                break
+            except (compat_urllib_error.HTTPError, ) as err:
+                if err.code < 500 or err.code >= 600 or count >= retries:
+                    raise
+            except socket.error as e:
+                if e.errno != errno.ECONNRESET or count >= retries:
+                    raise
+            count += 1
+            self.report_retry(count, retries)
+        content_range = data.headers.get('Content-Range')
+        content_range_m = content_range and re.search(r'bytes (\d+)-', content_range)
+        if not content_range_m or int(content_range_m.group(1)) != range_start:
+            data.close()
+            return None
+        return data
+
+    def _download_segmented(self, data, url, headers, filename, tmpfilename,
+                            ytdl_filename, resume_len, data_len, connections,
+                            chunk_size=None, chunk_end=None):
+        """
+        Download the bytes resume_len to data_len of the file in segments,
+        every one fetched by its own connection and written at its offset in
+        tmpfilename. data is the already opened response, it's used for the
+        first segment and covers the bytes up to chunk_end (or the whole file).
+        With chunk_size, segments are themselves fetched in chunks.
+        Return the size of the file, None on failure.
+        """
+        segment_len = -(-(data_len - resume_len) // connections)
+        segments = [{
+            'start': seg_start,
+            'end': min(seg_start + segment_len, data_len),
+            'downloaded': 0,
+        } for seg_start in range(resume_len, data_len, segment_len)]
+        retries = self.params.get('retries', 0)
+        lock = threading.Lock()
+        state = {
+            'byte_counter': resume_len,
+            'abort': False,
+            'errors': [],
+        }
+        start = time.time()
+
+        self.to_screen(
+            '[download] Downloading with %d connections' % len(segments))
+        # Mark the file as being downloaded in segments until all of them are
+        # finished or it's truncated to the part that is fully downloaded
+        write_json_file({'http_segments': len(segments)}, ytdl_filename)
+
+        def download_segment(seg, data, range_end):
+            count = 0
+            block_size = self.params.get('buffersize', 1024)
+            stream = open(encodeFilename(tmpfilename), 'r+b')
+            try:
+                while seg['start'] + seg['downloaded'] < seg['end'] and not state['abort']:
+                    try:
+                        if data is None:
+                            range_start = seg['start'] + seg['downloaded']
+                            range_end = seg['end']
+                            if chunk_size:
+                                range_end = min(range_end, range_start + chunk_size)
+                            data = self._open_range(url, headers, range_start, range_end - 1)
+                            if data is None:
+                                seg['error'] = 'server does not support byte ranges for this file'
+                                return
+                        stream.seek(seg['start'] + seg['downloaded'])
+                        before = time.time()
+                        while not state['abort']:
+                            remaining = range_end - seg['start'] - seg['downloaded']
+                            if remaining <= 0:
+                                break
+                            data_block = data.read(min(block_size, remaining))
+                            if not data_block:
+                                break
+                            stream.write(data_block)
+                            with lock:
+                                seg['downloaded'] += len(data_block)
+                                state['byte_counter'] += len(data_block)
+                                byte_counter = state['byte_counter']
+                                now = time.time()
+                                self._hook_progress({
+                                    'status': 'downloading',
+                                    'downloaded_bytes': byte_counter,
+                                    'total_bytes': data_len,
+                                    'tmpfilename': tmpfilename,
+                                    'filename': filename,
+                                    'eta': self.calc_eta(start, now, data_len - resume_len, byte_counter - resume_len),
+                                    'speed': self.calc_speed(start, now, byte_counter - resume_len),
+                                    'elapsed': now - start,
+                                })
+                            self.slow_down(start, now, byte_counter - resume_len)
+                            after = time.time()
+                            if not self.params.get('noresizebuffer', False):
+                                block_size = self.best_block_size(after - before, len(data_block))
+                            before = after
+                        data.close()
+                        data = None
+                        if state['abort'] or seg['start'] + seg['downloaded'] >= seg['end']:
+                            break
+                        if seg['start'] + seg['downloaded'] == range_end:
+                            # Go on with the next chunk
+                            continue
+                        # The connection was closed before the end of the range
+                    except (compat_urllib_error.HTTPError, ) as err:
+                        if err.code < 500 or err.code >= 600:
+                            raise
+                        data = None
+                    except socket.error as e:
+                        if e.errno != errno.ECONNRESET:
+                            raise
+                        data = None
+                    count += 1
+                    if count > retries:
+                        seg['error'] = 'giving up after %s retries' % retries
+                        return
+                    self.report_retry(count, retries)
+            finally:
+                stream.close()
+
+        def worker(seg, data, range_end):
+            try:
+                download_segment(seg, data, range_end)
+            except Exception as err:
+                state['errors'].append(err)
+            if state['errors'] or seg.get('error'):
+                state['abort'] = True
+
+        workers = []
+        try:
+            for i, seg in enumerate(segments):
+                if i == 0:
+                    args = (seg, data, min(seg['end'], chunk_end or data_len))
+                else:
+                    args = (seg, None, None)
+                t = threading.Thread(target=worker, args=args)
+                t.daemon = True
+                t.start()
+                workers.append(t)
+            for t in workers:
+                while t.is_alive():
+                    # Join with a timeout so that KeyboardInterrupt
+                    # is not blocked on python 2
+                    t.join(1)
+        finally:
+            state['abort'] = True
+            for t in workers:
+                t.join()
+            # Only keep the part of the file that has been downloaded
+            # without gaps, so that it can be resumed with a single
+            # connection
+            complete_len = resume_len
+            for seg in segments:
+                complete_len = seg['start'] + seg['downloaded']
+                if complete_len < seg['end']:
+                    break
+            if complete_len < data_len:
+                with open(encodeFilename(tmpfilename), 'r+b') as stream:
+                    stream.truncate(complete_len)
+            os.remove(encodeFilename(ytdl_filename))
+
+        if state['errors']:
+            raise state['errors'][0]
+        for seg in segments:
+            if seg.get('error'):
+                self.to_stderr('\n')
+                self.report_error(seg['error'])
+                return None
+        return state['byte_counter']
+
+
+class HttpPipeFD(HttpFD):
+    """
+    Download a file over HTTP(S) into an open binary file (e.g. a pipe)
+    instead of a file at the given filename, which is only used for the
+    reports. The data is written sequentially: the download can't be
+    resumed and is done with a single connection.
+    """
+
+    def __init__(self, ydl, params, pipe):
+        params = dict(params)
+        params.update({
+            'continuedl': False,
+            'nooverwrites': False,
+            'nopart': True,
+            'updatetime': False,
+            'http_connections': 1,
+            'xattr_set_filesize': False,
+        })
+        super(HttpPipeFD, self).__init__(ydl, params)
+        self.pipe = pipe
+
+    def _open_stream(self, tmpfilename, open_mode):
+        return self.pipe, tmpfilename
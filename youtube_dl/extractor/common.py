@@ -9,6 +9,7 @@ import os
 import re
 import socket
 import sys
+import threading
 import time
 import math
 
@@ -36,6 +37,7 @@ from ..utils import (
     float_or_none,
     int_or_none,
     parse_iso8601,
+    parse_m3u8_attributes,
     RegexNotFoundError,
     sanitize_filename,
     sanitized_Request,
@@ -277,6 +279,8 @@ class InfoExtractor(object):
     def __init__(self, downloader=None):
         """Constructor. Receives an optional downloader."""
         self._ready = False
+        # Playlist entries processed in parallel share the instance
+        self._ready_lock = threading.Lock()
         self.set_downloader(downloader)
 
     @classmethod
@@ -298,6 +302,17 @@ class InfoExtractor(object):
         assert m
         return m.group('id')
 
+    @classmethod
+    def get_temp_id(cls, url):
+        """
+        Return the video id found in the URL without downloading anything,
+        or None if it can't be known in advance.
+        """
+        try:
+            return cls._match_id(url)
+        except (AssertionError, IndexError, AttributeError):
+            return None
+
     @classmethod
     def working(cls):
         """Getter method for _WORKING."""
@@ -306,8 +321,10 @@ class InfoExtractor(object):
     def initialize(self):
         """Initializes an instance (authentication, etc)."""
         if not self._ready:
-            self._real_initialize()
-            self._ready = True
+            with self._ready_lock:
+                if not self._ready:
+                    self._real_initialize()
+                    self._ready = True
 
     def extract(self, url):
         """Extracts URL information and returns it in list of dicts."""
@@ -342,6 +359,14 @@ class InfoExtractor(object):
     def IE_NAME(self):
         return compat_str(type(self).__name__[:-2])
 
+    def _http_cache_ttl(self):
+        """ Return the lifetime of the cached webpages set by the user, if any """
+        ttls = self._downloader.params.get('http_cache_ttl') or {}
+        for name in (self.IE_NAME.lower(), self.ie_key().lower(), 'default'):
+            if name in ttls:
+                return ttls[name]
+        return None
+
     def _request_webpage(self, url_or_request, video_id, note=None, errnote=None, fatal=True):
         """ Returns the response handle """
         if note is None:
@@ -352,7 +377,7 @@ class InfoExtractor(object):
             else:
                 self.to_screen('%s: %s' % (video_id, note))
         try:
-            return self._downloader.urlopen(url_or_request)
+            return self._downloader.http_cache.urlopen(url_or_request, self._http_cache_ttl())
         except (compat_urllib_error.URLError, compat_http_client.HTTPException, socket.error) as err:
             if errnote is False:
                 return False
@@ -1037,23 +1062,11 @@ class InfoExtractor(object):
             }]
         last_info = None
         last_media = None
-        kv_rex = re.compile(
-            r'(?P<key>[a-zA-Z_-]+)=(?P<val>"[^"]+"|[^",]+)(?:,|$)')
         for line in m3u8_doc.splitlines():
             if line.startswith('#EXT-X-STREAM-INF:'):
-                last_info = {}
-                for m in kv_rex.finditer(line):
-                    v = m.group('val')
-                    if v.startswith('"'):
-                        v = v[1:-1]
-                    last_info[m.group('key')] = v
+                last_info = parse_m3u8_attributes(line)
             elif line.startswith('#EXT-X-MEDIA:'):
-                last_media = {}
-                for m in kv_rex.finditer(line):
-                    v = m.group('val')
-                    if v.startswith('"'):
-                        v = v[1:-1]
-                    last_media[m.group('key')] = v
+                last_media = parse_m3u8_attributes(line)
             elif line.startswith('#') or not line.strip():
                 continue
             else:
@@ -0,0 +1,357 @@
+from __future__ import unicode_literals
+
+import re
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+from .common import InfoExtractor
+from ..compat import compat_chr
+
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+# Sets of strings larger than this are not expanded
+_MAX_STRINGS = 64
+# Words found in most URLs, they are only used when there's nothing better
+_COMMON_WORDS = frozenset((
+    'http', 'https', 'www', 'm', 'com', 'net', 'org', 'tv', 'co', 'uk', 'de',
+    'fr', 'ru', 'html', 'php', 'embed', 'video', 'videos', 'watch', 'v',
+))
+
+_OP = lambda name: getattr(sre_parse, name, None)
+LITERAL = _OP('LITERAL')
+IN = _OP('IN')
+AT = _OP('AT')
+BRANCH = _OP('BRANCH')
+SUBPATTERN = _OP('SUBPATTERN')
+ATOMIC_GROUP = _OP('ATOMIC_GROUP')
+ASSERT = _OP('ASSERT')
+ASSERT_NOT = _OP('ASSERT_NOT')
+REPEATS = (_OP('MAX_REPEAT'), _OP('MIN_REPEAT'), _OP('POSSESSIVE_REPEAT'))
+MAXREPEAT = _OP('MAXREPEAT')
+
+
+def _is_sep(c):
+    return not ('a' <= c <= 'z' or '0' <= c <= '9')
+
+
+class _Shape(object):
+    """
+    What a regular expression node can match: the set of strings if it's a
+    small finite set, whether it can match the empty string and whether its
+    non empty matches always start and end with a separator (any character
+    that can't be part of a word).
+    """
+
+    def __init__(self, strings=None, nullable=True, first_sep=False, last_sep=False):
+        if strings is not None:
+            non_empty = [s for s in strings if s]
+            nullable = len(non_empty) < len(strings)
+            first_sep = all(_is_sep(s[0]) for s in non_empty)
+            last_sep = all(_is_sep(s[-1]) for s in non_empty)
+        self.strings = strings
+        self.nullable = nullable
+        self.first_sep = first_sep
+        self.last_sep = last_sep
+
+
+_UNKNOWN = _Shape()
+_NON_EMPTY_UNKNOWN = _Shape(nullable=False)
+
+
+def _product(strings_list):
+    res = ['']
+    for strings in strings_list:
+        if len(res) * len(strings) > _MAX_STRINGS:
+            return None
+        res = [a + b for a in res for b in strings]
+    return sorted(set(res))
+
+
+def _char(code):
+    # Non ASCII characters may match ASCII ones when ignoring case
+    return compat_chr(code).lower() if code < 128 else None
+
+
+_LITERAL_SHAPES = {}
+
+
+def _literal_shape(code):
+    if code not in _LITERAL_SHAPES:
+        c = _char(code)
+        _LITERAL_SHAPES[code] = _Shape([c]) if c is not None else _NON_EMPTY_UNKNOWN
+    return _LITERAL_SHAPES[code]
+
+
+def _edge_sep(shapes, attr, default=True):
+    # Whether the first (or last) character matched by the sequence is
+    # always a separator, default is used if it can be empty
+    for s in shapes:
+        if not getattr(s, attr):
+            return False
+        if not s.nullable:
+            return True
+    return default
+
+
+def _best(candidates):
+    """ Return the set of words whose worst word is the most selective """
+    def score(words):
+        return min((w not in _COMMON_WORDS, len(w)) for w in words), -len(words)
+    candidates = [c for c in candidates if c]
+    return max(candidates, key=score) if candidates else None
+
+
+def _string_words(s, left_closed, right_closed):
+    # The words that are complete in any URL containing s
+    words = []
+    for m in _WORD_RE.finditer(s):
+        if ((m.start() > 0 or left_closed) and
+                (m.end() < len(s) or right_closed)):
+            words.append(m.group(0))
+    return words
+
+
+def _run_keys(strings, left_closed, right_closed):
+    keys = set()
+    for s in strings:
+        words = _string_words(s, left_closed, right_closed)
+        if not words:
+            return None
+        keys.add(max(words, key=lambda w: (w not in _COMMON_WORDS, len(w))))
+    return frozenset(keys)
+
+
+class _KeyFinder(object):
+    """ Find the keys of a parsed regular expression """
+
+    def __init__(self):
+        # Shapes and items of the nodes by id, the parsed expression is kept alive
+        # while the keys are searched
+        self._shapes = {}
+        self._items = {}
+
+    def shape(self, node):
+        key = id(node)
+        if key not in self._shapes:
+            self._shapes[key] = self._shape(node)
+        return self._shapes[key]
+
+    def _shape(self, node):
+        op, av = node
+        if op == LITERAL:
+            return _literal_shape(av)
+        if op == IN:
+            chars = set()
+            for item_op, item_av in av:
+                c = _char(item_av) if item_op == LITERAL else None
+                if c is None:
+                    return _NON_EMPTY_UNKNOWN
+                chars.add(c)
+            return _Shape(sorted(chars))
+        if op in (AT, ASSERT, ASSERT_NOT):
+            # Zero width
+            return _Shape([''])
+        if op in (SUBPATTERN, ATOMIC_GROUP):
+            return self.seq_shape(av if op == ATOMIC_GROUP else av[-1])
+        if op == BRANCH:
+            shapes = [self.seq_shape(branch) for branch in av[1]]
+            if all(s.strings is not None for s in shapes):
+                strings = set()
+                for s in shapes:
+                    strings.update(s.strings)
+                if len(strings) <= _MAX_STRINGS:
+                    return _Shape(sorted(strings))
+            return _Shape(
+                nullable=any(s.nullable for s in shapes),
+                first_sep=all(s.first_sep for s in shapes),
+                last_sep=all(s.last_sep for s in shapes))
+        if op in REPEATS:
+            min_count, max_count, item = av
+            body = self.seq_shape(item)
+            if body.strings is not None and max_count != MAXREPEAT and max_count <= 4:
+                strings = set()
+                for count in range(min_count, max_count + 1):
+                    expanded = _product([body.strings] * count)
+                    if expanded is None:
+                        break
+                    strings.update(expanded)
+                else:
+                    if len(strings) <= _MAX_STRINGS:
+                        return _Shape(sorted(strings))
+            return _Shape(
+                nullable=min_count == 0 or body.nullable,
+                first_sep=body.first_sep, last_sep=body.last_sep)
+        return _UNKNOWN
+
+    def seq_shape(self, seq):
+        key = id(seq)
+        if key not in self._shapes:
+            self._shapes[key] = self._seq_shape(seq)
+        return self._shapes[key]
+
+    def items(self, seq):
+        """
+        Return the nodes of seq with their shapes, the literal characters
+        are joined into a single item
+        """
+        key = id(seq)
+        if key not in self._items:
+            items = []
+            literal = []
+            # Iterating on SubPattern objects is slow
+            for node in getattr(seq, 'data', seq):
+                if node[0] == LITERAL and node[1] < 128:
+                    literal.append(compat_chr(node[1]).lower())
+                    continue
+                if literal:
+                    items.append((None, _Shape([''.join(literal)])))
+                    literal = []
+                items.append((node, self.shape(node)))
+            if literal:
+                items.append((None, _Shape([''.join(literal)])))
+            self._items[key] = items
+        return self._items[key]
+
+    def _seq_shape(self, seq):
+        shapes = [shape for _, shape in self.items(seq)]
+        if all(s.strings is not None for s in shapes):
+            strings = _product([s.strings for s in shapes])
+            if strings is not None:
+                return _Shape(strings)
+        return _Shape(
+            nullable=all(s.nullable for s in shapes),
+            first_sep=_edge_sep(shapes, 'first_sep'),
+            last_sep=_edge_sep(reversed(shapes), 'last_sep'))
+
+    def seq_keys(self, seq, left_closed, right_closed):
+        items = self.items(seq)
+        nodes = [node for node, _ in items]
+        shapes = [shape for _, shape in items]
+        candidates = []
+
+        i = 0
+        while i < len(nodes):
+            left = _edge_sep(reversed(shapes[:i]), 'last_sep', left_closed)
+            if shapes[i].strings is None:
+                right = _edge_sep(shapes[i + 1:], 'first_sep', right_closed)
+                candidates.append(self.node_keys(nodes[i], left, right))
+                i += 1
+                continue
+            # Maximal run of nodes matching a small set of strings
+            j = i
+            strings = ['']
+            while j < len(nodes) and shapes[j].strings is not None:
+                expanded = _product([strings, shapes[j].strings])
+                if expanded is None:
+                    break
+                strings = expanded
+                j += 1
+            right = _edge_sep(shapes[j:], 'first_sep', right_closed)
+            candidates.append(_run_keys(strings, left, right))
+            i = j
+        return _best(candidates)
+
+    def node_keys(self, node, left_closed, right_closed):
+        op, av = node
+        if op in (SUBPATTERN, ATOMIC_GROUP):
+            return self.seq_keys(av if op == ATOMIC_GROUP else av[-1], left_closed, right_closed)
+        if op == BRANCH:
+            keys = set()
+            for branch in av[1]:
+                branch_keys = self.seq_keys(branch, left_closed, right_closed)
+                if not branch_keys:
+                    return None
+                keys.update(branch_keys)
+            return frozenset(keys)
+        if op in REPEATS:
+            min_count, max_count, item = av
+            if min_count == 0:
+                return None
+            body = self.seq_shape(item)
+            # Repetitions are surrounded by other repetitions
+            return self.seq_keys(
+                item, left_closed and body.last_sep, right_closed and body.first_sep)
+        return None
+
+
+def url_keys(valid_url):
+    """
+    Return a set of words such that any URL matched by the regular expression
+    valid_url contains at least one of them as a complete word (a maximal
+    sequence of lowercase ASCII letters and digits, after lowercasing the
+    URL), or None if no such set could be found.
+    """
+    try:
+        parsed = sre_parse.parse(valid_url)
+    except Exception:
+        return None
+    # re.match only matches at the beginning of the URL
+    return _KeyFinder().seq_keys(parsed, True, False)
+
+
+def url_words(url):
+    """ Return the words of url, or None if it isn't an ASCII string """
+    url = url.lower()
+    if any(ord(c) >= 128 for c in url):
+        # Case insensitive matches of non ASCII characters may not be found
+        # with the lowercase words
+        return None
+    return _WORD_RE.findall(url)
+
+
+_KEYS_CACHE = {}
+
+
+def extractor_url_keys(ie):
+    """
+    Return the keys of an extractor for URLDispatchIndex, None if it must be
+    tried with every URL
+    """
+    # The lazy extractors come with their precomputed keys
+    keys = getattr(ie, '_URL_KEYS', False)
+    if keys is not False:
+        return keys
+    suitable = getattr(ie.suitable, '__func__', None)
+    if suitable is not InfoExtractor.suitable.__func__:
+        # Extractors with their own logic
+        return None
+    valid_url = getattr(ie, '_VALID_URL', None)
+    if not valid_url:
+        return None
+    if valid_url not in _KEYS_CACHE:
+        _KEYS_CACHE[valid_url] = url_keys(valid_url)
+    return _KEYS_CACHE[valid_url]
+
+
+class URLDispatchIndex(object):
+    """
+    Index of extractors by the words their _VALID_URL requires.
+
+    candidates(url) returns, in their original order, the extractors whose
+    suitable() may return True for url: the ones indexed by one of the words
+    of the URL and the ones that couldn't be indexed.
+    """
+
+    def __init__(self, ies):
+        self._ies = list(ies)
+        self._buckets = {}
+        self._always = []
+        for idx, ie in enumerate(self._ies):
+            keys = extractor_url_keys(ie)
+            if keys is None:
+                self._always.append(idx)
+                continue
+            for key in keys:
+                self._buckets.setdefault(key, []).append(idx)
+
+    def candidates(self, url):
+        words = url_words(url)
+        if words is None:
+            return self._ies
+        idxs = set(self._always)
+        for word in set(words):
+            idxs.update(self._buckets.get(word, ()))
+        return [self._ies[idx] for idx in sorted(idxs)]
@@ -765,9 +765,9 @@ class YoutubeIE(YoutubeBaseInfoExtractor):
         }
     ]
 
-    def __init__(self, *args, **kwargs):
-        super(YoutubeIE, self).__init__(*args, **kwargs)
-        self._player_cache = {}
+    # Signature functions by player URL and signature length, shared by all
+    # the instances
+    _player_cache = {}
 
     def report_video_info_webpage_download(self, video_id):
         """Report attempt to download video info webpage."""
@@ -789,6 +789,34 @@ class YoutubeIE(YoutubeBaseInfoExtractor):
         """ Return a string representation of a signature """
         return '.'.join(compat_str(len(part)) for part in example_sig.split('.'))
 
+    def _load_player(self, video_id, player_url, player_type, player_id):
+        download_note = (
+            'Downloading player %s' % player_url
+            if self._downloader.params.get('verbose') else
+            'Downloading %s player %s' % (player_type, player_id)
+        )
+        if player_type == 'swf':
+            urlh = self._request_webpage(
+                player_url, video_id,
+                note=download_note,
+                errnote='Download of %s failed' % player_url)
+            return urlh.read()
+
+        assert player_type == 'js', 'Invalid player type %r' % player_type
+        # The players are large and don't change once published, keep a
+        # compressed copy of them in the filesystem cache
+        cache_key = '%s_%s' % (player_type, player_id)
+        code = self._downloader.cache.load(
+            'youtube-players', cache_key, dtype='json.gz')
+        if code is None:
+            code = self._download_webpage(
+                player_url, video_id,
+                note=download_note,
+                errnote='Download of %s failed' % player_url)
+            self._downloader.cache.store(
+                'youtube-players', cache_key, code, dtype='json.gz')
+        return code
+
     def _extract_signature_function(self, video_id, player_url, example_sig):
         id_m = re.match(
             r'.*?-(?P<id>[a-zA-Z0-9_-]+)(?:/watch_as3|/html5player(?:-new)?|/base)?\.(?P<ext>[a-z]+)$',
@@ -798,41 +826,33 @@ class YoutubeIE(YoutubeBaseInfoExtractor):
         player_type = id_m.group('ext')
         player_id = id_m.group('id')
 
-        # Read from filesystem cache
-        func_id = '%s_%s_%s' % (
-            player_type, player_id, self._signature_cache_id(example_sig))
+        # Read from filesystem cache, the transforms for all the signature
+        # lengths seen so far are stored in one entry per player
+        func_id = '%s_%s' % (player_type, player_id)
         assert os.path.basename(func_id) == func_id
+        sig_id = self._signature_cache_id(example_sig)
 
-        cache_spec = self._downloader.cache.load('youtube-sigfuncs', func_id)
-        if cache_spec is not None:
+        cache_specs = self._downloader.cache.load('youtube-sigfuncs', func_id)
+        if cache_specs is not None and sig_id in cache_specs:
+            cache_spec = cache_specs[sig_id]
             return lambda s: ''.join(s[i] for i in cache_spec)
 
-        download_note = (
-            'Downloading player %s' % player_url
-            if self._downloader.params.get('verbose') else
-            'Downloading %s player %s' % (player_type, player_id)
-        )
+        code = self._load_player(video_id, player_url, player_type, player_id)
         if player_type == 'js':
-            code = self._download_webpage(
-                player_url, video_id,
-                note=download_note,
-                errnote='Download of %s failed' % player_url)
             res = self._parse_sig_js(code)
-        elif player_type == 'swf':
-            urlh = self._request_webpage(
-                player_url, video_id,
-                note=download_note,
-                errnote='Download of %s failed' % player_url)
-            code = urlh.read()
-            res = self._parse_sig_swf(code)
         else:
-            assert False, 'Invalid player type %r' % player_type
+            res = self._parse_sig_swf(code)
 
         test_string = ''.join(map(compat_chr, range(len(example_sig))))
         cache_res = res(test_string)
         cache_spec = [ord(c) for c in cache_res]
 
-        self._downloader.cache.store('youtube-sigfuncs', func_id, cache_spec)
+        def add_spec(specs):
+            specs = dict(specs or {})
+            specs[sig_id] = cache_spec
+            return specs
+
+        self._downloader.cache.update('youtube-sigfuncs', func_id, add_spec)
         return res
 
     def _print_sig_code(self, func, example_sig):
@@ -1027,6 +1047,11 @@ class YoutubeIE(YoutubeBaseInfoExtractor):
         video_id = mobj.group(2)
         return video_id
 
+    @classmethod
+    def get_temp_id(cls, url):
+        mobj = re.match(cls._VALID_URL, url, re.VERBOSE)
+        return mobj.group(2) if mobj else None
+
     def _extract_from_m3u8(self, manifest_url, video_id):
         url_map = {}
 
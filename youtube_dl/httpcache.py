@@ -0,0 +1,413 @@
+from __future__ import unicode_literals
+
+import errno
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from .compat import (
+    compat_basestring,
+    compat_HTTPError,
+)
+from .utils import (
+    YoutubeDLHandler,
+    make_http_headers,
+    sanitized_Request,
+    timeconvert,
+)
+
+
+# Headers that only make sense for the connection or the encoded body
+_SKIPPED_HEADERS = frozenset((
+    'connection', 'content-encoding', 'content-length', 'keep-alive',
+    'proxy-connection', 'te', 'trailer', 'transfer-encoding', 'upgrade',
+))
+# Only textual responses are stored, other responses may be media files that
+# must not be read in full
+_CACHEABLE_TYPES = (
+    'text/', 'application/json', 'application/javascript',
+    'application/x-javascript', 'application/xml', 'application/dash+xml',
+    'application/vnd.apple.mpegurl', 'application/x-mpegurl',
+    'application/f4m+xml', 'application/smil',
+)
+_DEFAULT_MAX_SIZE = 100 * 1024 * 1024
+_MAX_MEMORY_SIZE = 16 * 1024 * 1024
+# Limit of the lifetime guessed from Last-Modified
+_MAX_HEURISTIC_LIFETIME = 24 * 60 * 60
+
+
+def _parse_cache_control(value):
+    directives = {}
+    for directive in value.split(','):
+        name, _, arg = directive.partition('=')
+        name = name.strip().lower()
+        if name:
+            directives[name] = arg.strip().strip('"')
+    return directives
+
+
+def freshness_lifetime(headers):
+    """
+    Return for how many seconds a response is fresh according to its
+    headers (a dictionary with lowercase names), as a private cache
+    """
+    cache_control = _parse_cache_control(headers.get('cache-control', ''))
+    if 'no-cache' in cache_control:
+        return 0
+    if 'max-age' in cache_control:
+        try:
+            return max(int(cache_control['max-age']), 0)
+        except ValueError:
+            return 0
+    date = timeconvert(headers.get('date', ''))
+    if 'expires' in headers:
+        expires = timeconvert(headers['expires'])
+        if date is None or expires is None:
+            return 0
+        return max(expires - date, 0)
+    last_modified = timeconvert(headers.get('last-modified', ''))
+    if date is not None and last_modified is not None and date > last_modified:
+        return min((date - last_modified) // 10, _MAX_HEURISTIC_LIFETIME)
+    return 0
+
+
+class HTTPResponseCache(object):
+    """
+    Private HTTP cache for the webpages downloaded by the extractors.
+
+    Only GET requests without credentials are cached, and only textual
+    responses with status 200 that don't set cookies. They are served
+    while they are fresh according to their Cache-Control, Expires or
+    Last-Modified headers, or for the TTL set for the extractor with the
+    http_cache_ttl parameter. Stale responses with an ETag or a
+    Last-Modified header are revalidated with a conditional request.
+
+    The responses are kept in memory and in the http-responses section of
+    the cache directory, the least recently used ones are removed when they
+    take more than http_cache_size bytes.
+    """
+
+    def __init__(self, ydl):
+        self._ydl = ydl
+        self._lock = threading.Lock()
+        # key -> [entry, body, last use]
+        self._memory = {}
+        self._memory_size = 0
+        self._uses = 0
+        # key -> [size, mtime], read from the directory on the first use
+        self._disk = None
+        self._disk_size = 0
+
+    @property
+    def enabled(self):
+        return bool(self._ydl.params.get('http_cache'))
+
+    @property
+    def max_size(self):
+        return self._ydl.params.get('http_cache_size') or _DEFAULT_MAX_SIZE
+
+    def _get_dir(self):
+        if not self._ydl.cache.enabled:
+            return None
+        return os.path.join(self._ydl.cache._get_root_dir(), 'http-responses')
+
+    def _debug(self, msg):
+        if self._ydl.params.get('verbose'):
+            self._ydl.to_screen('[debug] HTTP cache: %s' % msg)
+
+    # Storage
+
+    def _evict_memory(self):
+        limit = min(self.max_size, _MAX_MEMORY_SIZE)
+        if self._memory_size <= limit:
+            return
+        for key, (_, body, _) in sorted(self._memory.items(), key=lambda item: item[1][2]):
+            del self._memory[key]
+            self._memory_size -= len(body)
+            if self._memory_size <= limit:
+                break
+
+    def _remember(self, key, entry, body):
+        self._forget(key)
+        self._uses += 1
+        self._memory[key] = [entry, body, self._uses]
+        self._memory_size += len(body)
+        self._evict_memory()
+
+    def _forget(self, key):
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_size -= len(old[1])
+
+    def _load_disk_index(self, cache_dir):
+        if self._disk is not None:
+            return
+        self._disk = {}
+        self._disk_size = 0
+        try:
+            names = os.listdir(cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith('.gz'):
+                continue
+            try:
+                st = os.stat(os.path.join(cache_dir, name))
+            except OSError:
+                continue
+            self._disk[name[:-len('.gz')]] = [st.st_size, st.st_mtime]
+            self._disk_size += st.st_size
+
+    def _remove_file(self, cache_dir, key):
+        size, _ = self._disk.pop(key, (0, 0))
+        self._disk_size -= size
+        try:
+            os.remove(os.path.join(cache_dir, key + '.gz'))
+        except OSError:
+            pass
+
+    def _write_file(self, cache_dir, key, entry, body):
+        content = io.BytesIO()
+        gz = gzip.GzipFile(fileobj=content, mode='wb')
+        try:
+            gz.write(json.dumps(entry).encode('utf-8') + b'\n' + body)
+        finally:
+            gz.close()
+        content = content.getvalue()
+        if len(content) > self.max_size:
+            return
+
+        try:
+            os.makedirs(cache_dir)
+        except OSError as ose:
+            if ose.errno != errno.EEXIST:
+                raise
+        fn = os.path.join(cache_dir, key + '.gz')
+        # Readers in other processes must never see a partial file
+        fd, tmp_fn = tempfile.mkstemp(suffix='.tmp', prefix=key + '.', dir=cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            if sys.platform == 'win32':
+                # os.rename can't replace an existing file on Windows
+                try:
+                    os.unlink(fn)
+                except OSError:
+                    pass
+            os.rename(tmp_fn, fn)
+        except Exception:
+            try:
+                os.remove(tmp_fn)
+            except OSError:
+                pass
+            raise
+
+        old_size, _ = self._disk.get(key, (0, 0))
+        self._disk[key] = [len(content), time.time()]
+        self._disk_size += len(content) - old_size
+        if self._disk_size > self.max_size:
+            for old_key, _ in sorted(self._disk.items(), key=lambda item: item[1][1]):
+                if old_key != key:
+                    self._remove_file(cache_dir, old_key)
+                if self._disk_size <= self.max_size:
+                    break
+
+    def _read_file(self, cache_dir, key):
+        fn = os.path.join(cache_dir, key + '.gz')
+        try:
+            with open(fn, 'rb') as f:
+                content = f.read()
+        except IOError:
+            self._disk.pop(key, None)
+            return None
+        try:
+            gz = gzip.GzipFile(fileobj=io.BytesIO(content), mode='rb')
+            try:
+                data = gz.read()
+            finally:
+                gz.close()
+            meta, _, body = data.partition(b'\n')
+            entry = json.loads(meta.decode('utf-8'))
+        except Exception:
+            self._ydl.report_warning('Removing corrupted HTTP cache entry %s' % fn)
+            self._remove_file(cache_dir, key)
+            return None
+        self._touch(cache_dir, key)
+        return entry, body
+
+    def _touch(self, cache_dir, key):
+        # The modification time of the files is their last use
+        try:
+            os.utime(os.path.join(cache_dir, key + '.gz'), None)
+        except OSError:
+            pass
+        self._disk[key][1] = time.time()
+
+    def _lookup(self, key):
+        with self._lock:
+            cache_dir = self._get_dir()
+            if cache_dir is not None:
+                self._load_disk_index(cache_dir)
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._uses += 1
+                cached[2] = self._uses
+                if cache_dir is not None and key in self._disk:
+                    self._touch(cache_dir, key)
+                return cached[0], cached[1]
+            if cache_dir is None or key not in self._disk:
+                return None
+            cached = self._read_file(cache_dir, key)
+            if cached is not None:
+                self._remember(key, *cached)
+            return cached
+
+    def _save(self, key, entry, body):
+        with self._lock:
+            if len(body) > self.max_size:
+                return
+            self._remember(key, entry, body)
+            cache_dir = self._get_dir()
+            if cache_dir is None:
+                return
+            self._load_disk_index(cache_dir)
+            try:
+                self._write_file(cache_dir, key, entry, body)
+            except (IOError, OSError) as e:
+                self._ydl.report_warning('Unable to write to the HTTP cache: %s' % e)
+
+    # HTTP
+
+    @staticmethod
+    def _cacheable_request(req):
+        return (
+            req.get_method() == 'GET' and req.data is None and
+            not req.has_header('Authorization') and not req.has_header('Range'))
+
+    def _sends_cookies(self, req):
+        # The opener adds the cookies after the lookup, check on a copy
+        # whether the request will carry any
+        cookie_req = sanitized_Request(req.get_full_url(), headers=dict(req.header_items()))
+        self._ydl.cookiejar.add_cookie_header(cookie_req)
+        return cookie_req.has_header('Cookie')
+
+    @staticmethod
+    def _lower_headers(header_list):
+        return dict((name.lower(), value) for name, value in header_list)
+
+    def _make_entry(self, req, code, url, header_list, now):
+        headers = self._lower_headers(header_list)
+        vary = [v.strip().lower() for v in headers.get('vary', '').split(',') if v.strip()]
+        try:
+            age = max(int(headers.get('age', 0)), 0)
+        except ValueError:
+            age = 0
+        return {
+            'url': url,
+            'code': code,
+            'headers': [[name, value] for name, value in header_list
+                        if name.lower() not in _SKIPPED_HEADERS],
+            'stored': now,
+            'age': age,
+            'lifetime': freshness_lifetime(headers),
+            'vary': dict((name, req.get_header(name.capitalize())) for name in vary),
+        }
+
+    def _storable(self, resp, header_list, ttl):
+        headers = self._lower_headers(header_list)
+        if resp.getcode() != 200 or 'set-cookie' in headers or 'set-cookie2' in headers:
+            return False
+        if 'no-store' in _parse_cache_control(headers.get('cache-control', '')):
+            return False
+        if headers.get('vary', '').strip() == '*':
+            return False
+        content_type = headers.get('content-type', '').lower()
+        if not content_type.startswith(_CACHEABLE_TYPES):
+            return False
+        try:
+            if int(headers.get('content-length', 0)) > self.max_size:
+                return False
+        except ValueError:
+            pass
+        if ttl is not None:
+            return ttl > 0
+        return (freshness_lifetime(headers) > 0 or
+                'etag' in headers or 'last-modified' in headers)
+
+    @staticmethod
+    def _response(entry, body):
+        header_list = entry['headers'] + [['Content-Length', '%d' % len(body)]]
+        return YoutubeDLHandler.addinfourl_wrapper(
+            io.BytesIO(body), make_http_headers(header_list), entry['url'], entry['code'])
+
+    def urlopen(self, req, ttl=None):
+        """
+        Open req like YoutubeDL.urlopen, through the cache if it's enabled.
+        ttl (seconds) replaces the lifetime given by the response headers.
+        """
+        if isinstance(req, compat_basestring):
+            req = sanitized_Request(req)
+        if (not self.enabled or not self._cacheable_request(req) or
+                self._sends_cookies(req)):
+            return self._ydl.urlopen(req)
+
+        url = req.get_full_url()
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        cached = self._lookup(key)
+        if cached is not None:
+            entry, body = cached
+            if any(req.get_header(name.capitalize()) != value
+                    for name, value in entry['vary'].items()):
+                cached = None
+        now = time.time()
+
+        request = req
+        if cached is not None:
+            lifetime = ttl if ttl is not None else entry['lifetime']
+            if now - entry['stored'] + entry['age'] < lifetime:
+                self._debug('using the stored response for %s' % url)
+                return self._response(entry, body)
+            headers = self._lower_headers(entry['headers'])
+            validators = {}
+            if 'etag' in headers:
+                validators['If-None-Match'] = headers['etag']
+            if 'last-modified' in headers:
+                validators['If-Modified-Since'] = headers['last-modified']
+            if validators:
+                # Copy the request, it belongs to the caller
+                headers = dict(req.header_items())
+                headers.update(validators)
+                request = sanitized_Request(url, None, headers)
+
+        try:
+            resp = self._ydl.urlopen(request)
+        except compat_HTTPError as err:
+            if request is req or err.code != 304:
+                raise
+            err.close()
+            self._debug('the stored response for %s is still valid' % url)
+            header_list = dict(
+                (name.lower(), [name, value]) for name, value in entry['headers'])
+            header_list.update(
+                (name.lower(), [name, value]) for name, value in err.info().items()
+                if name.lower() not in _SKIPPED_HEADERS)
+            entry = self._make_entry(req, entry['code'], entry['url'], list(header_list.values()), now)
+            self._save(key, entry, body)
+            return self._response(entry, body)
+
+        header_list = list(resp.info().items())
+        if not self._storable(resp, header_list, ttl):
+            return resp
+        try:
+            body = resp.read()
+        finally:
+            resp.close()
+        entry = self._make_entry(req, resp.getcode(), resp.geturl(), header_list, now)
+        self._save(key, entry, body)
+        return self._response(entry, body)
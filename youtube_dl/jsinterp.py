@@ -1,9 +1,11 @@
 from __future__ import unicode_literals
 
-import json
+import hashlib
 import operator
 import re
+import threading
 
+from .compat import compat_chr
 from .utils import (
     ExtractorError,
 )
@@ -23,236 +25,595 @@ _OPERATORS = [
 _ASSIGN_OPERATORS = [(op + '=', opfunc) for op, opfunc in _OPERATORS]
 _ASSIGN_OPERATORS.append(('=', lambda cur, right: right))
 
+# Binding power of the binary operators, higher binds tighter
+_PRECEDENCE = {
+    '|': 1,
+    '^': 2,
+    '&': 3,
+    '>>': 4,
+    '<<': 4,
+    '-': 5,
+    '+': 5,
+    '%': 6,
+    '/': 6,
+    '*': 6,
+}
+_BINARY_OPERATORS = dict(_OPERATORS)
+_ASSIGN_OPERATORS_DICT = dict(_ASSIGN_OPERATORS)
+_UNARY_OPERATORS = {
+    '-': operator.neg,
+    '+': lambda x: x,
+    '~': operator.invert,
+    '!': operator.not_,
+}
+
 _NAME_RE = r'[a-zA-Z_$][a-zA-Z_$0-9]*'
 
+_TOKEN_RE = re.compile(r'''(?xs)
+    (?P<space>\s+|//[^\n]*|/\*.*?\*/)|
+    (?P<num>0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)|
+    (?P<str>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')|
+    (?P<name>%s)|
+    (?P<op>>>>=|>>>|===|!==|<<=|>>=|[-+*/%%&|^]=|==|!=|<=|>=|<<|>>|&&|\|\||\+\+|--|[-+*/%%&|^!~<>=?:.,;()\[\]{}])
+''' % _NAME_RE)
+
+_STRING_ESCAPES = {
+    'b': '\b',
+    'f': '\f',
+    'n': '\n',
+    'r': '\r',
+    't': '\t',
+    'v': '\v',
+    '0': '\0',
+}
+
+_STRING_ESCAPE_RE = re.compile(r'\\(?:x([0-9a-fA-F]{2})|u([0-9a-fA-F]{4})|(.))', re.S)
+
+_CONSTANTS = {
+    'true': True,
+    'false': False,
+    'null': None,
+    'undefined': None,
+}
+
+# Statements we can't handle, they are rejected when parsing instead of
+# being misinterpreted as names
+_UNSUPPORTED_KEYWORDS = frozenset((
+    'break', 'case', 'catch', 'continue', 'do', 'else', 'for', 'if', 'in',
+    'new', 'switch', 'this', 'throw', 'try', 'typeof', 'while', 'with',
+))
+
+# The parsed functions and objects of the last few player codes, shared by
+# all the JSInterpreter instances
+_PARSE_CACHE = {}
+_PARSE_CACHE_ORDER = []
+_PARSE_CACHE_SIZE = 16
+_PARSE_CACHE_LOCK = threading.Lock()
+
+
+def _unescape_string(s):
+    def repl(m):
+        if m.group(1) or m.group(2):
+            return compat_chr(int(m.group(1) or m.group(2), 16))
+        return _STRING_ESCAPES.get(m.group(3), m.group(3))
+
+    return _STRING_ESCAPE_RE.sub(repl, s)
+
+
+def _js_split(obj, argvals):
+    sep = argvals[0] if argvals else None
+    if sep is None:
+        return [obj]
+    if sep == '':
+        return list(obj)
+    return obj.split(sep)
+
+
+def _js_join(obj, argvals):
+    sep = argvals[0] if argvals else ','
+    return sep.join(obj)
+
+
+def _js_reverse(obj, argvals):
+    obj.reverse()
+    return obj
+
+
+def _js_slice(obj, argvals):
+    start = argvals[0] if argvals else 0
+    end = argvals[1] if len(argvals) > 1 else None
+    return obj[start:end]
+
+
+def _js_splice(obj, argvals):
+    assert isinstance(obj, list)
+    index = argvals[0]
+    how_many = argvals[1] if len(argvals) > 1 else len(obj) - index
+    res = obj[index:index + how_many]
+    obj[index:index + how_many] = list(argvals[2:])
+    return res
+
+
+_METHODS = {
+    'split': _js_split,
+    'join': _js_join,
+    'reverse': _js_reverse,
+    'slice': _js_slice,
+    'splice': _js_splice,
+}
+
+
+class _JSParser(object):
+    """
+    Parser for the subset of JavaScript used in the signature functions.
+
+    It consumes the code from a given position and produces a tree of tuples,
+    so that it can stop at the end of a function body without tokenizing the
+    rest of the player code.
+    """
+
+    def __init__(self, code, pos=0):
+        self.code = code
+        self._pos = pos
+        self._token = None
+        self._advance()
+
+    def _advance(self):
+        token = self._token
+        while True:
+            if self._pos >= len(self.code):
+                self._token = ('end', None, self._pos)
+                break
+            m = _TOKEN_RE.match(self.code, self._pos)
+            if m is None:
+                raise ExtractorError(
+                    'Unsupported JS syntax at %r' % self.code[self._pos:self._pos + 30])
+            self._pos = m.end()
+            if m.lastgroup != 'space':
+                self._token = (m.lastgroup, m.group(0), m.start())
+                break
+        return token
+
+    def _error(self, msg):
+        pos = self._token[2]
+        return ExtractorError('%s at %r' % (msg, self.code[pos:pos + 30]))
+
+    def _at(self, value):
+        return self._token[0] == 'op' and self._token[1] == value
+
+    def _accept(self, value):
+        if self._at(value):
+            self._advance()
+            return True
+        return False
+
+    def _expect(self, value):
+        if not self._accept(value):
+            raise self._error('Expected %r' % value)
+
+    def _expect_name(self):
+        if self._token[0] != 'name':
+            raise self._error('Expected a name')
+        return self._advance()[1]
+
+    def parse_function_body(self):
+        """ Parse "{ statements }" and return the statements """
+        self._expect('{')
+        statements = []
+        while not self._accept('}'):
+            if self._token[0] == 'end':
+                raise self._error('Premature end of function body')
+            if self._accept(';'):
+                continue
+            statements.append(self.parse_statement())
+        return statements
+
+    def parse_statements(self):
+        """ Parse statements until the end of the code """
+        statements = []
+        while self._token[0] != 'end':
+            if self._accept(';'):
+                continue
+            statements.append(self.parse_statement())
+        return statements
+
+    def parse_statement(self):
+        token_type, value, _ = self._token
+        if token_type == 'name' and value == 'var':
+            self._advance()
+            declarations = []
+            while True:
+                name = self._expect_name()
+                declarations.append(
+                    (name, self.parse_expression() if self._accept('=') else None))
+                if not self._accept(','):
+                    break
+            statement = ('var', declarations)
+        elif token_type == 'name' and value == 'return':
+            self._advance()
+            if self._at(';') or self._at('}') or self._token[0] == 'end':
+                statement = ('return', None)
+            else:
+                statement = ('return', self.parse_expression())
+        else:
+            statement = ('expr', self.parse_expression())
+        if not (self._accept(';') or self._at('}') or self._token[0] == 'end'):
+            raise self._error('Unsupported JS statement')
+        return statement
+
+    def parse_expression(self):
+        left = self._parse_binary(0)
+        if self._token[0] == 'op' and self._token[1] in _ASSIGN_OPERATORS_DICT:
+            if left[0] not in ('name', 'member', 'index'):
+                raise self._error('Invalid assignment target')
+            op = self._advance()[1]
+            return ('assign', op, left, self.parse_expression())
+        return left
+
+    def _parse_binary(self, min_precedence):
+        left = self._parse_unary()
+        while True:
+            token_type, op, _ = self._token
+            precedence = _PRECEDENCE.get(op) if token_type == 'op' else None
+            if precedence is None or precedence <= min_precedence:
+                return left
+            self._advance()
+            left = ('binop', op, left, self._parse_binary(precedence))
+
+    def _parse_unary(self):
+        if self._token[0] == 'op' and self._token[1] in _UNARY_OPERATORS:
+            op = self._advance()[1]
+            return ('unary', op, self._parse_unary())
+        return self._parse_postfix(self._parse_primary())
+
+    def _parse_postfix(self, node):
+        while True:
+            if self._accept('.'):
+                node = ('member', node, self._expect_name())
+            elif self._accept('['):
+                node = ('index', node, self.parse_expression())
+                self._expect(']')
+            elif self._accept('('):
+                node = ('call', node, self._parse_list(')'))
+            else:
+                return node
+
+    def _parse_list(self, end):
+        items = []
+        while not self._accept(end):
+            items.append(self.parse_expression())
+            if not self._accept(','):
+                self._expect(end)
+                break
+        return items
+
+    def _parse_primary(self):
+        token_type, value, _ = self._token
+        if token_type == 'num':
+            self._advance()
+            if value[:2] in ('0x', '0X'):
+                return ('const', int(value, 16))
+            if re.match(r'^\d+$', value):
+                return ('const', int(value))
+            return ('const', float(value))
+        if token_type == 'str':
+            self._advance()
+            return ('const', _unescape_string(value[1:-1]))
+        if token_type == 'name':
+            if value in _CONSTANTS:
+                self._advance()
+                return ('const', _CONSTANTS[value])
+            if value == 'function':
+                return self._parse_function_expression()
+            if value in _UNSUPPORTED_KEYWORDS or value in ('var', 'return'):
+                raise self._error('Unsupported JS keyword %r' % value)
+            self._advance()
+            return ('name', value)
+        if self._accept('('):
+            node = self.parse_expression()
+            self._expect(')')
+            return node
+        if self._accept('['):
+            return ('array', self._parse_list(']'))
+        if self._at('{'):
+            return self.parse_object_literal()
+        raise self._error('Unsupported JS expression')
+
+    def _parse_function_expression(self):
+        self._advance()
+        if self._token[0] == 'name':
+            self._advance()
+        self._expect('(')
+        argnames = []
+        while not self._accept(')'):
+            argnames.append(self._expect_name())
+            if not self._accept(','):
+                self._expect(')')
+                break
+        return ('function', argnames, self.parse_function_body())
+
+    def parse_object_literal(self):
+        self._expect('{')
+        fields = []
+        while not self._accept('}'):
+            token_type, key, _ = self._token
+            if token_type == 'str':
+                key = _unescape_string(key[1:-1])
+            elif token_type not in ('name', 'num'):
+                raise self._error('Unsupported JS object key')
+            self._advance()
+            self._expect(':')
+            fields.append((key, self.parse_expression()))
+            if not self._accept(','):
+                self._expect('}')
+                break
+        return ('object', fields)
+
 
 class JSInterpreter(object):
+    """
+    Interpreter for the functions extracted from a piece of JavaScript code.
+
+    Every function is parsed once into a tree, which is then compiled into
+    nested Python closures. The parsed trees are shared by the interpreters
+    created for the same code, so that a player is only parsed once per
+    process.
+    """
+
     def __init__(self, code, objects=None):
         if objects is None:
             objects = {}
         self.code = code
         self._functions = {}
         self._objects = objects
-
-    def interpret_statement(self, stmt, local_vars, allow_recursion=100):
-        if allow_recursion < 0:
-            raise ExtractorError('Recursion limit reached')
-
-        should_abort = False
-        stmt = stmt.lstrip()
-        stmt_m = re.match(r'var\s', stmt)
-        if stmt_m:
-            expr = stmt[len(stmt_m.group(0)):]
+        self._code_hash = None
+        self._compiled = {}
+
+    def _parse(self, kind, name, parse):
+        if self._code_hash is None:
+            self._code_hash = hashlib.sha1(self.code.encode('utf-8')).hexdigest()
+        key = (kind, name)
+        with _PARSE_CACHE_LOCK:
+            entries = _PARSE_CACHE.get(self._code_hash)
+            if entries is not None and key in entries:
+                return entries[key]
+        res = parse()
+        with _PARSE_CACHE_LOCK:
+            entries = _PARSE_CACHE.get(self._code_hash)
+            if entries is None:
+                entries = _PARSE_CACHE[self._code_hash] = {}
+                _PARSE_CACHE_ORDER.append(self._code_hash)
+                if len(_PARSE_CACHE_ORDER) > _PARSE_CACHE_SIZE:
+                    del _PARSE_CACHE[_PARSE_CACHE_ORDER.pop(0)]
+            entries[key] = res
+        return res
+
+    def _get_object(self, name):
+        if name not in self._objects:
+            self._objects[name] = self.extract_object(name)
+        return self._objects[name]
+
+    def _get_function(self, name):
+        if name not in self._functions:
+            self._functions[name] = self.extract_function(name)
+        return self._functions[name]
+
+    def _compile(self, node):
+        return getattr(self, '_compile_' + node[0])(*node[1:])
+
+    def _compile_const(self, value):
+        return lambda local_vars: value
+
+    def _compile_name(self, name):
+        def evaluate(local_vars):
+            if name in local_vars:
+                return local_vars[name]
+            if name in self._objects:
+                return self._objects[name]
+            raise ExtractorError('Undefined JS variable %r' % name)
+        return evaluate
+
+    def _compile_base(self, node):
+        # The object of a member access or call may be a global object
+        if node[0] != 'name':
+            return self._compile(node)
+        name = node[1]
+
+        def evaluate(local_vars):
+            if name in local_vars:
+                return local_vars[name]
+            return self._get_object(name)
+        return evaluate
+
+    def _compile_array(self, items):
+        items = [self._compile(item) for item in items]
+        return lambda local_vars: [item(local_vars) for item in items]
+
+    def _compile_object(self, fields):
+        fields = [(key, self._compile(value)) for key, value in fields]
+        return lambda local_vars: dict(
+            (key, value(local_vars)) for key, value in fields)
+
+    def _compile_function(self, argnames, statements):
+        func = self._build_function(argnames, statements)
+        return lambda local_vars: func
+
+    def _compile_member(self, obj, member):
+        obj = self._compile_base(obj)
+
+        def evaluate(local_vars):
+            value = obj(local_vars)
+            if member == 'length' and not isinstance(value, dict):
+                return len(value)
+            return value[member]
+        return evaluate
+
+    def _compile_index(self, obj, idx):
+        obj = self._compile_base(obj)
+        idx = self._compile(idx)
+        return lambda local_vars: obj(local_vars)[idx(local_vars)]
+
+    def _compile_call(self, callee, args):
+        args = [self._compile(arg) for arg in args]
+
+        if callee[0] == 'name':
+            name = callee[1]
+
+            def evaluate(local_vars):
+                func = local_vars[name] if name in local_vars else self._get_function(name)
+                return func(tuple(arg(local_vars) for arg in args))
+        elif callee[0] == 'member':
+            obj = self._compile_base(callee[1])
+            member = callee[2]
+            method = _METHODS.get(member)
+
+            def evaluate(local_vars):
+                value = obj(local_vars)
+                argvals = tuple(arg(local_vars) for arg in args)
+                if isinstance(value, dict):
+                    return value[member](argvals)
+                if method is None:
+                    raise ExtractorError('Unsupported JS method %r' % member)
+                return method(value, argvals)
         else:
-            return_m = re.match(r'return(?:\s+|$)', stmt)
-            if return_m:
-                expr = stmt[len(return_m.group(0)):]
-                should_abort = True
-            else:
-                # Try interpreting it as an expression
-                expr = stmt
+            func = self._compile(callee)
 
-        v = self.interpret_expression(expr, local_vars, allow_recursion)
-        return v, should_abort
+            def evaluate(local_vars):
+                return func(local_vars)(tuple(arg(local_vars) for arg in args))
+        return evaluate
 
-    def interpret_expression(self, expr, local_vars, allow_recursion):
-        expr = expr.strip()
+    def _compile_unary(self, op, operand):
+        opfunc = _UNARY_OPERATORS[op]
+        operand = self._compile(operand)
+        return lambda local_vars: opfunc(operand(local_vars))
 
-        if expr == '':  # Empty expression
-            return None
+    def _compile_binop(self, op, left, right):
+        opfunc = _BINARY_OPERATORS[op]
+        left = self._compile(left)
+        right = self._compile(right)
+        return lambda local_vars: opfunc(left(local_vars), right(local_vars))
 
-        if expr.startswith('('):
-            parens_count = 0
-            for m in re.finditer(r'[()]', expr):
-                if m.group(0) == '(':
-                    parens_count += 1
-                else:
-                    parens_count -= 1
-                    if parens_count == 0:
-                        sub_expr = expr[1:m.start()]
-                        sub_result = self.interpret_expression(
-                            sub_expr, local_vars, allow_recursion)
-                        remaining_expr = expr[m.end():].strip()
-                        if not remaining_expr:
-                            return sub_result
-                        else:
-                            expr = json.dumps(sub_result) + remaining_expr
-                        break
-            else:
-                raise ExtractorError('Premature end of parens in %r' % expr)
-
-        for op, opfunc in _ASSIGN_OPERATORS:
-            m = re.match(r'''(?x)
-                (?P<out>%s)(?:\[(?P<index>[^\]]+?)\])?
-                \s*%s
-                (?P<expr>.*)$''' % (_NAME_RE, re.escape(op)), expr)
-            if not m:
-                continue
-            right_val = self.interpret_expression(
-                m.group('expr'), local_vars, allow_recursion - 1)
-
-            if m.groupdict().get('index'):
-                lvar = local_vars[m.group('out')]
-                idx = self.interpret_expression(
-                    m.group('index'), local_vars, allow_recursion)
-                assert isinstance(idx, int)
-                cur = lvar[idx]
-                val = opfunc(cur, right_val)
-                lvar[idx] = val
-                return val
-            else:
-                cur = local_vars.get(m.group('out'))
-                val = opfunc(cur, right_val)
-                local_vars[m.group('out')] = val
-                return val
+    def _compile_assign(self, op, target, value):
+        opfunc = _ASSIGN_OPERATORS_DICT[op]
+        value = self._compile(value)
 
-        if expr.isdigit():
-            return int(expr)
-
-        var_m = re.match(
-            r'(?!if|return|true|false)(?P<name>%s)$' % _NAME_RE,
-            expr)
-        if var_m:
-            return local_vars[var_m.group('name')]
-
-        try:
-            return json.loads(expr)
-        except ValueError:
-            pass
-
-        m = re.match(
-            r'(?P<var>%s)\.(?P<member>[^(]+)(?:\(+(?P<args>[^()]*)\))?$' % _NAME_RE,
-            expr)
-        if m:
-            variable = m.group('var')
-            member = m.group('member')
-            arg_str = m.group('args')
-
-            if variable in local_vars:
-                obj = local_vars[variable]
-            else:
-                if variable not in self._objects:
-                    self._objects[variable] = self.extract_object(variable)
-                obj = self._objects[variable]
-
-            if arg_str is None:
-                # Member access
-                if member == 'length':
-                    return len(obj)
-                return obj[member]
-
-            assert expr.endswith(')')
-            # Function call
-            if arg_str == '':
-                argvals = tuple()
-            else:
-                argvals = tuple([
-                    self.interpret_expression(v, local_vars, allow_recursion)
-                    for v in arg_str.split(',')])
-
-            if member == 'split':
-                assert argvals == ('',)
-                return list(obj)
-            if member == 'join':
-                assert len(argvals) == 1
-                return argvals[0].join(obj)
-            if member == 'reverse':
-                assert len(argvals) == 0
-                obj.reverse()
-                return obj
-            if member == 'slice':
-                assert len(argvals) == 1
-                return obj[argvals[0]:]
-            if member == 'splice':
-                assert isinstance(obj, list)
-                index, howMany = argvals
-                res = []
-                for i in range(index, min(index + howMany, len(obj))):
-                    res.append(obj.pop(index))
+        if target[0] == 'name':
+            name = target[1]
+
+            def evaluate(local_vars):
+                val = opfunc(local_vars.get(name), value(local_vars))
+                local_vars[name] = val
+                return val
+            return evaluate
+
+        obj = self._compile_base(target[1])
+        key = (
+            self._compile(target[2]) if target[0] == 'index'
+            else self._compile_const(target[2]))
+
+        def evaluate(local_vars):
+            container = obj(local_vars)
+            idx = key(local_vars)
+            right_val = value(local_vars)
+            val = right_val if op == '=' else opfunc(container[idx], right_val)
+            container[idx] = val
+            return val
+        return evaluate
+
+    def _compile_statement(self, statement):
+        """ Return a tuple (closure, is_return) """
+        kind = statement[0]
+        if kind == 'var':
+            assignments = [
+                self._compile_assign('=', ('name', name), value or ('const', None))
+                for name, value in statement[1]]
+
+            def evaluate(local_vars):
+                res = None
+                for assignment in assignments:
+                    res = assignment(local_vars)
                 return res
+            return evaluate, False
+        if kind == 'return':
+            return (
+                self._compile(statement[1]) if statement[1] is not None
+                else self._compile_const(None)), True
+        return self._compile(statement[1]), False
 
-            return obj[member](argvals)
+    def _build_function(self, argnames, statements):
+        statements = [self._compile_statement(stmt) for stmt in statements]
 
-        m = re.match(
-            r'(?P<in>%s)\[(?P<idx>.+)\]$' % _NAME_RE, expr)
-        if m:
-            val = local_vars[m.group('in')]
-            idx = self.interpret_expression(
-                m.group('idx'), local_vars, allow_recursion - 1)
-            return val[idx]
+        def resf(args):
+            local_vars = dict(zip(argnames, args))
+            for stmt, is_return in statements:
+                res = stmt(local_vars)
+                if is_return:
+                    return res
+            return None
+        return resf
 
-        for op, opfunc in _OPERATORS:
-            m = re.match(r'(?P<x>.+?)%s(?P<y>.+)' % re.escape(op), expr)
-            if not m:
-                continue
-            x, abort = self.interpret_statement(
-                m.group('x'), local_vars, allow_recursion - 1)
-            if abort:
-                raise ExtractorError(
-                    'Premature left-side return of %s in %r' % (op, expr))
-            y, abort = self.interpret_statement(
-                m.group('y'), local_vars, allow_recursion - 1)
-            if abort:
-                raise ExtractorError(
-                    'Premature right-side return of %s in %r' % (op, expr))
-            return opfunc(x, y)
-
-        m = re.match(
-            r'^(?P<func>%s)\((?P<args>[a-zA-Z0-9_$,]+)\)$' % _NAME_RE, expr)
-        if m:
-            fname = m.group('func')
-            argvals = tuple([
-                int(v) if v.isdigit() else local_vars[v]
-                for v in m.group('args').split(',')])
-            if fname not in self._functions:
-                self._functions[fname] = self.extract_function(fname)
-            return self._functions[fname](argvals)
-
-        raise ExtractorError('Unsupported JS expression %r' % expr)
+    def _compile_source(self, kind, source, parse):
+        # Cache for interpret_statement and interpret_expression
+        key = (kind, source)
+        if key not in self._compiled:
+            self._compiled[key] = parse(_JSParser(source))
+        return self._compiled[key]
+
+    def interpret_statement(self, stmt, local_vars, allow_recursion=100):
+        # allow_recursion is only kept for backwards compatibility, the
+        # statements are parsed without recursing on their source
+        def parse(parser):
+            statements = parser.parse_statements()
+            if not statements:
+                return self._compile_const(None), False
+            if len(statements) > 1:
+                raise ExtractorError('Expected a single JS statement in %r' % stmt)
+            return self._compile_statement(statements[0])
+
+        evaluate, should_abort = self._compile_source('statement', stmt, parse)
+        return evaluate(local_vars), should_abort
+
+    def interpret_expression(self, expr, local_vars, allow_recursion=100):
+        def parse(parser):
+            if parser._token[0] == 'end':  # Empty expression
+                return self._compile_const(None)
+            node = parser.parse_expression()
+            if parser._token[0] != 'end':
+                raise parser._error('Unsupported JS expression')
+            return self._compile(node)
+
+        return self._compile_source('expression', expr, parse)(local_vars)
 
     def extract_object(self, objname):
-        obj = {}
-        obj_m = re.search(
-            (r'(?:var\s+)?%s\s*=\s*\{' % re.escape(objname)) +
-            r'\s*(?P<fields>([a-zA-Z$0-9]+\s*:\s*function\(.*?\)\s*\{.*?\}(?:,\s*)?)*)' +
-            r'\}\s*;',
-            self.code)
-        fields = obj_m.group('fields')
-        # Currently, it only supports function definitions
-        fields_m = re.finditer(
-            r'(?P<key>[a-zA-Z$0-9]+)\s*:\s*function'
-            r'\((?P<args>[a-z,]+)\){(?P<code>[^}]+)}',
-            fields)
-        for f in fields_m:
-            argnames = f.group('args').split(',')
-            obj[f.group('key')] = self.build_function(argnames, f.group('code'))
-
-        return obj
+        def parse():
+            obj_m = re.search(
+                r'(?<![a-zA-Z0-9_$.])(?:var\s+)?%s\s*=\s*(?={)' % re.escape(objname),
+                self.code)
+            if obj_m is None:
+                raise ExtractorError('Could not find JS object %r' % objname)
+            return _JSParser(self.code, obj_m.end()).parse_object_literal()
+
+        return self._compile(self._parse('object', objname, parse))({})
 
     def extract_function(self, funcname):
-        func_m = re.search(
-            r'''(?x)
-                (?:function\s+%s|[{;,]%s\s*=\s*function|var\s+%s\s*=\s*function)\s*
-                \((?P<args>[^)]*)\)\s*
-                \{(?P<code>[^}]+)\}''' % (
-                re.escape(funcname), re.escape(funcname), re.escape(funcname)),
-            self.code)
-        if func_m is None:
-            raise ExtractorError('Could not find JS function %r' % funcname)
-        argnames = func_m.group('args').split(',')
-
-        return self.build_function(argnames, func_m.group('code'))
+        def parse():
+            func_m = re.search(
+                r'''(?x)
+                    (?:function\s+%s|[{;,]\s*%s\s*=\s*function|var\s+%s\s*=\s*function)\s*
+                    \((?P<args>[^)]*)\)\s*(?={)''' % (
+                    re.escape(funcname), re.escape(funcname), re.escape(funcname)),
+                self.code)
+            if func_m is None:
+                raise ExtractorError('Could not find JS function %r' % funcname)
+            argnames = [
+                a.strip() for a in func_m.group('args').split(',') if a.strip()]
+            return argnames, _JSParser(self.code, func_m.end()).parse_function_body()
+
+        return self._build_function(*self._parse('function', funcname, parse))
 
     def call_function(self, funcname, *args):
         f = self.extract_function(funcname)
         return f(args)
 
     def build_function(self, argnames, code):
-        def resf(args):
-            local_vars = dict(zip(argnames, args))
-            for stmt in code.split(';'):
-                res, abort = self.interpret_statement(stmt, local_vars)
-                if abort:
-                    break
-            return res
-        return resf
+        return self._build_function(argnames, _JSParser(code).parse_statements())
@@ -170,6 +170,17 @@ def parseOpts(overrideArguments=None):
         action='store_const', dest='extract_flat', const='in_playlist',
         default=False,
         help='Do not extract the videos of a playlist, only list them.')
+    general.add_option(
+        '--serve',
+        action='store_true', dest='serve', default=False,
+        help='Keep running and read download jobs as JSON lines from stdin, '
+             'writing their progress and results as JSON lines to stdout. '
+             'A job is an object like {"id": "job1", "urls": ["URL"], "params": {"format": "best"}} '
+             'where params overrides the options for this job only')
+    general.add_option(
+        '--serve-socket',
+        dest='serve_socket', metavar='PATH',
+        help='Like --serve, but accept clients on a Unix socket created at PATH')
     general.add_option(
         '--no-color', '--no-colors',
         action='store_true', dest='no_color',
@@ -295,6 +306,12 @@ def parseOpts(overrideArguments=None):
         '--download-archive', metavar='FILE',
         dest='download_archive',
         help='Download only videos not listed in the archive file. Record the IDs of all downloaded videos in it.')
+    selection.add_option(
+        '--download-archive-format', metavar='FORMAT',
+        dest='download_archive_format', default=None, choices=('text', 'sqlite'),
+        help='Format of the archive file: "text" (one video per line) or "sqlite" (an SQLite database, '
+             'better suited for very large archives shared by several processes). '
+             'By default the format is guessed from the file')
     selection.add_option(
         '--include-ads',
         dest='include_ads', action='store_true',
@@ -391,6 +408,38 @@ def parseOpts(overrideArguments=None):
         '-R', '--retries',
         dest='retries', metavar='RETRIES', default=10,
         help='Number of retries (default is %default), or "infinite".')
+    downloader.add_option(
+        '--concurrent-fragments',
+        dest='concurrent_fragment_downloads', metavar='N', default=1, type=int,
+        help='Number of fragments to download concurrently for fragmented (DASH, hlsnative and f4m) '
+             'videos (default is %default)')
+    downloader.add_option(
+        '--async-network',
+        action='store_true', dest='async_network', default=False,
+        help='Download the fragments of concurrent fragment downloads with an asyncio based HTTP client '
+             'running on a single thread, instead of a thread per fragment (Python 3 only, '
+             'ignored when a proxy is used)')
+    downloader.add_option(
+        '--no-parallel-merge-downloads',
+        action='store_false', dest='parallel_merge_downloads', default=True,
+        help='Download the formats to merge (e.g. bestvideo+bestaudio) one after the other '
+             'instead of at the same time')
+    downloader.add_option(
+        '--stream-merge',
+        action='store_true', dest='stream_merge', default=False,
+        help='Merge the formats (e.g. bestvideo+bestaudio) with ffmpeg while they are downloaded over HTTP, '
+             'without writing them to separate files first. The formats must be readable sequentially, '
+             'like DASH formats (experimental, not available on Windows)')
+    downloader.add_option(
+        '--http-connections',
+        dest='http_connections', metavar='N', default=1, type=int,
+        help='Number of connections to download a file over HTTP with, when the server supports '
+             'byte ranges (default is %default)')
+    downloader.add_option(
+        '--http-chunk-size',
+        dest='http_chunk_size', metavar='SIZE', default=None,
+        help='Size of a chunk for chunk-based HTTP downloading (e.g. 10485760 or 10M) (default is disabled). '
+             'May be useful for bypassing bandwidth throttling imposed by a webserver (experimental)')
     downloader.add_option(
         '--buffer-size',
         dest='buffersize', metavar='SIZE', default='1024',
@@ -407,6 +456,10 @@ def parseOpts(overrideArguments=None):
         '--playlist-reverse',
         action='store_true',
         help='Download playlist videos in reverse order')
+    downloader.add_option(
+        '--parallel-entries',
+        dest='parallel_entries', metavar='N', default=1, type=int,
+        help='Number of playlist videos to extract and download concurrently (default is %default)')
     downloader.add_option(
         '--xattr-set-filesize',
         dest='xattr_set_filesize', action='store_true',
@@ -439,6 +492,10 @@ def parseOpts(overrideArguments=None):
         '--no-check-certificate',
         action='store_true', dest='no_check_certificate', default=False,
         help='Suppress HTTPS certificate validation')
+    workarounds.add_option(
+        '--no-keep-alive',
+        action='store_false', dest='keep_alive', default=True,
+        help='Open a new connection for every HTTP request instead of reusing persistent connections')
     workarounds.add_option(
         '--prefer-insecure',
         '--prefer-unsecure', action='store_true', dest='prefer_insecure',
@@ -666,6 +723,20 @@ def parseOpts(overrideArguments=None):
         '--rm-cache-dir',
         action='store_true', dest='rm_cachedir',
         help='Delete all filesystem cache files')
+    filesystem.add_option(
+        '--http-cache',
+        action='store_true', dest='http_cache', default=False,
+        help='Cache the webpages downloaded by the extractors in memory and in the cache directory, '
+             'and reuse them while their HTTP headers say they are fresh')
+    filesystem.add_option(
+        '--http-cache-size',
+        dest='http_cache_size', metavar='SIZE', default=None,
+        help='Maximum size of the HTTP cache, the least recently used webpages are removed first (e.g. 50M, default is 100M)')
+    filesystem.add_option(
+        '--http-cache-ttl',
+        action='append', dest='http_cache_ttl', metavar='[EXTRACTOR:]SECONDS', default=[],
+        help='Reuse the cached webpages of EXTRACTOR (of all extractors if omitted) for SECONDS, '
+             'whatever their HTTP headers say. Can be used multiple times')
 
     thumbnail = optparse.OptionGroup(parser, 'Thumbnail images')
     thumbnail.add_option(
@@ -756,6 +827,10 @@ def parseOpts(overrideArguments=None):
         '--exec',
         metavar='CMD', dest='exec_cmd',
         help='Execute a command on the file after downloading, similar to find\'s -exec syntax. Example: --exec \'adb push {} /sdcard/Music/ && rm {}\'')
+    postproc.add_option(
+        '--postprocessor-workers',
+        dest='postprocessor_workers', metavar='N', default=0, type=int,
+        help='Post-process the downloaded files with N threads while the next files are downloaded (default is %default, post-process each file before downloading the next one)')
     postproc.add_option(
         '--convert-subs', '--convert-subtitles',
         metavar='FORMAT', dest='convertsubtitles', default=None,
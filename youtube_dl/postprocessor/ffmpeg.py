@@ -3,12 +3,21 @@ from __future__ import unicode_literals
 import io
 import os
 import subprocess
+import sys
+import tempfile
+import threading
 import time
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 
 from .common import AudioConversionError, PostProcessor
 
 from ..compat import (
+    compat_getenv,
     compat_subprocess_get_DEVNULL,
 )
 from ..utils import (
@@ -29,6 +38,84 @@ class FFmpegPostProcessorError(PostProcessingError):
     pass
 
 
+# Versions of the executables found so far by the process, by absolute path:
+# {path: ([mtime, size], version)}. The executables are only run again when
+# they are modified.
+_exe_versions = {}
+_exe_versions_lock = threading.Lock()
+
+
+def _find_executable(exe):
+    """ Return the absolute path of exe, looked up in PATH if it's a bare name """
+    if os.path.dirname(exe):
+        candidates = [exe]
+    else:
+        dirs = compat_getenv('PATH', os.defpath).split(os.pathsep)
+        if sys.platform == 'win32':
+            # Windows looks in the current directory first
+            dirs.insert(0, '.')
+        candidates = [os.path.join(d, exe) for d in dirs if d]
+    exts = ['']
+    if sys.platform == 'win32':
+        exts.extend(compat_getenv('PATHEXT', '.EXE').split(os.pathsep))
+    for candidate in candidates:
+        for ext in exts:
+            path = candidate + ext
+            if os.path.isfile(path) and os.access(path, os.X_OK):
+                return os.path.abspath(path)
+    return None
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime, st.st_size]
+
+
+def _get_exe_version(exe, downloader=None):
+    """
+    Return the version of the executable exe as get_exe_version does, run it
+    only if it wasn't run before by this process or, when the cache is
+    enabled, by a previous run.
+    """
+    path = _find_executable(exe)
+    if path is None:
+        return False
+    stat_key = _stat_key(path)
+    if stat_key is None:
+        return False
+
+    with _exe_versions_lock:
+        entry = _exe_versions.get(path)
+    if entry is not None and entry[0] == stat_key:
+        return entry[1]
+
+    # Downloaders don't have a cache
+    cache = getattr(downloader, 'cache', None)
+    if cache is not None:
+        entry = (cache.load('ffmpeg', 'versions') or {}).get(path)
+        if entry is not None and entry[0] == stat_key:
+            with _exe_versions_lock:
+                _exe_versions[path] = tuple(entry)
+            return entry[1]
+
+    version = get_exe_version(path, args=['-version'])
+    with _exe_versions_lock:
+        _exe_versions[path] = (stat_key, version)
+    if cache is not None:
+        def add_version(versions):
+            # Forget the executables that were removed or replaced since
+            versions = dict(
+                (p, e) for p, e in (versions or {}).items()
+                if _stat_key(p) == e[0])
+            versions[path] = [stat_key, version]
+            return versions
+        cache.update('ffmpeg', 'versions', add_version)
+    return version
+
+
 class FFmpegPostProcessor(PostProcessor):
     def __init__(self, downloader=None):
         PostProcessor.__init__(self, downloader)
@@ -85,11 +172,11 @@ class FFmpegPostProcessor(PostProcessor):
                 self._paths = dict(
                     (p, os.path.join(location, p)) for p in programs)
                 self._versions = dict(
-                    (p, get_exe_version(self._paths[p], args=['-version']))
+                    (p, _get_exe_version(self._paths[p], self._downloader))
                     for p in programs)
         if self._versions is None:
             self._versions = dict(
-                (p, get_exe_version(p, args=['-version'])) for p in programs)
+                (p, _get_exe_version(p, self._downloader)) for p in programs)
             self._paths = dict((p, p) for p in programs)
 
         if prefer_ffmpeg:
@@ -402,16 +489,115 @@ class FFmpegMetadataPP(FFmpegPostProcessor):
         return [], info
 
 
+class FFmpegStreamMerge(object):
+    """
+    An ffmpeg process merging streams into a file while they are written to
+    the binary files in inputs. Closing an input ends its stream.
+    """
+
+    def __init__(self, process, inputs, stderr, temp_filename, filename):
+        self.process = process
+        self.inputs = inputs
+        self._stderr = stderr
+        self._temp_filename = temp_filename
+        self._filename = filename
+
+    def _close_inputs(self):
+        for f in self.inputs:
+            try:
+                f.close()
+            except (IOError, OSError):
+                # ffmpeg has already exited
+                pass
+
+    def finish(self):
+        """ Wait for the end of the merge, once all the streams are written """
+        self._close_inputs()
+        self.process.wait()
+        try:
+            if self.process.returncode != 0:
+                self._stderr.seek(0)
+                stderr = self._stderr.read().decode('utf-8', 'replace')
+                raise FFmpegPostProcessorError(stderr.strip().split('\n')[-1])
+        finally:
+            self._stderr.close()
+        os.rename(encodeFilename(self._temp_filename), encodeFilename(self._filename))
+
+    def abort(self):
+        self._close_inputs()
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        self._stderr.close()
+        if os.path.exists(encodeFilename(self._temp_filename)):
+            os.remove(encodeFilename(self._temp_filename))
+
+
 class FFmpegMergerPP(FFmpegPostProcessor):
+    _ARGS = ['-c', 'copy', '-map', '0:v:0', '-map', '1:a:0']
+
     def run(self, info):
         filename = info['filepath']
         temp_filename = prepend_extension(filename, 'temp')
-        args = ['-c', 'copy', '-map', '0:v:0', '-map', '1:a:0']
         self._downloader.to_screen('[ffmpeg] Merging formats into "%s"' % filename)
-        self.run_ffmpeg_multiple_files(info['__files_to_merge'], temp_filename, args)
+        self.run_ffmpeg_multiple_files(info['__files_to_merge'], temp_filename, list(self._ARGS))
         os.rename(encodeFilename(temp_filename), encodeFilename(filename))
         return info['__files_to_merge'], info
 
+    @property
+    def can_stream_merge(self):
+        # The inputs are passed as inherited file descriptors
+        return self.available and fcntl is not None
+
+    def start_stream_merge(self, filename, count):
+        """
+        Start merging count streams into filename while they are downloaded,
+        return the FFmpegStreamMerge. The streams must be readable
+        sequentially (e.g. fragmented MP4 or WebM), ffmpeg can't seek in them.
+        """
+        self.check_version()
+        temp_filename = prepend_extension(filename, 'temp')
+        pipes = [os.pipe() for _ in range(count)]
+        read_fds = [r for r, _ in pipes]
+        for _, w in pipes:
+            # ffmpeg must not inherit the write ends, or it would never see
+            # the end of its inputs
+            fcntl.fcntl(w, fcntl.F_SETFD, fcntl.fcntl(w, fcntl.F_GETFD) | fcntl.FD_CLOEXEC)
+
+        files_cmd = []
+        for fd in read_fds:
+            files_cmd.extend([encodeArgument('-i'), encodeArgument('pipe:%d' % fd)])
+        cmd = ([encodeFilename(self.executable, True), encodeArgument('-y')] +
+               files_cmd +
+               [encodeArgument(o) for o in self._ARGS + self._configuration_args()] +
+               [encodeFilename(self._ffmpeg_filename_argument(temp_filename), True)])
+        if self._downloader.params.get('verbose', False):
+            self._downloader.to_screen('[debug] ffmpeg command line: %s' % shell_quote(cmd))
+
+        # A pipe could fill up and block ffmpeg while nobody reads it
+        stderr = tempfile.TemporaryFile()
+        devnull = compat_subprocess_get_DEVNULL()
+        try:
+            if sys.version_info >= (3, 2):
+                p = subprocess.Popen(
+                    cmd, stdin=devnull, stdout=devnull, stderr=stderr,
+                    pass_fds=read_fds)
+            else:
+                # The file descriptors are inherited unless close_fds is set
+                p = subprocess.Popen(
+                    cmd, stdin=devnull, stdout=devnull, stderr=stderr,
+                    close_fds=False)
+        except Exception:
+            for r, w in pipes:
+                os.close(r)
+                os.close(w)
+            stderr.close()
+            raise
+        for fd in read_fds:
+            os.close(fd)
+        return FFmpegStreamMerge(
+            p, [os.fdopen(w, 'wb') for _, w in pipes], stderr, temp_filename, filename)
+
     def can_merge(self):
         # TODO: figure out merge-capable ffmpeg version
         if self.basename != 'avconv':
@@ -0,0 +1,96 @@
+from __future__ import unicode_literals
+
+import collections
+import threading
+
+
+class PostProcessingPool(object):
+    """Post-processing pool.
+
+    Runs the post-processing of the downloaded files on worker threads, so
+    that the next files are downloaded meanwhile.
+
+    submit() blocks while queue_size jobs are already waiting for a worker,
+    which bounds the number of downloaded files waiting to be processed.
+    The done callbacks of the jobs are called in the order of submission
+    (the download archive is recorded in the order of the downloads), the
+    one of a job that raised an exception is not called. The exceptions are
+    raised again in the submitting thread by the next submit() or join().
+    """
+
+    def __init__(self, workers, queue_size=None):
+        self._cond = threading.Condition()
+        self._queue = collections.deque()
+        self._queue_size = workers if queue_size is None else queue_size
+        self._submitted = 0
+        # Index of the next job whose done callback is called
+        self._next_done = 0
+        # Results of the finished jobs waiting for the preceding ones
+        self._finished = {}
+        self._errors = []
+        self._closed = False
+        self._threads = []
+        for _ in range(workers):
+            t = threading.Thread(target=self._work)
+            t.daemon = True
+            t.start()
+            self._threads.append(t)
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                index, func, done = self._queue.popleft()
+                self._cond.notify_all()
+            try:
+                result = (done, func(), None)
+            except Exception as err:
+                result = (None, None, err)
+            with self._cond:
+                self._finished[index] = result
+                while self._next_done in self._finished:
+                    done, value, err = self._finished.pop(self._next_done)
+                    self._next_done += 1
+                    if err is None and done is not None:
+                        try:
+                            done(value)
+                        except Exception as done_err:
+                            err = done_err
+                    if err is not None:
+                        self._errors.append(err)
+                self._cond.notify_all()
+
+    def _raise_error(self):
+        if self._errors:
+            err = self._errors.pop(0)
+            raise err
+
+    def submit(self, func, done=None):
+        """
+        Run func() on a worker and then call done with its return value.
+        """
+        with self._cond:
+            self._raise_error()
+            while len(self._queue) >= self._queue_size:
+                # Wait with a timeout so that KeyboardInterrupt
+                # is not blocked on python 2
+                self._cond.wait(1)
+            self._queue.append((self._submitted, func, done))
+            self._submitted += 1
+            self._cond.notify_all()
+
+    def join(self):
+        """Wait until all the submitted jobs are done"""
+        with self._cond:
+            while self._next_done < self._submitted:
+                self._cond.wait(1)
+            self._raise_error()
+
+    def close(self):
+        """Stop the workers once the queued jobs are done"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
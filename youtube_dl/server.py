@@ -0,0 +1,265 @@
+from __future__ import unicode_literals
+
+import errno
+import json
+import os
+import socket
+import sys
+import threading
+
+from .compat import compat_str
+from .utils import (
+    DownloadError,
+    MaxDownloadsReached,
+    error_to_compat_str,
+)
+
+
+# Parameters used when the YoutubeDL object is set up, changing them for a
+# single job would have no effect or break the following jobs
+FIXED_PARAMS = frozenset((
+    'bidi_workaround', 'cookiefile', 'debug_printtraffic', 'download_archive',
+    'download_archive_format', 'keep_alive', 'logger', 'logtostderr',
+    'nocheckcertificate', 'postprocessors', 'progress_hooks', 'proxy',
+    'socket_timeout', 'source_address',
+))
+
+
+def _sanitize_info(info):
+    if isinstance(info, dict):
+        return dict(
+            (k, _sanitize_info(v)) for k, v in info.items()
+            if not k.startswith('__') and k not in ('requested_formats', 'requested_subtitles'))
+    if isinstance(info, (list, tuple)):
+        return [_sanitize_info(v) for v in info]
+    return info
+
+
+class _JobError(Exception):
+    pass
+
+
+class JobServer(object):
+    """
+    Run download jobs with a single YoutubeDL object, which keeps its
+    extractors, HTTP connections and caches between jobs.
+
+    Jobs are read as JSON objects, one per line:
+
+        {"id": "job1", "urls": ["..."], "params": {"format": "best"}, "download": true}
+
+    "id" is optional and defaults to a counter. "url" can be given instead of
+    "urls". "params" overrides the YoutubeDL parameters for this job only,
+    except for FIXED_PARAMS. With "download": false the videos are only
+    extracted.
+
+    Every job gets a stream of events as JSON objects, one per line, all of
+    them with the id of the job and the name of the event in "event":
+
+        log       "level" ("debug", "warning" or "error") and "message"
+        progress  the progress hook dictionary of the downloaders
+        result    "url" and "info", the extracted information
+        error     "message", the job is invalid or failed unexpectedly
+        done      "retcode", the exit code the job would have had with
+                  youtube-dl: 0, 1 on download errors, 2 for invalid jobs or
+                  101 if max_downloads was reached
+
+    Jobs are run one at a time, jobs from other clients wait for their turn.
+    """
+
+    def __init__(self, ydl):
+        self.ydl = ydl
+        self._job_lock = threading.Lock()
+        self._job_counter = 0
+        self._current_job = None
+        self._stopped = False
+        # The events are written to stdout, the videos can't be
+        self._events_on_stdout = False
+        ydl.params['logger'] = self
+        ydl.add_progress_hook(self._progress_hook)
+
+    def _emit(self, event, **kwargs):
+        self._send_event(event, kwargs)
+
+    def _send_event(self, event, fields):
+        job = self._current_job
+        if job is None:
+            # Not running a job, for example when a client is gone
+            if fields.get('message') is not None:
+                sys.stderr.write(fields['message'] + '\n')
+            return
+        fields.update({'id': job[0], 'event': event})
+        job[1](fields)
+
+    # Logger interface for YoutubeDL
+    def debug(self, msg):
+        self._emit('log', level='debug', message=msg)
+
+    def warning(self, msg):
+        self._emit('log', level='warning', message=msg)
+
+    def error(self, msg):
+        self._emit('log', level='error', message=msg)
+
+    def _progress_hook(self, status):
+        self._send_event('progress', dict(status))
+
+    def _parse_job(self, line):
+        try:
+            job = json.loads(line.decode('utf-8'))
+        except ValueError as e:
+            raise _JobError('Invalid JSON: %s' % error_to_compat_str(e))
+        if not isinstance(job, dict):
+            raise _JobError('A job must be a JSON object')
+        urls = job.get('urls')
+        if urls is None and job.get('url') is not None:
+            urls = [job['url']]
+        if (not isinstance(urls, list) or not urls or
+                not all(isinstance(url, compat_str) for url in urls)):
+            raise _JobError('A job must have a "url" string or a non empty "urls" list')
+        params = job.get('params') or {}
+        if not isinstance(params, dict):
+            raise _JobError('"params" must be a JSON object')
+        fixed = sorted(FIXED_PARAMS.intersection(params))
+        if fixed:
+            raise _JobError('These parameters cannot be changed for a job: %s' % ', '.join(fixed))
+        if self._events_on_stdout and params.get('outtmpl') == '-':
+            raise _JobError('Videos cannot be written to stdout, it is used for the events')
+        return urls, params, job.get('download', True)
+
+    def run_job(self, line, send):
+        """
+        Run the job described by the JSON line (bytes) and call send with
+        each of its events, send is called from other threads when the job
+        downloads with several threads.
+        """
+        with self._job_lock:
+            self._job_counter += 1
+            job_id = self._job_counter
+            try:
+                job_id = json.loads(line.decode('utf-8')).get('id', job_id)
+            except (AttributeError, ValueError):
+                pass
+            self._current_job = (job_id, send)
+            try:
+                try:
+                    urls, params, download = self._parse_job(line)
+                except _JobError as e:
+                    self._emit('error', message=compat_str(e))
+                    retcode = 2
+                else:
+                    retcode = self._run(urls, params, download)
+                self._emit('done', retcode=retcode)
+            finally:
+                self._current_job = None
+
+    def _run(self, urls, params, download):
+        ydl = self.ydl
+        orig_params = ydl.params
+        ydl.params = dict(orig_params)
+        ydl.params.update(params)
+        ydl._download_retcode = 0
+        ydl._num_downloads = 0
+        try:
+            for url in urls:
+                try:
+                    info = ydl.extract_info(url, download=download)
+                except DownloadError:
+                    # Already reported as a log event
+                    ydl._download_retcode = 1
+                    continue
+                except MaxDownloadsReached:
+                    self.error('--max-download limit reached, aborting.')
+                    return 101
+                except Exception as e:
+                    self._emit('error', message=error_to_compat_str(e))
+                    ydl._download_retcode = 1
+                    continue
+                if info is not None:
+                    self._emit('result', url=url, info=_sanitize_info(info))
+        finally:
+            try:
+                # The files of a job are post-processed with its params
+                ydl._finish_post_processing()
+            except DownloadError:
+                ydl._download_retcode = 1
+            ydl.params = orig_params
+        return ydl._download_retcode
+
+    def serve(self, inp, out):
+        """
+        Run the jobs read from the binary file inp until its end, the events
+        are written to the binary file out.
+        """
+        out_lock = threading.Lock()
+
+        def send(event):
+            data = (json.dumps(event, default=repr) + '\n').encode('ascii')
+            with out_lock:
+                out.write(data)
+                out.flush()
+
+        # Iterating on files reads ahead on Python 2
+        for line in iter(inp.readline, b''):
+            if self._stopped:
+                break
+            if line.strip():
+                self.run_job(line, send)
+
+    def serve_stdio(self):
+        self._events_on_stdout = True
+        self.serve(
+            getattr(sys.stdin, 'buffer', sys.stdin),
+            getattr(sys.stdout, 'buffer', sys.stdout))
+
+    def _handle_connection(self, conn):
+        try:
+            self.serve(conn.makefile('rb'), conn.makefile('wb'))
+        except socket.error as e:
+            # The client went away
+            self.ydl.report_warning(
+                'Lost connection to a client: %s' % error_to_compat_str(e))
+        finally:
+            conn.close()
+
+    def serve_unix_socket(self, path):
+        """
+        Accept clients on a Unix socket at path until stop is called, the
+        jobs of each client are served as with serve.
+        """
+        if os.path.exists(path):
+            # Remove the socket left by a server that didn't exit cleanly,
+            # binding fails if a server is listening on it
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(path)
+            except socket.error as e:
+                if e.errno == errno.ECONNREFUSED:
+                    os.remove(path)
+            finally:
+                probe.close()
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.bind(path)
+            # Other users could run jobs writing wherever this user can
+            os.chmod(path, 0o600)
+            sock.listen(5)
+            # Check for stop (and KeyboardInterrupt on Python 2) every second
+            sock.settimeout(1)
+            while not self._stopped:
+                try:
+                    conn, _ = sock.accept()
+                except socket.timeout:
+                    continue
+                conn.settimeout(None)
+                t = threading.Thread(target=self._handle_connection, args=(conn,))
+                t.daemon = True
+                t.start()
+        finally:
+            sock.close()
+            os.remove(path)
+
+    def stop(self):
+        """ Stop serving after the current jobs """
+        self._stopped = True
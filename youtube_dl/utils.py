@@ -13,7 +13,6 @@ import datetime
 import email.utils
 import errno
 import functools
-import gzip
 import itertools
 import io
 import json
@@ -30,6 +29,8 @@ import struct
 import subprocess
 import sys
 import tempfile
+import threading
+import time
 import traceback
 import xml.etree.ElementTree
 import zlib
@@ -679,6 +680,224 @@ def _create_http_connection(ydl_handler, http_class, is_https, *args, **kwargs):
     return hc
 
 
+class _PooledHTTPResponse(compat_http_client.HTTPResponse):
+    """ HTTPResponse that knows if it was read to the end before being closed """
+
+    _ytdl_eof = False
+    _ytdl_closing = False
+    _ytdl_reading = False
+
+    if sys.version_info >= (3, 0):
+        def _close_conn(self):
+            # Also called by close()
+            if not self._ytdl_closing:
+                self._ytdl_eof = True
+            compat_http_client.HTTPResponse._close_conn(self)
+
+        def close(self):
+            self._ytdl_closing = True
+            compat_http_client.HTTPResponse.close(self)
+    else:
+        def read(self, amt=None):
+            # On python 2 read closes the response at its end
+            self._ytdl_reading = True
+            try:
+                return compat_http_client.HTTPResponse.read(self, amt)
+            finally:
+                self._ytdl_reading = False
+
+        def close(self):
+            if self._ytdl_reading:
+                self._ytdl_eof = True
+            compat_http_client.HTTPResponse.close(self)
+
+
+class HTTPConnectionPool(object):
+    """
+    Persistent HTTP/1.1 connections shared by the requests made through a
+    handler, keyed by scheme, host, port and proxy.
+
+    At most max_per_host connections are kept for every key, requests made
+    while all of them are busy get a one-off connection. A connection can be
+    reused once the response it returned has been read to the end, it's
+    closed if the response is closed before. Idle connections are closed
+    after idle_timeout seconds.
+    """
+
+    def __init__(self, max_per_host=8, idle_timeout=60):
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._connections = {}
+
+    @staticmethod
+    def _is_done(conn):
+        """ Whether the response returned by conn has been closed """
+        resp = conn._ytdl_response
+        return not conn._ytdl_busy and resp is not None and resp.isclosed()
+
+    @classmethod
+    def _is_idle(cls, conn):
+        resp = conn._ytdl_response
+        return (cls._is_done(conn) and conn.sock is not None and
+                getattr(resp, '_ytdl_eof', False) and not resp.will_close)
+
+    def _evict(self, now):
+        for key, conns in list(self._connections.items()):
+            for conn in conns[:]:
+                if self._is_idle(conn):
+                    if now - conn._ytdl_last_used < self.idle_timeout:
+                        continue
+                elif not self._is_done(conn):
+                    if conn._ytdl_busy or now - conn._ytdl_last_used < self.idle_timeout:
+                        continue
+                    # A connection whose response hasn't been read
+                    # completely may still be in use by its reader, it's
+                    # just not tracked anymore
+                    conns.remove(conn)
+                    continue
+                # The unread part of an abandoned response would be read
+                # as the next response
+                conns.remove(conn)
+                conn.close()
+            if not conns:
+                del self._connections[key]
+
+    def acquire(self, key, create_conn, reuse=True):
+        """
+        Return a (connection, reused) tuple. Connections that are not part of
+        the pool have their _ytdl_pooled attribute set to False. With reuse
+        set to False a new connection is always opened.
+        """
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+            conns = self._connections.setdefault(key, [])
+            if reuse:
+                for conn in conns:
+                    if self._is_idle(conn):
+                        conn._ytdl_busy = True
+                        conn._ytdl_last_used = now
+                        return conn, True
+            conn = create_conn()
+            conn._ytdl_pooled = len(conns) < self.max_per_host
+            conn._ytdl_busy = True
+            conn._ytdl_response = None
+            conn._ytdl_last_used = now
+            if conn._ytdl_pooled:
+                conns.append(conn)
+            return conn, False
+
+    def release(self, conn, resp):
+        with self._lock:
+            conn._ytdl_response = resp
+            conn._ytdl_last_used = time.time()
+            conn._ytdl_busy = False
+
+    def discard(self, key, conn):
+        with self._lock:
+            conns = self._connections.get(key, [])
+            if conn in conns:
+                conns.remove(conn)
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            for conns in self._connections.values():
+                for conn in conns:
+                    if self._is_done(conn):
+                        conn.close()
+            self._connections = {}
+
+
+def _keep_alive_do_open(handler, pool, scheme, http_class, req, **http_conn_args):
+    """
+    Same as AbstractHTTPHandler.do_open, but reuse a connection of pool
+    instead of opening a new one (and closing it) for every request.
+    """
+    if sys.version_info >= (3, 0):
+        host = req.host
+        selector = req.selector
+    else:
+        host = req.get_host()
+        selector = req.get_selector()
+    if not host:
+        raise compat_urllib_error.URLError('no host given')
+
+    headers = dict(req.unredirected_hdrs)
+    headers.update(dict(
+        (k, v) for k, v in req.headers.items() if k not in headers))
+    headers = dict((name.title(), val) for name, val in headers.items())
+
+    tunnel_host = getattr(req, '_tunnel_host', None)
+    tunnel_headers = {}
+    if tunnel_host:
+        proxy_auth_hdr = 'Proxy-Authorization'
+        if proxy_auth_hdr in headers:
+            tunnel_headers[proxy_auth_hdr] = headers[proxy_auth_hdr]
+            # Proxy-Authorization should not be sent to origin server
+            del headers[proxy_auth_hdr]
+    key = (scheme, host, tunnel_host, tunnel_headers.get('Proxy-Authorization'))
+
+    def create_conn():
+        h = http_class(host, timeout=req.timeout, **http_conn_args)
+        h.response_class = _PooledHTTPResponse
+        h.set_debuglevel(handler._debuglevel)
+        if tunnel_host:
+            h.set_tunnel(tunnel_host, headers=tunnel_headers)
+        return h
+
+    request_kwargs = {}
+    if sys.version_info >= (3, 6):
+        request_kwargs['encode_chunked'] = req.has_header('Transfer-encoding')
+
+    # A request that isn't idempotent can't be sent again if a reused
+    # connection fails, it's always sent on a new one
+    idempotent = (
+        req.data is None and
+        req.get_method() in ('GET', 'HEAD', 'OPTIONS', 'TRACE', 'PUT', 'DELETE'))
+
+    while True:
+        h, reused = pool.acquire(key, create_conn, reuse=idempotent)
+        headers['Connection'] = 'keep-alive' if h._ytdl_pooled else 'close'
+        if reused:
+            h.timeout = req.timeout
+            if h.sock is not None:
+                h.sock.settimeout(req.timeout)
+        try:
+            h.request(req.get_method(), selector, req.data, headers, **request_kwargs)
+            r = h.getresponse()
+        except (socket.error, compat_http_client.HTTPException) as err:
+            pool.discard(key, h)
+            if reused:
+                # The server has closed the idle connection, retry with a
+                # new one
+                continue
+            if isinstance(err, socket.error):
+                raise compat_urllib_error.URLError(err)
+            raise
+        except BaseException:
+            pool.discard(key, h)
+            raise
+        break
+
+    pool.release(h, r)
+    if not h._ytdl_pooled and h.sock:
+        h.sock.close()
+        h.sock = None
+
+    if sys.version_info >= (3, 0):
+        r.url = req.get_full_url()
+        r.msg = r.reason
+        return r
+    r.recv = r.read
+    fp = socket._fileobject(r, close=True)
+    resp = compat_urllib_request.addinfourl(fp, r.msg, req.get_full_url())
+    resp.code = r.status
+    resp.msg = r.reason
+    return resp
+
+
 def handle_youtubedl_headers(headers):
     filtered_headers = headers
 
@@ -689,6 +908,97 @@ def handle_youtubedl_headers(headers):
     return filtered_headers
 
 
+def make_http_headers(header_list):
+    """ Build the headers object of a response from (name, value) pairs """
+    raw = ''.join('%s: %s\r\n' % (name, value) for name, value in header_list) + '\r\n'
+    fp = io.BytesIO(raw.encode('iso-8859-1'))
+    if hasattr(compat_http_client, 'parse_headers'):
+        return compat_http_client.parse_headers(fp)
+    return compat_http_client.HTTPMessage(fp)  # Python 2
+
+
+class _DecompressingReader(io.RawIOBase):
+    """
+    Decompress a gzip or deflate encoded response while it's read.
+
+    Only a bounded amount of compressed and decompressed data is held at a
+    time. Anything after the end of the gzip member (or deflate stream) is
+    ignored, some servers send junk after it.
+    See http://stackoverflow.com/q/4928560/35070 for details
+    """
+
+    _READ_SIZE = 16 * 1024
+    # Upper bound of the decompressed data produced from a single read
+    _MAX_OUTPUT = 256 * 1024
+
+    def __init__(self, fp, encoding):
+        assert encoding in ('gzip', 'deflate')
+        self._fp = fp
+        self._encoding = encoding
+        if encoding == 'gzip':
+            self._decompressobj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        else:
+            # Raw deflate or zlib stream, decided from the first bytes
+            self._decompressobj = None
+        self._buffer = b''
+        self._offset = 0
+        self._eof = False
+        self._empty = True
+
+    def readable(self):
+        return True
+
+    def _decompress(self, data):
+        if self._decompressobj is None:
+            try:
+                self._decompressobj = zlib.decompressobj(-zlib.MAX_WBITS)
+                return self._decompressobj.decompress(data, self._MAX_OUTPUT)
+            except zlib.error:
+                self._decompressobj = zlib.decompressobj()
+        return self._decompressobj.decompress(data, self._MAX_OUTPUT)
+
+    def _fill_buffer(self):
+        decompressobj = self._decompressobj
+        if decompressobj is not None and decompressobj.unconsumed_tail:
+            data = decompressobj.unconsumed_tail
+        else:
+            data = self._fp.read(self._READ_SIZE)
+            if not data:
+                self._eof = True
+                if self._empty:
+                    # e.g. the response to a HEAD request
+                    return
+                self._buffer = decompressobj.flush()
+                # Python 2 can't tell whether the stream is complete
+                if not getattr(decompressobj, 'eof', True):
+                    raise IOError('%s stream ended unexpectedly' % self._encoding)
+                return
+            self._empty = False
+        try:
+            self._buffer = self._decompress(data)
+        except zlib.error as err:
+            raise IOError('Unable to decompress %s stream: %s' % (self._encoding, err))
+        self._offset = 0
+        if self._decompressobj.unused_data:
+            # End of the gzip member or deflate stream
+            self._eof = True
+            self._buffer += self._decompressobj.flush()
+
+    def readinto(self, b):
+        while self._offset >= len(self._buffer) and not self._eof:
+            self._buffer, self._offset = b'', 0
+            self._fill_buffer()
+        n = min(len(b), len(self._buffer) - self._offset)
+        b[:n] = self._buffer[self._offset:self._offset + n]
+        self._offset += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._fp.close()
+        super(_DecompressingReader, self).close()
+
+
 class YoutubeDLHandler(compat_urllib_request.HTTPHandler):
     """Handler for HTTP requests and responses.
 
@@ -710,11 +1020,16 @@ class YoutubeDLHandler(compat_urllib_request.HTTPHandler):
     def __init__(self, params, *args, **kwargs):
         compat_urllib_request.HTTPHandler.__init__(self, *args, **kwargs)
         self._params = params
+        self._connection_pool = (
+            HTTPConnectionPool() if params.get('keep_alive', True) else None)
 
     def http_open(self, req):
-        return self.do_open(functools.partial(
-            _create_http_connection, self, compat_http_client.HTTPConnection, False),
-            req)
+        conn_class = functools.partial(
+            _create_http_connection, self, compat_http_client.HTTPConnection, False)
+        if self._connection_pool:
+            return _keep_alive_do_open(
+                self, self._connection_pool, 'http', conn_class, req)
+        return self.do_open(conn_class, req)
 
     @staticmethod
     def deflate(data):
@@ -769,31 +1084,11 @@ class YoutubeDLHandler(compat_urllib_request.HTTPHandler):
 
     def http_response(self, req, resp):
         old_resp = resp
-        # gzip
-        if resp.headers.get('Content-encoding', '') == 'gzip':
-            content = resp.read()
-            gz = gzip.GzipFile(fileobj=io.BytesIO(content), mode='rb')
-            try:
-                uncompressed = io.BytesIO(gz.read())
-            except IOError as original_ioerror:
-                # There may be junk add the end of the file
-                # See http://stackoverflow.com/q/4928560/35070 for details
-                for i in range(1, 1024):
-                    try:
-                        gz = gzip.GzipFile(fileobj=io.BytesIO(content[:-i]), mode='rb')
-                        uncompressed = io.BytesIO(gz.read())
-                    except IOError:
-                        continue
-                    break
-                else:
-                    raise original_ioerror
-            resp = self.addinfourl_wrapper(uncompressed, old_resp.headers, old_resp.url, old_resp.code)
-            resp.msg = old_resp.msg
-            del resp.headers['Content-encoding']
-        # deflate
-        if resp.headers.get('Content-encoding', '') == 'deflate':
-            gz = io.BytesIO(self.deflate(resp.read()))
-            resp = self.addinfourl_wrapper(gz, old_resp.headers, old_resp.url, old_resp.code)
+        # gzip and deflate, decompressed while the response is read
+        content_encoding = resp.headers.get('Content-encoding', '')
+        if content_encoding in ('gzip', 'deflate'):
+            stream = io.BufferedReader(_DecompressingReader(resp, content_encoding))
+            resp = self.addinfourl_wrapper(stream, old_resp.headers, old_resp.url, old_resp.code)
             resp.msg = old_resp.msg
             del resp.headers['Content-encoding']
         # Percent-encode redirect URL of Location HTTP header to satisfy RFC 3986 (see
@@ -819,6 +1114,8 @@ class YoutubeDLHTTPSHandler(compat_urllib_request.HTTPSHandler):
         compat_urllib_request.HTTPSHandler.__init__(self, *args, **kwargs)
         self._https_conn_class = https_conn_class or compat_http_client.HTTPSConnection
         self._params = params
+        self._connection_pool = (
+            HTTPConnectionPool() if params.get('keep_alive', True) else None)
 
     def https_open(self, req):
         kwargs = {}
@@ -826,9 +1123,12 @@ class YoutubeDLHTTPSHandler(compat_urllib_request.HTTPSHandler):
             kwargs['context'] = self._context
         if hasattr(self, '_check_hostname'):  # python 3.x
             kwargs['check_hostname'] = self._check_hostname
-        return self.do_open(functools.partial(
-            _create_http_connection, self, self._https_conn_class, True),
-            req, **kwargs)
+        conn_class = functools.partial(
+            _create_http_connection, self, self._https_conn_class, True)
+        if self._connection_pool:
+            return _keep_alive_do_open(
+                self, self._connection_pool, 'https', conn_class, req, **kwargs)
+        return self.do_open(conn_class, req, **kwargs)
 
 
 class YoutubeDLCookieProcessor(compat_urllib_request.HTTPCookieProcessor):
@@ -1748,6 +2048,15 @@ def parse_age_limit(s):
     return int(m.group('age')) if m else US_RATINGS.get(s)
 
 
+def parse_m3u8_attributes(attrib):
+    info = {}
+    for (key, val) in re.findall(r'(?P<key>[a-zA-Z0-9_-]+)=(?P<val>"[^"]+"|[^",]+)(?:,|$)', attrib):
+        if val.startswith('"'):
+            val = val[1:-1]
+        info[key] = val
+    return info
+
+
 def strip_jsonp(code):
     return re.sub(
         r'(?s)^[a-zA-Z0-9_.]+\s*\(\s*(.*)\);?\s*?(?://[^\n]*)*$', r'\1', code)